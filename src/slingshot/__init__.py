@@ -3,7 +3,8 @@
 __version__ = "0.1.0"
 
 from .client import CloudflareClient
+from .async_client import AsyncCloudflareClient
 from .deployer import WorkerDeployer
 from .config import Config
 
-__all__ = ["CloudflareClient", "WorkerDeployer", "Config"]
+__all__ = ["CloudflareClient", "AsyncCloudflareClient", "WorkerDeployer", "Config"]
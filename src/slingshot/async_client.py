@@ -0,0 +1,229 @@
+"""Asyncio wrapper around the Cloudflare API client."""
+
+import asyncio
+import collections.abc
+import functools
+import itertools
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .client import CloudflareClient
+from .multipart import Content
+from .ratelimit import RateLimiter
+
+
+class AsyncCloudflareClient:
+    """Asyncio client for driving many Cloudflare API calls concurrently.
+
+    Each call is dispatched to a thread pool backed by a single pooled
+    CloudflareClient, and an asyncio semaphore bounds how many requests are
+    in flight at once. Every public CloudflareClient method is available as
+    a coroutine, except those returning iterators (``iter_*``): they become
+    async iterators that pull up to ITER_CHUNK_SIZE items per trip to the
+    thread pool, so pages are still fetched lazily as they are consumed.
+    """
+
+    # Items fetched from a client iterator per trip to the thread pool
+    ITER_CHUNK_SIZE = 1000
+
+    def __init__(
+        self,
+        account_id: str,
+        api_token: str,
+        max_concurrency: int = 16,
+        client: Optional[CloudflareClient] = None,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
+        """Initialize async Cloudflare client.
+
+        Args:
+            account_id: Cloudflare account ID
+            api_token: Cloudflare API token
+            max_concurrency: Maximum number of requests in flight at once
+            client: Existing synchronous client to share. Created if not given.
+            rate_limiter: Limiter for the created client. Ignored if client is given.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.account_id = account_id
+        self.api_token = api_token
+        self.max_concurrency = max_concurrency
+        self.client = client or CloudflareClient(
+            account_id=account_id,
+            api_token=api_token,
+            pool_maxsize=max(max_concurrency, CloudflareClient.DEFAULT_POOL_MAXSIZE),
+            rate_limiter=rate_limiter
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="slingshot-api"
+        )
+
+    async def __aenter__(self) -> "AsyncCloudflareClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker threads and release pooled connections."""
+        self._executor.shutdown(wait=True)
+        self.client.close()
+
+    async def _call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking client method without blocking the event loop.
+
+        Args:
+            func: Bound CloudflareClient method
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
+
+        Returns:
+            Whatever the client method returns
+        """
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(func, *args, **kwargs)
+            )
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        """Expose any other public client method through the thread pool.
+
+        Args:
+            name: Name of the CloudflareClient method
+
+        Returns:
+            Coroutine function running the method in the thread pool, or an
+            async generator function if the method returns an iterator
+
+        Raises:
+            AttributeError: If the client has no such public method
+        """
+        method = getattr(CloudflareClient, name, None)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        func = getattr(self.client, name)
+
+        if _returns_iterator(method):
+            @functools.wraps(method)
+            async def iterate(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+                async for item in self._iterate(func, *args, **kwargs):
+                    yield item
+
+            return iterate
+
+        @functools.wraps(method)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self._call(func, *args, **kwargs)
+
+        return call
+
+    async def _iterate(
+        self,
+        func: Callable[..., Iterator[Any]],
+        *args: Any,
+        **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        """Consume a blocking client iterator without blocking the event loop.
+
+        Args:
+            func: Bound CloudflareClient method returning an iterator
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
+
+        Yields:
+            The iterator's items, fetched ITER_CHUNK_SIZE at a time
+        """
+        iterator = await self._call(func, *args, **kwargs)
+        try:
+            while True:
+                chunk = await self._call(list, itertools.islice(iterator, self.ITER_CHUNK_SIZE))
+                for item in chunk:
+                    yield item
+                if len(chunk) < self.ITER_CHUNK_SIZE:
+                    return
+        finally:
+            # Stop a prefetching generator if the caller breaks out early
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                await self._call(close)
+
+    async def list_workers(self) -> List[Dict[str, Any]]:
+        """List all workers in the account."""
+        return await self._call(self.client.list_workers)
+
+    async def get_worker(self, worker_name: str) -> Dict[str, Any]:
+        """Get details of a specific worker."""
+        return await self._call(self.client.get_worker, worker_name)
+
+    async def upload_worker(
+        self,
+        worker_name: str,
+        script_content: Content,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Upload or update a worker script."""
+        return await self._call(
+            self.client.upload_worker,
+            worker_name=worker_name,
+            script_content=script_content,
+            metadata=metadata
+        )
+
+    async def upload_worker_modules(
+        self,
+        worker_name: str,
+        modules: List[Tuple[str, Content, str]],
+        metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Upload or update a worker made of several modules."""
+        return await self._call(
+            self.client.upload_worker_modules,
+            worker_name=worker_name,
+            modules=modules,
+            metadata=metadata
+        )
+
+    async def delete_worker(self, worker_name: str) -> Dict[str, Any]:
+        """Delete a worker script."""
+        return await self._call(self.client.delete_worker, worker_name)
+
+    async def get_worker_routes(self, zone_id: str) -> List[Dict[str, Any]]:
+        """Get routes for a zone."""
+        return await self._call(self.client.get_worker_routes, zone_id)
+
+    async def create_worker_route(
+        self,
+        zone_id: str,
+        pattern: str,
+        worker_name: str
+    ) -> Dict[str, Any]:
+        """Create a route for a worker."""
+        return await self._call(self.client.create_worker_route, zone_id, pattern, worker_name)
+
+    async def list_kv_namespaces(self) -> List[Dict[str, Any]]:
+        """List all KV namespaces in the account."""
+        return await self._call(self.client.list_kv_namespaces)
+
+    async def create_kv_namespace(self, title: str) -> Dict[str, Any]:
+        """Create a KV namespace."""
+        return await self._call(self.client.create_kv_namespace, title)
+
+    async def get_account_info(self) -> Dict[str, Any]:
+        """Get account information."""
+        return await self._call(self.client.get_account_info)
+
+    async def verify_token(self) -> bool:
+        """Verify that the API token is valid."""
+        return await self._call(self.client.verify_token)
+
+
+def _returns_iterator(method: Callable[..., Any]) -> bool:
+    """Whether a client method is annotated as returning an iterator."""
+    returns = typing.get_type_hints(method).get("return")
+    return typing.get_origin(returns) is collections.abc.Iterator
@@ -0,0 +1,414 @@
+"""Minimal ES module bundler for worker scripts.
+
+Bundles the relative imports reachable from a worker's main module into a
+single module: every dependency is evaluated once, in dependency order,
+inside its own function scope, and import/export syntax is rewritten into
+plain variable bindings. Imports of runtime-provided modules (anything that
+is not a relative path, e.g. ``cloudflare:sockets``) are hoisted to the top
+of the bundle and left for the runtime to resolve.
+
+Supported: default, named and namespace imports, side-effect imports,
+``export`` on declarations, ``export default``, export lists and re-exports.
+Not supported: circular imports, dynamic ``import()`` of local files, and
+destructuring or multi-declarator ``export const`` statements (only the
+first name is exported). Imported bindings are snapshots, not live bindings.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .cache import default_cache_dir
+from .modules import JS_EXTENSIONS, ModuleResolutionError, resolve_specifier, strip_comments
+
+# Bump whenever transform() output changes so stale cache entries are ignored
+TRANSFORM_VERSION = 1
+
+_IDENT = r"[A-Za-z_$][\w$]*"
+_SPEC = r"""(['"])(?P<spec>[^'"\n]+)\2"""
+
+_IMPORT_FROM_RE = re.compile(
+    r"^[ \t]*import\s+(?P<clause>[\w$\s{},*]+?)\s+from\s*" + _SPEC + r"[ \t]*;?", re.M
+)
+_IMPORT_BARE_RE = re.compile(
+    r"^[ \t]*import\s*" + _SPEC.replace(r"\2", r"\1") + r"[ \t]*;?\n?", re.M
+)
+_DYNAMIC_IMPORT_RE = re.compile(r"""\bimport\s*\(\s*['"](\.{1,2}/[^'"\n]*)['"]""")
+
+_EXPORT_DEFAULT_DECL_RE = re.compile(
+    r"^([ \t]*)export\s+default\s+(?=(?:async\s+)?function\b|class\b)"
+    r"(?P<decl>(?:async\s+)?function\s*\*?\s*|class\s+)(?P<name>" + _IDENT + ")",
+    re.M,
+)
+_EXPORT_DEFAULT_RE = re.compile(r"^([ \t]*)export\s+default\s+", re.M)
+_EXPORT_DECL_RE = re.compile(
+    r"^([ \t]*)export\s+(?P<decl>(?:async\s+)?function\s*\*?\s*|class\s+|const\s+|let\s+|var\s+)"
+    r"(?P<name>" + _IDENT + ")",
+    re.M,
+)
+_EXPORT_STAR_RE = re.compile(
+    r"^[ \t]*export\s*\*\s*(?:as\s+(?P<ns>" + _IDENT + r")\s+)?from\s*" + _SPEC + r"[ \t]*;?\n?",
+    re.M,
+)
+_EXPORT_LIST_FROM_RE = re.compile(
+    r"^[ \t]*export\s*\{(?P<names>[^}]*)\}\s*from\s*" + _SPEC + r"[ \t]*;?\n?", re.M
+)
+_EXPORT_LIST_RE = re.compile(r"^[ \t]*export\s*\{(?P<names>[^}]*)\}[ \t]*;?\n?", re.M)
+
+_DEP_PLACEHOLDER_RE = re.compile(r"__SLINGSHOT_DEP_(\d+)__")
+
+_STAR_HELPER = (
+    "const __slingshot_star = (m) => { const { default: _, ...rest } = m; return rest; };"
+)
+
+
+class BuildError(Exception):
+    """Exception raised when a worker cannot be bundled."""
+    pass
+
+
+class TransformedModule(NamedTuple):
+    """One module rewritten for bundling.
+
+    ``code`` refers to the module's dependencies through placeholders that
+    index into ``deps``, so the transform does not depend on where the
+    module ends up in the bundle and can be cached by content alone.
+    """
+
+    code: str
+    deps: List[str]
+    exports: List[Tuple[str, str]]
+    star_deps: List[int]
+
+
+class BuildResult(NamedTuple):
+    """Outcome of a bundle build."""
+
+    code: str
+    modules: List[Path]
+    transformed: int
+    cached: int
+
+
+def _dep_ref(index: int) -> str:
+    return f"__SLINGSHOT_DEP_{index}__"
+
+
+def _parse_names(names: str) -> List[Tuple[str, str]]:
+    """Parse ``a, b as c`` into [(local, exported)] pairs."""
+    pairs = []
+    for part in names.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        match = re.fullmatch(r"(" + _IDENT + r")(?:\s+as\s+(" + _IDENT + r"))?", part)
+        if not match:
+            raise BuildError(f"Unsupported import/export name: {part!r}")
+        pairs.append((match.group(1), match.group(2) or match.group(1)))
+    return pairs
+
+
+def _import_bindings(clause: str, ref: str) -> str:
+    """Rewrite an import clause into const bindings from a module object."""
+    clause = clause.strip()
+    lines = []
+
+    if not clause.startswith(("{", "*")):
+        default, _, clause = clause.partition(",")
+        lines.append(f"const {default.strip()} = {ref}.default;")
+        clause = clause.strip()
+
+    if clause.startswith("*"):
+        match = re.fullmatch(r"\*\s*as\s+(" + _IDENT + r")", clause)
+        if not match:
+            raise BuildError(f"Unsupported namespace import: {clause!r}")
+        lines.append(f"const {match.group(1)} = {ref};")
+    elif clause.startswith("{"):
+        pairs = _parse_names(clause.strip("{} \t\n"))
+        if pairs:
+            fields = ", ".join(src if src == local else f"{src}: {local}" for src, local in pairs)
+            lines.append(f"const {{ {fields} }} = {ref};")
+
+    return " ".join(lines)
+
+
+def transform(source: str, minify: bool = True) -> TransformedModule:
+    """Rewrite one ES module's imports and exports into plain bindings.
+
+    Args:
+        source: Module source
+        minify: Collapse whitespace as well as stripping comments
+
+    Returns:
+        Transformed module
+
+    Raises:
+        BuildError: If the module uses unsupported syntax
+    """
+    code = strip_comments(source, collapse_whitespace=minify)
+    deps: List[str] = []
+    exports: List[Tuple[str, str]] = []
+    star_deps: List[int] = []
+
+    def dep(spec: str) -> int:
+        if spec not in deps:
+            deps.append(spec)
+        return deps.index(spec)
+
+    dynamic = _DYNAMIC_IMPORT_RE.search(code)
+    if dynamic:
+        raise BuildError(f"Dynamic import of local module '{dynamic.group(1)}' is not supported")
+
+    def import_from(match: re.Match) -> str:
+        return _import_bindings(match.group("clause"), _dep_ref(dep(match.group("spec"))))
+
+    def import_bare(match: re.Match) -> str:
+        dep(match.group("spec"))
+        return ""
+
+    def export_star(match: re.Match) -> str:
+        index = dep(match.group("spec"))
+        if match.group("ns"):
+            exports.append((match.group("ns"), _dep_ref(index)))
+        else:
+            star_deps.append(index)
+        return ""
+
+    def export_list_from(match: re.Match) -> str:
+        ref = _dep_ref(dep(match.group("spec")))
+        for local, exported in _parse_names(match.group("names")):
+            exports.append((exported, f"{ref}.{local}"))
+        return ""
+
+    def export_list(match: re.Match) -> str:
+        for local, exported in _parse_names(match.group("names")):
+            exports.append((exported, local))
+        return ""
+
+    def export_default_decl(match: re.Match) -> str:
+        exports.append(("default", match.group("name")))
+        return f"{match.group(1)}{match.group('decl')}{match.group('name')}"
+
+    def export_default(match: re.Match) -> str:
+        exports.append(("default", "__slingshot_default"))
+        return f"{match.group(1)}const __slingshot_default = "
+
+    def export_decl(match: re.Match) -> str:
+        exports.append((match.group("name"), match.group("name")))
+        return f"{match.group(1)}{match.group('decl')}{match.group('name')}"
+
+    code = _IMPORT_FROM_RE.sub(import_from, code)
+    code = _IMPORT_BARE_RE.sub(import_bare, code)
+    code = _EXPORT_STAR_RE.sub(export_star, code)
+    code = _EXPORT_LIST_FROM_RE.sub(export_list_from, code)
+    code = _EXPORT_LIST_RE.sub(export_list, code)
+    code = _EXPORT_DEFAULT_DECL_RE.sub(export_default_decl, code)
+    code = _EXPORT_DEFAULT_RE.sub(export_default, code)
+    code = _EXPORT_DECL_RE.sub(export_decl, code)
+
+    return TransformedModule(code.strip(), deps, exports, star_deps)
+
+
+class BuildCache:
+    """Per-file transform results keyed by content hash."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize build cache.
+
+        Args:
+            path: SQLite file to store transforms in. Defaults to build.db in
+                the Slingshot cache directory.
+        """
+        self.path = Path(path) if path else default_cache_dir() / "build.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transforms (key TEXT PRIMARY KEY, result TEXT NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection that commits and closes on exit."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(source: bytes, minify: bool) -> str:
+        """Build the cache key for a source file's transform."""
+        digest = hashlib.sha256(source)
+        digest.update(f"\0v{TRANSFORM_VERSION}\0{int(minify)}".encode("ascii"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[TransformedModule]:
+        """Look up a cached transform."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT result FROM transforms WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        code, deps, exports, star_deps = json.loads(row[0])
+        return TransformedModule(code, deps, [tuple(e) for e in exports], star_deps)
+
+    def put(self, key: str, module: TransformedModule) -> None:
+        """Store a transform."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO transforms (key, result) VALUES (?, ?)",
+                (key, json.dumps(list(module)))
+            )
+
+
+class Bundler:
+    """Bundles a worker's local ES modules into one module."""
+
+    def __init__(self, cache: Optional[BuildCache] = None, minify: bool = True):
+        """Initialize bundler.
+
+        Args:
+            cache: Optional cache of per-file transforms
+            minify: Strip whitespace as well as comments
+        """
+        self.cache = cache
+        self.minify = minify
+
+    def _load(self, path: Path) -> Tuple[TransformedModule, bool]:
+        """Transform a file, using the cache when possible.
+
+        Returns:
+            Tuple of (transformed module, whether it came from the cache)
+        """
+        raw = path.read_bytes()
+        key = BuildCache.make_key(raw, self.minify)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached, True
+
+        try:
+            module = transform(raw.decode("utf-8"), minify=self.minify)
+        except BuildError as e:
+            raise BuildError(f"{path}: {e}")
+        if self.cache is not None:
+            self.cache.put(key, module)
+        return module, False
+
+    def build(self, entry: Path) -> BuildResult:
+        """Bundle the module graph rooted at entry.
+
+        Args:
+            entry: Main module
+
+        Returns:
+            Build result with the bundled code
+
+        Raises:
+            BuildError: If the graph cannot be resolved or bundled
+        """
+        entry = entry.resolve()
+        loaded: Dict[Path, TransformedModule] = {}
+        resolved: Dict[Path, List[Optional[Path]]] = {}
+        order: List[Path] = []
+        externals: Dict[str, str] = {}
+        stats = {"transformed": 0, "cached": 0}
+
+        def visit(path: Path, stack: List[Path]) -> None:
+            if path in stack:
+                cycle = " -> ".join(p.name for p in stack[stack.index(path):] + [path])
+                raise BuildError(f"Circular import: {cycle}")
+            if path in loaded:
+                return
+            if path.suffix.lower() not in JS_EXTENSIONS:
+                raise BuildError(f"Cannot bundle non-JavaScript module: {path}")
+
+            module, hit = self._load(path)
+            stats["cached" if hit else "transformed"] += 1
+            targets: List[Optional[Path]] = []
+            for spec in module.deps:
+                try:
+                    target = resolve_specifier(path, spec)
+                except ModuleResolutionError as e:
+                    raise BuildError(str(e))
+                if target is None:
+                    externals.setdefault(spec, f"__slingshot_ext_{len(externals)}")
+                else:
+                    visit(target, stack + [path])
+                targets.append(target)
+
+            loaded[path] = module
+            resolved[path] = targets
+            order.append(path)
+
+        visit(entry, [])
+
+        names = {path: f"__slingshot_m{i}" for i, path in enumerate(order)}
+
+        def link(path: Path, code: str) -> str:
+            """Replace dependency placeholders with the bundle's variable names."""
+            module = loaded[path]
+
+            def ref(match: re.Match) -> str:
+                index = int(match.group(1))
+                target = resolved[path][index]
+                return externals[module.deps[index]] if target is None else names[target]
+
+            return _DEP_PLACEHOLDER_RE.sub(ref, code)
+
+        def export_names(path: Path) -> List[str]:
+            module = loaded[path]
+            found = [name for name, _ in module.exports]
+            for index in module.star_deps:
+                target = resolved[path][index]
+                if target is not None:
+                    found += [n for n in export_names(target) if n != "default"]
+            return list(dict.fromkeys(found))
+
+        out = [f"import * as {var} from {json.dumps(spec)};" for spec, var in externals.items()]
+        out.append(_STAR_HELPER)
+
+        for path in order[:-1]:
+            module = loaded[path]
+            fields = [
+                f"...__slingshot_star({names[resolved[path][i]]})"
+                for i in module.star_deps if resolved[path][i] is not None
+            ]
+            fields += [f"{json.dumps(name)}: {link(path, expr)}" for name, expr in module.exports]
+            out.append(f"const {names[path]} = (() => {{")
+            out.append(link(path, module.code))
+            out.append(f"return {{ {', '.join(fields)} }};")
+            out.append("})();")
+
+        # The entry module stays at the top level so its exports are real exports
+        entry_module = loaded[entry]
+        out.append(link(entry, entry_module.code))
+        own = {name for name, _ in entry_module.exports}
+        for i, (name, expr) in enumerate(entry_module.exports):
+            expr = link(entry, expr)
+            if re.fullmatch(_IDENT, expr):
+                out.append(f"export {{ {expr} as {name} }};")
+            else:
+                out.append(f"const __slingshot_re_{i} = {expr};")
+                out.append(f"export {{ __slingshot_re_{i} as {name} }};")
+        for index in entry_module.star_deps:
+            target = resolved[entry][index]
+            if target is None:
+                continue
+            for j, name in enumerate(n for n in export_names(target) if n != "default"):
+                if name in own:
+                    continue
+                var = f"__slingshot_star_{index}_{j}"
+                out.append(f"const {var} = {names[target]}.{name};")
+                out.append(f"export {{ {var} as {name} }};")
+
+        return BuildResult(
+            code="\n".join(part for part in out if part) + "\n",
+            modules=order,
+            transformed=stats["transformed"],
+            cached=stats["cached"],
+        )
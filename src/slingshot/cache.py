@@ -0,0 +1,256 @@
+"""Persistent on-disk cache for read-only Cloudflare API responses."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+def default_cache_dir() -> Path:
+    """Get the directory Slingshot keeps local state in.
+
+    Honors ``SLINGSHOT_CACHE_DIR`` and then ``XDG_CACHE_HOME``.
+    """
+    override = os.getenv("SLINGSHOT_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+    base = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "slingshot"
+
+
+def token_fingerprint(api_token: str) -> str:
+    """Get a stable, non-reversible identifier for an API token."""
+    return hashlib.sha256(api_token.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed cache of API response envelopes for GET requests.
+
+    Entries are keyed by account, endpoint and query parameters. Fresh
+    entries are served without touching the network; stale entries that
+    carry an ETag are revalidated with If-None-Match. The cache is bounded
+    by total size and evicts least recently used entries first.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 300.0,
+        max_bytes: int = 16 * 1024 * 1024
+    ):
+        """Initialize response cache.
+
+        Args:
+            path: SQLite file to store responses in. Defaults to
+                responses.db in the Slingshot cache directory.
+            ttl: Seconds an entry is served without revalidation
+            max_bytes: Upper bound on the total size of cached bodies
+        """
+        self.path = Path(path) if path else default_cache_dir() / "responses.db"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, scope TEXT NOT NULL, body TEXT NOT NULL, "
+                "etag TEXT, size INTEGER NOT NULL, stored REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_scope ON responses (scope)")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection to the cache file."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(
+        scope: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        credential: str = ""
+    ) -> str:
+        """Build the cache key for a request.
+
+        Args:
+            scope: Account the request is made for
+            endpoint: API endpoint path
+            params: Query parameters
+            credential: Token fingerprint, so different tokens never share entries
+
+        Returns:
+            Hex digest identifying the request
+        """
+        raw = json.dumps([scope, credential, endpoint, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], Optional[str], bool]]:
+        """Look up a cached response.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Tuple of (envelope, etag, is_fresh), or None on a miss
+        """
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT body, etag, stored FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        with conn:
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0]), row[1], (now - row[2]) < self.ttl
+
+    def put(
+        self,
+        key: str,
+        scope: str,
+        envelope: Dict[str, Any],
+        etag: Optional[str] = None
+    ) -> None:
+        """Store a response and evict old entries if over budget.
+
+        Args:
+            key: Cache key from make_key()
+            scope: Account the request was made for
+            envelope: Parsed API response
+            etag: ETag header of the response, if any
+        """
+        body = json.dumps(envelope)
+        if len(body) > self.max_bytes:
+            return
+
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, scope, body, etag, size, stored, accessed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, scope, body, etag, len(body), now, now)
+            )
+            self._evict(conn)
+
+    def refresh(self, key: str) -> None:
+        """Mark an entry as freshly validated (after a 304 response)."""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "UPDATE responses SET stored = ?, accessed = ? WHERE key = ?", (now, now, key)
+            )
+
+    def invalidate(self, scope: str) -> None:
+        """Drop every entry cached for an account.
+
+        Args:
+            scope: Account whose entries should be removed
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM responses WHERE scope = ?", (scope,))
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM responses")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Remove least recently used entries until under max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute("SELECT key, size FROM responses ORDER BY accessed ASC")
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+
+class TokenVerificationCache:
+    """Remembers which API tokens were recently verified.
+
+    Only a SHA-256 fingerprint of each token is stored, never the token
+    itself. Failed verifications are not cached, so a fixed token is picked
+    up on the next run.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 3600.0):
+        """Initialize verification cache.
+
+        Args:
+            path: SQLite file to store fingerprints in. Defaults to
+                tokens.db in the Slingshot cache directory.
+            ttl: Seconds a successful verification stays valid
+        """
+        self.path = Path(path) if path else default_cache_dir() / "tokens.db"
+        self.ttl = ttl
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS verified ("
+                "fingerprint TEXT PRIMARY KEY, verified REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection that commits and closes on exit."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def is_verified(self, api_token: str) -> bool:
+        """Check whether a token was verified within the TTL.
+
+        Args:
+            api_token: API token to look up
+
+        Returns:
+            True if a fresh successful verification is on record
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT verified FROM verified WHERE fingerprint = ?",
+                (token_fingerprint(api_token),)
+            ).fetchone()
+        return row is not None and (time.time() - row[0]) < self.ttl
+
+    def mark_verified(self, api_token: str) -> None:
+        """Record a successful verification of a token."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO verified (fingerprint, verified) VALUES (?, ?)",
+                (token_fingerprint(api_token), time.time())
+            )
+
+    def forget(self, api_token: str) -> None:
+        """Drop a token's verification, e.g. after the API rejected it."""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM verified WHERE fingerprint = ?", (token_fingerprint(api_token),)
+            )
@@ -1,17 +1,39 @@
 """CLI interface for Slingshot."""
 
+import json
+import sqlite3
 import sys
 from pathlib import Path
 from typing import Optional
 
 import click
+import requests
 from rich.console import Console
 from rich.table import Table
 from rich import print as rprint
 
 from . import __version__
+from .client import CloudflareAPIError
 from .config import Config
-from .deployer import WorkerDeployer, DeploymentError
+from .d1 import (
+    MIRROR_PAGE_ROWS, D1Mirror, ImportCheckpoint, create_table_sql, full_scan, import_rows,
+    is_read_only, make_import_key, profile_statements, read_csv_rows, read_sqlite_rows,
+    split_sql
+)
+from .deployer import AuthenticationError, WorkerDeployer, DeploymentError
+from .kv import (
+    DEFAULT_BATCH_BYTES, KV_BULK_MAX_BYTES, KVSyncIndex, bulk_delete, bulk_import,
+    export_namespace, iter_key_file, iter_records
+)
+from .migrations import (
+    DEFAULT_MIGRATIONS_DIR, DEFAULT_MIGRATIONS_TABLE, MigrationError, applied_migrations,
+    apply_migrations, load_migrations, pack_migrations, plan_migrations
+)
+from .r2 import (
+    DEFAULT_PART_SIZE, DEFAULT_PRESIGN_EXPIRES, MAX_PRESIGN_EXPIRES, R2Client, R2Error,
+    R2SyncManifest, UploadState, download_file, make_upload_key, upload_file
+)
+from .watch import watch_and_deploy
 
 console = Console()
 
@@ -83,11 +105,34 @@ def init(worker_name: str, template: str, force: bool):
 @main.command()
 @click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
 @click.option('--dry-run', is_flag=True, help='Validate without deploying')
-def deploy(config: Optional[str], dry_run: bool):
+@click.option('--optimistic', is_flag=True,
+              help='Skip the credential pre-check and rely on the upload to report auth errors')
+@click.option('--all', 'deploy_all', is_flag=True,
+              help='Deploy every worker project (.slingshot.json) below the current directory')
+@click.option('--jobs', '-j', default=8, show_default=True, type=click.IntRange(min=1),
+              help='Number of concurrent uploads with --all')
+@click.option('--force', '-f', is_flag=True,
+              help='Upload even if nothing changed since last deploy')
+@click.option('--build', 'build_first', is_flag=True,
+              help='Bundle the worker with `slingshot build` and deploy the bundle')
+def deploy(config: Optional[str], dry_run: bool, optimistic: bool, deploy_all: bool, jobs: int,
+           force: bool, build_first: bool):
     """Deploy worker to Cloudflare.
 
     Reads the configuration from .slingshot.json and deploys the worker script.
+    Unchanged workers are skipped unless --force is given.
     """
+    if deploy_all and build_first:
+        console.print("[red]Error:[/red] --build cannot be combined with --all.")
+        sys.exit(1)
+    if deploy_all and config:
+        console.print("[red]Error:[/red] --config cannot be combined with --all; "
+                      "run it from the directory to search instead.")
+        sys.exit(1)
+    if deploy_all:
+        _deploy_all(dry_run=dry_run, optimistic=optimistic, jobs=jobs, force=force)
+        return
+
     try:
         # Load configuration
         cfg = Config(config)
@@ -103,30 +148,49 @@ def deploy(config: Optional[str], dry_run: bool):
             deployer = WorkerDeployer(cfg)
 
         # Verify connection first
-        if not dry_run:
+        if not dry_run and not optimistic:
             with console.status("[bold green]Verifying API connection..."):
                 if not deployer.verify_connection():
                     console.print("[red]Error:[/red] Invalid API credentials.")
                     sys.exit(1)
             console.print("[green]✓[/green] API connection verified")
 
+        # Bundle
+        script_path = None
+        if build_first:
+            with console.status("[bold green]Building worker..."):
+                build = deployer.build()
+            console.print(f"[green]✓[/green] Built {build['outfile']} "
+                          f"({build['modules']} modules, {build['cached']} cached)")
+            script_path = build['outfile']
+
         # Deploy
         mode = "Validating" if dry_run else "Deploying"
         with console.status(f"[bold green]{mode} worker..."):
-            result = deployer.deploy(dry_run=dry_run)
+            result = deployer.deploy(script_path=script_path, dry_run=dry_run, force=force)
 
         # Show results
-        if dry_run:
+        if result.get('status') == 'skipped':
+            console.print(f"[green]✓[/green] Worker '{result['worker_name']}' is unchanged, "
+                          "skipped upload (use --force to redeploy)")
+        elif dry_run:
             console.print(f"[green]✓[/green] Validation successful")
             console.print(f"Worker name: {result['worker_name']}")
             console.print(f"Script size: {result['script_size']} bytes")
+            if len(result.get('modules', [])) > 1:
+                console.print(f"Modules: {len(result['modules'])}")
         else:
             console.print(f"[green]✓[/green] Worker deployed successfully!")
             console.print(f"Worker name: {result['worker_name']}")
             console.print(f"Script size: {result['script_size']} bytes")
+            if len(result.get('modules', [])) > 1:
+                console.print(f"Modules: {len(result['modules'])}")
             console.print(f"\n[yellow]Your worker is now live at:[/yellow]")
             console.print(f"https://{result['worker_name']}.workers.dev")
 
+    except AuthenticationError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        sys.exit(1)
     except DeploymentError as e:
         console.print(f"[red]Deployment failed:[/red] {e}")
         sys.exit(1)
@@ -135,6 +199,167 @@ def deploy(config: Optional[str], dry_run: bool):
         sys.exit(1)
 
 
+def _deploy_all(dry_run: bool, optimistic: bool, jobs: int, force: bool) -> None:
+    """Deploy every worker project below the current directory concurrently.
+
+    Args:
+        dry_run: If True, validate but don't actually deploy
+        optimistic: If True, skip the credential pre-check
+        jobs: Number of concurrent uploads
+        force: If True, upload even unchanged workers
+    """
+    configs = Config.discover()
+    if not configs:
+        console.print("[red]Error:[/red] No .slingshot.json files found.")
+        sys.exit(1)
+
+    # Credentials come from the environment, so one check covers every worker
+    if not dry_run and not optimistic:
+        client = WorkerDeployer.build_client(configs[0])
+        try:
+            with console.status("[bold green]Verifying API connection..."):
+                if not WorkerDeployer(configs[0], client=client).verify_connection():
+                    console.print("[red]Error:[/red] Invalid API credentials.")
+                    sys.exit(1)
+            console.print("[green]✓[/green] API connection verified")
+        except DeploymentError as e:
+            console.print(f"[red]Deployment failed:[/red] {e}")
+            sys.exit(1)
+        finally:
+            client.close()
+
+    mode = "Validating" if dry_run else "Deploying"
+    console.print(f"{mode} {len(configs)} workers ({jobs} at a time)...")
+
+    results = []
+    with console.status(f"[bold green]{mode} workers..."):
+        for result in WorkerDeployer.iter_deploy_many(
+            configs, max_workers=jobs, dry_run=dry_run, force=force
+        ):
+            results.append(result)
+            if result["status"] == "failed":
+                console.print(
+                    f"[red]✗[/red] {result['worker_name']} "
+                    f"({result['duration']:.2f}s): {result['error']}"
+                )
+            elif result["status"] == "skipped":
+                console.print(f"[dim]- {result['worker_name']} unchanged, skipped[/dim]")
+            else:
+                console.print(
+                    f"[green]✓[/green] {result['worker_name']} ({result['duration']:.2f}s)"
+                )
+
+    table = Table(title=f"Deploy report ({len(results)} workers)")
+    table.add_column("Worker", style="cyan")
+    table.add_column("Status")
+    table.add_column("Size", justify="right")
+    table.add_column("Time", justify="right", style="yellow")
+    for result in sorted(results, key=lambda r: r["duration"], reverse=True):
+        status = result["status"]
+        table.add_row(
+            result["worker_name"],
+            f"[red]{status}[/red]" if status == "failed" else f"[green]{status}[/green]",
+            f"{result['script_size']} B" if "script_size" in result else "-",
+            f"{result['duration']:.2f}s"
+        )
+    console.print(table)
+
+    failed = sum(1 for r in results if r["status"] == "failed")
+    if failed:
+        console.print(f"[red]{failed} of {len(results)} workers failed.[/red]")
+        sys.exit(1)
+
+
+@main.command()
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--outfile', '-o', default=None,
+              help='Bundle output path (default: dist/<main script> in the project)')
+@click.option('--no-minify', is_flag=True, help='Keep whitespace in the bundle')
+def build(config: Optional[str], outfile: Optional[str], no_minify: bool):
+    """Bundle the worker into a single script.
+
+    Inlines every relative import of the main script. Files that have not
+    changed since the last build are taken from the build cache.
+    """
+    try:
+        cfg = Config(config)
+        deployer = WorkerDeployer(cfg)
+
+        with console.status("[bold green]Building worker..."):
+            result = deployer.build(outfile=outfile, minify=not no_minify)
+
+        console.print(f"[green]✓[/green] Built {result['outfile']}")
+        console.print(f"Bundle size: {result['size']} bytes")
+        console.print(f"Modules: {result['modules']} "
+                      f"({result['transformed']} transformed, {result['cached']} cached)")
+
+    except DeploymentError as e:
+        console.print(f"[red]Build failed:[/red] {e}")
+        sys.exit(1)
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+        sys.exit(1)
+
+
+@main.command()
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--watch', '-w', is_flag=True, help='Keep running and redeploy when files change')
+@click.option('--debounce', default=0.2, show_default=True, type=click.FloatRange(min=0),
+              help='Seconds without further saves before redeploying')
+@click.option('--poll-interval', default=0.5, show_default=True, type=click.FloatRange(min=0.05),
+              help='Seconds between scans when inotify is unavailable')
+@click.option('--optimistic', is_flag=True,
+              help='Skip the credential pre-check and rely on the upload to report auth errors')
+def dev(config: Optional[str], watch: bool, debounce: float, poll_interval: float,
+        optimistic: bool):
+    """Deploy the worker and redeploy it on every change.
+
+    Keeps one API session open, watches the worker's modules and config file,
+    and only uploads when their content actually changed.
+    """
+    try:
+        cfg = Config(config)
+        deployer = WorkerDeployer(cfg)
+
+        if not optimistic:
+            with console.status("[bold green]Verifying API connection..."):
+                if not deployer.verify_connection():
+                    console.print("[red]Error:[/red] Invalid API credentials.")
+                    sys.exit(1)
+
+        if watch:
+            console.print("[dim]Watching for changes (Ctrl+C to stop)...[/dim]")
+
+        cycles = watch_and_deploy(
+            deployer,
+            debounce=debounce,
+            poll_interval=poll_interval,
+            max_cycles=None if watch else 1
+        )
+        for result in cycles:
+            latency = f"{result['latency'] * 1000:.0f} ms"
+            status = result.get('status')
+            if status == 'failed':
+                console.print(f"[red]✗[/red] {result['error']}")
+            elif status == 'skipped':
+                console.print(f"[dim]• '{result['worker_name']}' unchanged, not uploaded "
+                              f"({latency})[/dim]")
+            else:
+                console.print(f"[green]✓[/green] '{result['worker_name']}' live in {latency} "
+                              f"({result['script_size']} bytes)")
+            if not watch and status == 'failed':
+                sys.exit(1)
+
+    except KeyboardInterrupt:
+        console.print("\nStopped watching.")
+    except DeploymentError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        sys.exit(1)
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+        sys.exit(1)
+
+
 @main.command()
 @click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
 @click.confirmation_option(prompt='Are you sure you want to delete this worker?')
@@ -261,6 +486,954 @@ def config_setup():
         console.print(f"[red]✗[/red] Verification failed: {e}")
 
 
+@main.group()
+def kv():
+    """Bulk operations on Workers KV namespaces.
+
+    NAMESPACE may be a namespace ID or the binding name of one of the
+    kv_namespaces in .slingshot.json.
+    """
+    pass
+
+
+def _kv_client(config: Optional[str], namespace: str, jobs: int = 4):
+    """Create a client sized for concurrent KV calls and resolve a namespace.
+
+    Args:
+        config: Path to .slingshot.json, if any
+        namespace: Namespace ID or binding name from the config
+        jobs: Number of concurrent requests the client must serve
+
+    Returns:
+        Tuple of (client, namespace ID)
+    """
+    cfg = Config(config)
+    if not cfg.account_id or not cfg.api_token:
+        console.print("[red]Error:[/red] Cloudflare credentials not configured.")
+        console.print("Set CLOUDFLARE_ACCOUNT_ID and CLOUDFLARE_API_TOKEN in your .env file.")
+        sys.exit(1)
+
+    for binding in cfg.get("kv_namespaces", []):
+        if binding.get("binding") == namespace and binding.get("id"):
+            namespace = binding["id"]
+            break
+
+    return WorkerDeployer.build_client(cfg, pool_maxsize=max(jobs, 4)), namespace
+
+
+def _rate_line(verb: str, progress) -> str:
+    """Format a one-line progress readout for a KV transfer."""
+    return (f"[bold green]{verb} {progress.keys:,} keys "
+            f"({progress.bytes / 1_048_576:.1f} MiB, {progress.rate:,.0f} keys/s)...")
+
+
+@kv.command(name='import')
+@click.argument('namespace')
+@click.argument('file', type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']), default=None,
+              help='Dataset format (default: from the file extension)')
+@click.option('--jobs', '-j', default=4, show_default=True, type=click.IntRange(min=1),
+              help='Number of bulk requests in flight')
+@click.option('--batch-bytes', default=DEFAULT_BATCH_BYTES, show_default=True,
+              type=click.IntRange(min=1024, max=KV_BULK_MAX_BYTES),
+              help='Maximum payload size of one bulk request')
+def kv_import(namespace: str, file: Path, config: Optional[str], fmt: Optional[str], jobs: int,
+              batch_bytes: int):
+    """Write every record of a JSONL or CSV file to a KV namespace.
+
+    The file is streamed, so it can be far larger than memory. Records need
+    "key" and "value" fields; "expiration", "expiration_ttl", "metadata" and
+    "base64" are passed through. Files ending in .gz are decompressed.
+    """
+    client, namespace_id = _kv_client(config, namespace, jobs)
+    try:
+        with console.status("[bold green]Importing...") as status:
+            summary = bulk_import(
+                client,
+                namespace_id,
+                iter_records(file, fmt),
+                concurrency=jobs,
+                max_bytes=batch_bytes,
+                progress=lambda p: status.update(_rate_line("Imported", p))
+            )
+    except (CloudflareAPIError, ValueError, OSError) as e:
+        console.print(f"[red]Import failed:[/red] {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    console.print(f"[green]✓[/green] Imported {summary['keys']:,} keys in {summary['batches']} "
+                  f"batches ({summary['duration']:.1f}s, {summary['keys_per_second']:,.0f} keys/s)")
+    if summary['failed']:
+        console.print(f"[yellow]{summary['failed']} keys were rejected:[/yellow] "
+                      + ", ".join(summary['failed_keys'][:10]))
+        sys.exit(1)
+
+
+@kv.command(name='export')
+@click.argument('namespace')
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--output', '-o', default=None, type=click.Path(dir_okay=False, path_type=Path),
+              help='Output file (default: <namespace>.jsonl.gz); gzip-compressed if it ends in .gz')
+@click.option('--prefix', default=None, help='Only export keys starting with this prefix')
+@click.option('--jobs', '-j', default=16, show_default=True, type=click.IntRange(min=1),
+              help='Number of value reads in flight')
+def kv_export(namespace: str, config: Optional[str], output: Optional[Path], prefix: Optional[str],
+              jobs: int):
+    """Snapshot a KV namespace to compressed JSONL.
+
+    The output uses the same format `slingshot kv import` reads, so it can be
+    restored into this or another namespace.
+    """
+    client, namespace_id = _kv_client(config, namespace, jobs)
+    output = output or Path(f"{namespace}.jsonl.gz")
+    try:
+        with console.status("[bold green]Exporting...") as status:
+            summary = export_namespace(
+                client,
+                namespace_id,
+                output,
+                prefix=prefix,
+                concurrency=jobs,
+                progress=lambda p: status.update(_rate_line("Exported", p))
+            )
+    except (CloudflareAPIError, OSError) as e:
+        console.print(f"[red]Export failed:[/red] {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    console.print(f"[green]✓[/green] Exported {summary['keys']:,} keys to {output} "
+                  f"({summary['duration']:.1f}s, {summary['keys_per_second']:,.0f} keys/s)")
+    if summary['missing']:
+        console.print(f"[yellow]{summary['missing']} keys were deleted during the export[/yellow]")
+
+
+@kv.command(name='purge')
+@click.argument('namespace')
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--prefix', default=None, help='Delete every key starting with this prefix')
+@click.option('--from-file', 'key_file', default=None,
+              type=click.Path(exists=True, dir_okay=False, path_type=Path),
+              help='Delete the keys listed in this file, one per line')
+@click.option('--dry-run', is_flag=True, help='Only count the keys that would be deleted')
+@click.option('--jobs', '-j', default=4, show_default=True, type=click.IntRange(min=1),
+              help='Number of bulk requests in flight')
+@click.option('--yes', '-y', is_flag=True, help='Do not ask for confirmation')
+def kv_purge(namespace: str, config: Optional[str], prefix: Optional[str],
+             key_file: Optional[Path], dry_run: bool, jobs: int, yes: bool):
+    """Bulk-delete keys by prefix or from a key file.
+
+    Keys are streamed from the listing (or file) and deleted in batches of
+    10,000, several batches at a time.
+    """
+    if bool(prefix) == bool(key_file):
+        console.print("[red]Error:[/red] Give exactly one of --prefix or --from-file.")
+        sys.exit(1)
+
+    source = f"keys starting with '{prefix}'" if prefix else f"keys listed in {key_file}"
+    if not dry_run and not yes:
+        click.confirm(f"Delete all {source} from {namespace}?", abort=True)
+
+    client, namespace_id = _kv_client(config, namespace, jobs)
+    if prefix:
+        keys = (entry["name"] for entry in
+                client.iter_kv_keys(namespace_id, prefix=prefix, prefetch=True))
+    else:
+        keys = iter_key_file(key_file)
+
+    verb = "Counted" if dry_run else "Deleted"
+    try:
+        with console.status("[bold green]Purging...") as status:
+            summary = bulk_delete(
+                client,
+                namespace_id,
+                keys,
+                concurrency=jobs,
+                dry_run=dry_run,
+                progress=lambda p: status.update(_rate_line(verb, p))
+            )
+    except (CloudflareAPIError, OSError) as e:
+        console.print(f"[red]Purge failed:[/red] {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    if dry_run:
+        console.print(f"[green]✓[/green] {summary['keys']:,} {source} would be deleted")
+    else:
+        console.print(f"[green]✓[/green] Deleted {summary['keys']:,} keys in "
+                      f"{summary['batches']} batches ({summary['duration']:.1f}s, "
+                      f"{summary['keys_per_second']:,.0f} keys/s)")
+
+
+@kv.command(name='sync')
+@click.argument('namespace')
+@click.argument('file', type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--format', 'fmt', type=click.Choice(['jsonl', 'csv']), default=None,
+              help='Dataset format (default: from the file extension)')
+@click.option('--jobs', '-j', default=4, show_default=True, type=click.IntRange(min=1),
+              help='Number of bulk requests in flight')
+@click.option('--dry-run', is_flag=True, help='Only count the puts and deletes that would be sent')
+@click.option('--full', is_flag=True, help='Ignore the local index and write every record')
+def kv_sync(namespace: str, file: Path, config: Optional[str], fmt: Optional[str], jobs: int,
+            dry_run: bool, full: bool):
+    """Make a KV namespace match a dataset, sending only what changed.
+
+    A local index of key hashes from the previous sync is used to write only
+    new or changed records and delete keys that disappeared from the dataset.
+    """
+    client, namespace_id = _kv_client(config, namespace, jobs)
+    try:
+        with console.status("[bold green]Syncing...") as status:
+            summary = KVSyncIndex().sync(
+                client,
+                namespace_id,
+                iter_records(file, fmt),
+                concurrency=jobs,
+                dry_run=dry_run,
+                full=full,
+                progress=lambda p: status.update(_rate_line("Wrote", p))
+            )
+    except (CloudflareAPIError, ValueError, OSError) as e:
+        console.print(f"[red]Sync failed:[/red] {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    prefix = "Would send" if dry_run else "Sent"
+    console.print(f"[green]✓[/green] {prefix} {summary['puts']:,} puts and "
+                  f"{summary['deletes']:,} deletes; {summary['unchanged']:,} keys unchanged "
+                  f"({summary['duration']:.1f}s)")
+    if summary['failed']:
+        console.print(f"[yellow]{summary['failed']} keys were rejected and will be retried "
+                      "on the next sync[/yellow]")
+        sys.exit(1)
+
+
+@main.group()
+def d1():
+    """Query and manage D1 databases.
+
+    DATABASE may be a database ID, or the binding or database_name of one of
+    the d1_databases in .slingshot.json.
+    """
+    pass
+
+
+def _d1_client(config: Optional[str], database: str, jobs: int = 4):
+    """Create a client sized for concurrent D1 calls and resolve a database.
+
+    Args:
+        config: Path to .slingshot.json, if any
+        database: Database ID, or binding or name from the config
+        jobs: Number of concurrent requests the client must serve
+
+    Returns:
+        Tuple of (client, database ID)
+    """
+    cfg = Config(config)
+    if not cfg.account_id or not cfg.api_token:
+        console.print("[red]Error:[/red] Cloudflare credentials not configured.")
+        console.print("Set CLOUDFLARE_ACCOUNT_ID and CLOUDFLARE_API_TOKEN in your .env file.")
+        sys.exit(1)
+
+    client = WorkerDeployer.build_client(cfg, pool_maxsize=max(jobs, 4))
+    return client, _d1_database_id(cfg, database)
+
+
+def _d1_database_entry(cfg: Config, database: str) -> dict:
+    """Find the d1_databases entry for a binding, name or ID (empty if none)."""
+    for db in cfg.get("d1_databases", []):
+        if database in (db.get("binding"), db.get("database_name"), db.get("database_id")):
+            return db
+    return {}
+
+
+def _d1_database_id(cfg: Config, database: str) -> str:
+    """Resolve a binding or database_name from d1_databases to its ID."""
+    return _d1_database_entry(cfg, database).get("database_id") or database
+
+
+def _print_rows(rows, title: Optional[str] = None, limit: int = 100) -> None:
+    """Print query rows as a table, truncated to limit rows."""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        console.print("[dim]No rows.[/dim]")
+        return
+
+    table = Table(title=title)
+    for column in first:
+        table.add_column(str(column))
+    for row in [first] + [r for _, r in zip(range(limit - 1), rows)]:
+        table.add_row(*("NULL" if v is None else str(v) for v in row.values()))
+    console.print(table)
+
+    remaining = sum(1 for _ in rows)
+    if remaining:
+        console.print(f"[dim]... {remaining} more rows (use --json for all)[/dim]")
+
+
+@d1.command(name='query')
+@click.argument('database')
+@click.argument('sql')
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--param', '-p', 'params', multiple=True,
+              help='Value for a ? placeholder (repeatable)')
+@click.option('--json', 'as_json', is_flag=True, help='Print rows as JSON lines')
+@click.option('--local', is_flag=True,
+              help='Query the local mirror made by "slingshot d1 pull" instead of D1')
+@click.option('--mirror', default=None, type=click.Path(dir_okay=False, path_type=Path),
+              help='Mirror file for --local (default: the one "d1 pull" writes)')
+def d1_query(database: str, sql: str, config: Optional[str], params: tuple, as_json: bool,
+             local: bool, mirror: Optional[Path]):
+    """Run a SQL query against a D1 database."""
+    if local:
+        _d1_query_local(config, database, sql, params, as_json, mirror)
+        return
+
+    client, database_id = _d1_client(config, database, jobs=1)
+    try:
+        results = client.iter_d1_results(database_id, [(sql, params)], concurrency=1)
+        for result in results:
+            if as_json:
+                for row in result.rows:
+                    click.echo(json.dumps(row))
+            else:
+                _print_rows(result.rows)
+                console.print(f"[dim]{len(result.rows)} rows, {result.rows_read} read, "
+                              f"{result.rows_written} written in {result.duration:.2f} ms[/dim]")
+    except (CloudflareAPIError, ValueError) as e:
+        console.print(f"[red]Query failed:[/red] {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+
+def _d1_query_local(config: Optional[str], database: str, sql: str, params: tuple,
+                    as_json: bool, mirror: Optional[Path]) -> None:
+    """Run a read-only query against a local mirror."""
+    if mirror is None:
+        mirror = D1Mirror.default_path(_d1_database_id(Config(config), database))
+    if not mirror.exists():
+        console.print(f"[red]Error:[/red] No local mirror at {mirror}.")
+        console.print(f"Run: slingshot d1 pull {database}")
+        sys.exit(1)
+
+    try:
+        result = D1Mirror(mirror).query(sql, params)
+    except sqlite3.Error as e:
+        console.print(f"[red]Query failed:[/red] {e}")
+        sys.exit(1)
+
+    if as_json:
+        for row in result.rows:
+            click.echo(json.dumps(row, default=lambda v: v.hex()))
+    else:
+        _print_rows(result.rows)
+        console.print(f"[dim]{len(result.rows)} rows in {result.duration:.2f} ms "
+                      f"(local mirror {mirror})[/dim]")
+
+
+@d1.command(name='pull')
+@click.argument('database')
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--output', '-o', default=None, type=click.Path(dir_okay=False, path_type=Path),
+              help='Mirror file (default: in the Slingshot cache directory)')
+@click.option('--table', '-t', 'tables', multiple=True,
+              help='Only pull this table (repeatable)')
+@click.option('--full', is_flag=True, help='Recopy every table instead of refreshing')
+@click.option('--page-size', default=MIRROR_PAGE_ROWS, show_default=True,
+              type=click.IntRange(min=1), help='Rows fetched per query')
+@click.option('--jobs', '-j', default=4, show_default=True, type=click.IntRange(min=1),
+              help='Number of tables pulled at once')
+def d1_pull(database: str, config: Optional[str], output: Optional[Path], tables: tuple,
+            full: bool, page_size: int, jobs: int):
+    """Copy a D1 database into a local SQLite mirror.
+
+    The first pull copies every table; later pulls only fetch rows added
+    since (by rowid) or modified since (by an updated_at column, where the
+    table has one). Query the mirror with "slingshot d1 query --local".
+    """
+    client, database_id = _d1_client(config, database, jobs)
+    mirror = D1Mirror(output or D1Mirror.default_path(database_id))
+
+    try:
+        with console.status("[bold green]Pulling...") as status:
+            summary = mirror.pull(
+                client,
+                database_id,
+                tables=tables or None,
+                full=full,
+                page_size=page_size,
+                concurrency=jobs,
+                progress=lambda p: status.update(
+                    f"[bold green]Pulled {p.keys:,} rows ({p.rate:,.0f} rows/s)...")
+            )
+    except (CloudflareAPIError, ValueError, sqlite3.Error) as e:
+        console.print(f"[red]Pull failed:[/red] {e}")
+        console.print("Rows pulled so far are kept; rerun to continue.")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    table = Table(title=f"Mirror of {database}")
+    table.add_column("Table", style="cyan")
+    table.add_column("Mode")
+    table.add_column("Rows pulled", justify="right")
+    for name, result in sorted(summary['tables'].items()):
+        mode = result['mode'] + (" (reset)" if result['reset'] else "")
+        table.add_row(name, mode, f"{result['rows']:,}")
+    console.print(table)
+
+    for name in summary['skipped']:
+        console.print(f"[yellow]Skipped virtual table {name}[/yellow]")
+    for name in summary['dropped']:
+        console.print(f"[dim]Dropped {name} (no longer in the database)[/dim]")
+    console.print(f"[green]✓[/green] Pulled {summary['rows']:,} rows "
+                  f"({summary['rows_read']:,} rows read) in {summary['duration']:.1f}s "
+                  f"to {mirror.path}")
+
+
+@d1.command(name='import')
+@click.argument('database')
+@click.argument('source', type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--table', '-t', required=True, help='D1 table to insert into')
+@click.option('--source-table', default=None,
+              help='Table to read from a SQLite source (default: same as --table)')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'sqlite']), default=None,
+              help='Source format (default: from the file extension)')
+@click.option('--mode', type=click.Choice(['insert', 'replace', 'ignore']), default='insert',
+              show_default=True, help='What to do with rows that hit a uniqueness constraint')
+@click.option('--create', is_flag=True,
+              help='Create the table from the SQLite source schema if it does not exist')
+@click.option('--jobs', '-j', default=4, show_default=True, type=click.IntRange(min=1),
+              help='Number of chunks in flight')
+@click.option('--restart', is_flag=True, help='Ignore any checkpoint and import from the start')
+def d1_import(database: str, source: Path, config: Optional[str], table: str,
+              source_table: Optional[str], fmt: Optional[str], mode: str, create: bool,
+              jobs: int, restart: bool):
+    """Bulk-load rows from a CSV file or SQLite database into a D1 table.
+
+    Rows are streamed into multi-row INSERT statements and sent as parallel
+    chunks. Progress is checkpointed, so rerunning the same command after an
+    interruption resumes where it stopped.
+    """
+    if fmt is None:
+        fmt = 'csv' if source.suffix.lower() in ('.csv', '.tsv') else 'sqlite'
+    if create and fmt != 'sqlite':
+        console.print("[red]Error:[/red] --create needs a SQLite source to copy the schema from.")
+        sys.exit(1)
+
+    client, database_id = _d1_client(config, database, jobs)
+    checkpoint = ImportCheckpoint()
+    key = make_import_key(database_id, table, source, source_table, fmt, mode)
+    if restart:
+        checkpoint.clear(key)
+
+    try:
+        if fmt == 'csv':
+            columns, rows = read_csv_rows(source)
+        else:
+            columns, rows, ddl = read_sqlite_rows(source, source_table or table)
+            if create:
+                client.query_d1(database_id, create_table_sql(ddl, table))
+
+        with console.status("[bold green]Importing...") as status:
+            summary = import_rows(
+                client,
+                database_id,
+                table,
+                columns,
+                rows,
+                mode=mode,
+                concurrency=jobs,
+                checkpoint=checkpoint,
+                key=key,
+                progress=lambda p: status.update(
+                    f"[bold green]Imported {p.keys:,} rows ({p.rate:,.0f} rows/s)...")
+            )
+    except (CloudflareAPIError, ValueError, TypeError, OSError, sqlite3.Error) as e:
+        console.print(f"[red]Import failed:[/red] {e}")
+        console.print("Rerun the same command to resume from the last checkpoint.")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    checkpoint.clear(key)
+    if summary['skipped_rows']:
+        console.print(f"Resumed: {summary['skipped_rows']:,} rows were already imported")
+    console.print(f"[green]✓[/green] Imported {summary['rows']:,} rows into {table} in "
+                  f"{summary['chunks']} chunks ({summary['duration']:.1f}s, "
+                  f"{summary['rows_per_second']:,.0f} rows/s)")
+    if summary['retries']:
+        console.print(f"[dim]{summary['retries']} chunks were retried[/dim]")
+
+
+@d1.command(name='migrate')
+@click.argument('database')
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--dir', 'directory', default=None, type=click.Path(file_okay=False, path_type=Path),
+              help='Migrations directory (default: migrations_dir of the database, or migrations/)')
+@click.option('--table', default=None,
+              help='Table recording applied migrations (default: d1_migrations)')
+@click.option('--plan', is_flag=True, help='Show pending migrations without applying them')
+def d1_migrate(database: str, config: Optional[str], directory: Optional[Path],
+               table: Optional[str], plan: bool):
+    """Apply pending SQL migrations to a D1 database.
+
+    Migrations are the *.sql files of the migrations directory, applied in
+    name order. Each is recorded with a checksum, and migrations that were
+    edited after being applied are refused. Pending migrations are sent in
+    as few batch requests as possible; each request is one transaction.
+    """
+    cfg = Config(config)
+    entry = _d1_database_entry(cfg, database)
+    if directory is None:
+        directory = cfg.config_path.parent / entry.get("migrations_dir", DEFAULT_MIGRATIONS_DIR)
+    table = table or entry.get("migrations_table", DEFAULT_MIGRATIONS_TABLE)
+
+    client, database_id = _d1_client(config, database, jobs=1)
+    try:
+        migrations = load_migrations(directory)
+        applied = applied_migrations(client, database_id, table, create=not plan)
+        pending = plan_migrations(migrations, applied)
+
+        unknown = sorted(set(applied) - {m.name for m in migrations})
+        if unknown:
+            console.print(f"[yellow]Applied but not in {directory}:[/yellow] {', '.join(unknown)}")
+        if not pending:
+            console.print(f"[green]✓[/green] No pending migrations "
+                          f"({len(applied)} applied)")
+            return
+
+        if plan:
+            batches = pack_migrations(pending)
+            plan_table = Table(title=f"Pending migrations for {database}")
+            plan_table.add_column("Migration", style="cyan")
+            plan_table.add_column("Statements", justify="right")
+            plan_table.add_column("Request", justify="right")
+            for number, batch in enumerate(batches, 1):
+                for migration in batch:
+                    plan_table.add_row(migration.name, str(len(migration.statements)),
+                                       str(number))
+            console.print(plan_table)
+            console.print(f"{len(pending)} migrations would be applied in "
+                          f"{len(batches)} requests")
+            return
+
+        with console.status("[bold green]Applying migrations...") as status:
+            summary = apply_migrations(
+                client,
+                database_id,
+                pending,
+                table,
+                progress=lambda batch: status.update(
+                    f"[bold green]Applied {batch[-1].name}...")
+            )
+    except (MigrationError, CloudflareAPIError, OSError) as e:
+        console.print(f"[red]Migration failed:[/red] {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    for name in summary['applied']:
+        console.print(f"  [green]✓[/green] {name}")
+    console.print(f"[green]✓[/green] Applied {len(summary['applied'])} migrations in "
+                  f"{summary['requests']} requests ({summary['duration']:.1f}s)")
+
+
+@d1.command(name='profile')
+@click.argument('database')
+@click.argument('sql_file', type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--runs', '-n', default=5, show_default=True, type=click.IntRange(min=1),
+              help='Times each statement is executed')
+@click.option('--explain', is_flag=True, help='Print the query plan of each statement')
+@click.option('--allow-writes', is_flag=True,
+              help='Also run statements that modify data (they run --runs times)')
+@click.option('--json', 'as_json', is_flag=True, help='Print one JSON object per statement')
+def d1_profile(database: str, sql_file: Path, config: Optional[str], runs: int, explain: bool,
+               allow_writes: bool, as_json: bool):
+    """Profile the statements of a SQL file against a D1 database.
+
+    Each statement is run repeatedly, and the rows read, rows written and
+    duration that D1 reports are summarized as p50/p95. Statements whose
+    query plan scans a whole table are flagged.
+    """
+    statements = split_sql(sql_file.read_text(encoding="utf-8"))
+    if not statements:
+        console.print(f"[yellow]No statements in {sql_file}[/yellow]")
+        return
+    writes = [sql for sql in statements if not is_read_only(sql)]
+    if writes and not allow_writes:
+        console.print(f"[red]Error:[/red] {len(writes)} statements modify data and would run "
+                      f"{runs} times:")
+        for sql in writes:
+            console.print(f"  {' '.join(sql.split())[:80]}")
+        console.print("Use --allow-writes to profile them anyway (ideally on a scratch database).")
+        sys.exit(1)
+
+    client, database_id = _d1_client(config, database, jobs=1)
+    try:
+        with console.status(f"[bold green]Profiling {len(statements)} statements..."):
+            profiles = profile_statements(client, database_id, statements, runs=runs)
+    except (CloudflareAPIError, ValueError) as e:
+        console.print(f"[red]Profile failed:[/red] {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    if as_json:
+        for profile in profiles:
+            click.echo(json.dumps({
+                "index": profile.index,
+                "sql": profile.statement.sql,
+                "runs": len(profile.durations),
+                "rows_returned": profile.rows_returned,
+                **profile.stats(),
+                "full_scans": profile.full_scans,
+                "plan": profile.plan,
+            }))
+        return
+
+    table = Table(title=f"{sql_file.name}: {runs} runs per statement")
+    table.add_column("#", justify="right")
+    table.add_column("Statement", style="cyan", max_width=50)
+    table.add_column("Duration ms\np50 / p95", justify="right")
+    table.add_column("Rows read\np50 / p95", justify="right")
+    table.add_column("Rows written\np50 / p95", justify="right")
+    table.add_column("Full scans", style="yellow")
+    for profile in profiles:
+        stats = profile.stats()
+        table.add_row(
+            str(profile.index + 1),
+            " ".join(profile.statement.sql.split()),
+            f"{stats['duration_p50']:.2f} / {stats['duration_p95']:.2f}",
+            f"{stats['rows_read_p50']:,} / {stats['rows_read_p95']:,}",
+            f"{stats['rows_written_p50']:,} / {stats['rows_written_p95']:,}",
+            ", ".join(profile.full_scans),
+        )
+    console.print(table)
+
+    if explain:
+        for profile in profiles:
+            console.print(f"\n[bold]{profile.index + 1}.[/bold] "
+                          f"{' '.join(profile.statement.sql.split())}")
+            for detail in profile.plan:
+                style = "yellow" if full_scan(detail) else "dim"
+                console.print(f"  [{style}]{detail}[/{style}]")
+
+    flagged = [p for p in profiles if p.full_scans]
+    if flagged:
+        console.print(f"\n[yellow]⚠ {len(flagged)} statements scan whole tables; "
+                      "consider an index on the filtered columns.[/yellow]")
+
+
+@main.group()
+def r2():
+    """Transfer objects to and from R2 buckets.
+
+    These commands use R2's S3-compatible API, which needs an R2 API token
+    (R2_ACCESS_KEY_ID and R2_SECRET_ACCESS_KEY) besides CLOUDFLARE_ACCOUNT_ID.
+    The bucket may be a bucket name or the binding of one of the r2_buckets
+    in .slingshot.json.
+    """
+    pass
+
+
+def _r2_client(config: Optional[str], jobs: int = 8):
+    """Create an R2 client sized for concurrent transfers.
+
+    Returns:
+        Tuple of (client, config)
+    """
+    cfg = Config(config)
+    if not cfg.account_id or not cfg.r2_access_key_id or not cfg.r2_secret_access_key:
+        console.print("[red]Error:[/red] R2 credentials not configured.")
+        console.print("Set CLOUDFLARE_ACCOUNT_ID, R2_ACCESS_KEY_ID and R2_SECRET_ACCESS_KEY "
+                      "in your .env file.")
+        sys.exit(1)
+
+    client = R2Client(
+        cfg.account_id,
+        cfg.r2_access_key_id,
+        cfg.r2_secret_access_key,
+        endpoint=cfg.r2_endpoint,
+        pool_maxsize=max(jobs, 4)
+    )
+    return client, cfg
+
+
+def _r2_location(cfg: Config, target: str):
+    """Split BUCKET[/KEY] and resolve a bucket binding to its name.
+
+    Returns:
+        Tuple of (bucket, key); the key is empty if not given
+    """
+    bucket, _, key = target.partition("/")
+    for entry in cfg.get("r2_buckets", []):
+        if bucket == entry.get("binding") and entry.get("bucket_name"):
+            bucket = entry["bucket_name"]
+            break
+    return bucket, key
+
+
+@r2.command(name='put')
+@click.argument('file', type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument('target')
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--part-size', default=DEFAULT_PART_SIZE // 1_048_576, show_default=True,
+              type=click.IntRange(min=5), help='Multipart part size in MiB')
+@click.option('--jobs', '-j', default=8, show_default=True, type=click.IntRange(min=1),
+              help='Number of parts uploaded at once')
+@click.option('--content-type', default=None, help='Content type (default: from the file name)')
+@click.option('--restart', is_flag=True,
+              help='Abort any interrupted upload of this file and start over')
+def r2_put(file: Path, target: str, config: Optional[str], part_size: int, jobs: int,
+           content_type: Optional[str], restart: bool):
+    """Upload FILE to TARGET (BUCKET or BUCKET/KEY).
+
+    Files larger than one part are uploaded as parallel multipart uploads.
+    Finished parts are recorded locally, so if an upload is interrupted,
+    rerunning the same command only sends the missing parts.
+    """
+    client, cfg = _r2_client(config, jobs)
+    bucket, key = _r2_location(cfg, target)
+    if not key or key.endswith("/"):
+        key += file.name
+    part_size *= 1_048_576
+
+    state = UploadState()
+    if restart:
+        upload_key = make_upload_key(bucket, key, file, part_size)
+        saved = state.get(upload_key)
+        if saved is not None:
+            try:
+                client.abort_multipart_upload(bucket, key, saved[0])
+            except R2Error:
+                pass
+            state.clear(upload_key)
+
+    size = file.stat().st_size
+    try:
+        with console.status("[bold green]Uploading...") as status:
+            summary = upload_file(
+                client,
+                bucket,
+                key,
+                file,
+                part_size=part_size,
+                concurrency=jobs,
+                content_type=content_type,
+                state=state,
+                progress=lambda p: status.update(
+                    f"[bold green]Uploaded {p.bytes / 1_048_576:,.1f} of "
+                    f"{size / 1_048_576:,.1f} MiB "
+                    f"({p.bytes / p.elapsed / 1_048_576 if p.elapsed else 0:,.1f} MiB/s)...")
+            )
+    except (R2Error, OSError, requests.RequestException) as e:
+        console.print(f"[red]Upload failed:[/red] {e}")
+        console.print("Rerun the same command to resume the upload.")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    if summary['resumed']:
+        console.print(f"Resumed: {summary['skipped_parts']} of {summary['parts']} parts "
+                      "were already uploaded")
+    console.print(f"[green]✓[/green] Uploaded {file.name} to {bucket}/{key} "
+                  f"({summary['size'] / 1_048_576:,.1f} MiB in {summary['parts']} parts, "
+                  f"{summary['duration']:.1f}s, "
+                  f"{summary['bytes_per_second'] / 1_048_576:,.1f} MiB/s)")
+
+
+@r2.command(name='get')
+@click.argument('source')
+@click.argument('destination', required=False, type=click.Path(path_type=Path))
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--range-size', default=DEFAULT_PART_SIZE // 1_048_576, show_default=True,
+              type=click.IntRange(min=1), help='Size of each Range request in MiB')
+@click.option('--jobs', '-j', default=8, show_default=True, type=click.IntRange(min=1),
+              help='Number of ranges downloaded at once')
+def r2_get(source: str, destination: Optional[Path], config: Optional[str], range_size: int,
+           jobs: int):
+    """Download SOURCE (BUCKET/KEY) to DESTINATION.
+
+    The object is fetched with parallel Range requests written straight into
+    place. DESTINATION defaults to the key's file name in the current
+    directory. If a download is interrupted, rerunning the same command only
+    fetches the missing ranges.
+    """
+    client, cfg = _r2_client(config, jobs)
+    bucket, key = _r2_location(cfg, source)
+    if not key or key.endswith("/"):
+        console.print("[red]Error:[/red] SOURCE must be BUCKET/KEY")
+        sys.exit(1)
+    name = key.rsplit("/", 1)[-1]
+    if destination is None:
+        destination = Path(name)
+    elif destination.is_dir():
+        destination = destination / name
+
+    try:
+        with console.status("[bold green]Downloading...") as status:
+            summary = download_file(
+                client,
+                bucket,
+                key,
+                destination,
+                range_size=range_size * 1_048_576,
+                concurrency=jobs,
+                progress=lambda p: status.update(
+                    f"[bold green]Downloaded {p.bytes / 1_048_576:,.1f} MiB "
+                    f"({p.bytes / p.elapsed / 1_048_576 if p.elapsed else 0:,.1f} MiB/s)...")
+            )
+    except (R2Error, OSError, requests.RequestException) as e:
+        console.print(f"[red]Download failed:[/red] {e}")
+        console.print("Rerun the same command to resume the download.")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    if summary['resumed']:
+        console.print(f"Resumed: {summary['skipped_ranges']} of {summary['ranges']} ranges "
+                      "were already downloaded")
+    console.print(f"[green]✓[/green] Downloaded {bucket}/{key} to {destination} "
+                  f"({summary['size'] / 1_048_576:,.1f} MiB in {summary['ranges']} ranges, "
+                  f"{summary['duration']:.1f}s, "
+                  f"{summary['bytes_per_second'] / 1_048_576:,.1f} MiB/s)")
+
+
+@r2.command(name='sync')
+@click.argument('directory', type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.argument('target')
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--part-size', default=DEFAULT_PART_SIZE // 1_048_576, show_default=True,
+              type=click.IntRange(min=5), help='Multipart part size in MiB')
+@click.option('--jobs', '-j', default=8, show_default=True, type=click.IntRange(min=1),
+              help='Number of files hashed or uploaded at once')
+@click.option('--delete', is_flag=True,
+              help='Also delete objects under the prefix that have no local file')
+@click.option('--dry-run', is_flag=True, help='Only show what would be uploaded and deleted')
+@click.option('--full', is_flag=True, help='Upload every file, changed or not')
+@click.option('--remote', is_flag=True,
+              help="Compare with the bucket's ETags instead of the local manifest")
+def r2_sync(directory: Path, target: str, config: Optional[str], part_size: int, jobs: int,
+            delete: bool, dry_run: bool, full: bool, remote: bool):
+    """Make TARGET (BUCKET or BUCKET/PREFIX) match DIRECTORY, sending only what changed.
+
+    A local manifest of the files synced last time is used to skip unchanged
+    files without reading them, and to hash and upload only the rest. The
+    first sync of a prefix compares against the ETags in the bucket instead.
+    With --delete, objects under the prefix that have no local file are
+    deleted as well. Without a manifest that means every such object in the
+    bucket listing, so try it with --dry-run first.
+    """
+    client, cfg = _r2_client(config, jobs)
+    bucket, prefix = _r2_location(cfg, target)
+    try:
+        with console.status("[bold green]Syncing...") as status:
+            summary = R2SyncManifest().sync(
+                client,
+                bucket,
+                prefix,
+                directory,
+                concurrency=jobs,
+                part_size=part_size * 1_048_576,
+                delete=delete,
+                dry_run=dry_run,
+                full=full,
+                remote=remote,
+                state=UploadState(),
+                progress=lambda p: status.update(
+                    f"[bold green]Uploaded {p.keys:,} files "
+                    f"({p.bytes / 1_048_576:,.1f} MiB)...")
+            )
+    except (R2Error, OSError, requests.RequestException) as e:
+        console.print(f"[red]Sync failed:[/red] {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    verb = "Would upload" if dry_run else "Uploaded"
+    compared = "manifest" if summary['compared_with'] == "manifest" else "bucket ETags"
+    console.print(f"[green]✓[/green] {verb} {summary['uploaded']:,} files "
+                  f"({summary['bytes_sent'] / 1_048_576:,.1f} MiB) and deleted "
+                  f"{summary['deleted']:,}; {summary['unchanged']:,} unchanged "
+                  f"({summary['bytes_skipped'] / 1_048_576:,.1f} MiB skipped, "
+                  f"compared with {compared}, {summary['duration']:.1f}s)")
+    if summary['failed']:
+        console.print(f"[yellow]{summary['failed']} objects failed and will be retried "
+                      "on the next sync[/yellow]")
+        sys.exit(1)
+
+
+@r2.command(name='presign')
+@click.argument('target')
+@click.argument('keys', nargs=-1)
+@click.option('--config', '-c', default=None, help='Path to .slingshot.json config file')
+@click.option('--from-file', '-f', 'key_file', default=None,
+              type=click.Path(exists=True, dir_okay=False, path_type=Path),
+              help='File with one key per line (.gz supported)')
+@click.option('--expires', '-e', default=DEFAULT_PRESIGN_EXPIRES, show_default=True,
+              type=click.IntRange(min=1, max=MAX_PRESIGN_EXPIRES),
+              help='Seconds the URLs stay valid (at most 7 days)')
+@click.option('--method', default='GET', show_default=True,
+              type=click.Choice(['GET', 'PUT', 'HEAD', 'DELETE'], case_sensitive=False),
+              help='HTTP method the URLs are valid for')
+@click.option('--output', '-o', default=None, type=click.Path(dir_okay=False, path_type=Path),
+              help='Write URLs to a file instead of stdout')
+@click.option('--json', 'as_json', is_flag=True,
+              help='Write one JSON object with key and url per line')
+def r2_presign(target: str, keys: tuple, config: Optional[str], key_file: Optional[Path],
+               expires: int, method: str, output: Optional[Path], as_json: bool):
+    """Print presigned URLs for KEYS in TARGET (BUCKET or BUCKET/PREFIX).
+
+    URLs are signed locally with the R2 API token; no requests are made, so
+    any number of keys can be signed quickly and offline. Keys may be given
+    as arguments, in a file with --from-file, or both. A prefix in TARGET is
+    prepended to every key.
+    """
+    if not keys and key_file is None:
+        console.print("[red]Error:[/red] Give keys as arguments or with --from-file")
+        sys.exit(1)
+
+    client, cfg = _r2_client(config)
+    bucket, prefix = _r2_location(cfg, target)
+    if prefix and not prefix.endswith("/"):
+        prefix += "/"
+
+    def all_keys():
+        yield from keys
+        if key_file is not None:
+            yield from iter_key_file(key_file)
+
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    count = 0
+    try:
+        for key, url in client.presign_urls(
+            bucket, (prefix + key for key in all_keys()), expires=expires, method=method
+        ):
+            out.write((json.dumps({"key": key, "url": url}) if as_json else url) + "\n")
+            count += 1
+    except OSError as e:
+        console.print(f"[red]Presign failed:[/red] {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+        if output:
+            out.close()
+
+    if output:
+        console.print(f"[green]✓[/green] Wrote {count:,} presigned URLs to {output} "
+                      f"(valid for {expires:,}s)")
+
+
 def _get_template_content(template: str) -> str:
     """Get worker template content.
 
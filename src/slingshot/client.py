@@ -1,7 +1,22 @@
 """Cloudflare API client wrapper."""
 
-from typing import Any, Dict, List, Optional
+import json
+import time
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import ResponseCache, token_fingerprint
+from .d1 import (
+    DEFAULT_BATCH_BYTES, DEFAULT_BATCH_STATEMENTS, D1Result, StatementLike, pack_statements
+)
+from .multipart import Content, MultipartBody
+from .parallel import bounded_map
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
 
 
 class CloudflareAPIError(Exception):
@@ -18,29 +33,59 @@ class CloudflareClient:
     """Client for interacting with Cloudflare API."""
 
     BASE_URL = "https://api.cloudflare.com/client/v4"
+    DEFAULT_POOL_MAXSIZE = 32
 
-    def __init__(self, account_id: str, api_token: str):
+    def __init__(
+        self,
+        account_id: str,
+        api_token: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None
+    ):
         """Initialize Cloudflare client.
 
         Args:
             account_id: Cloudflare account ID
             api_token: Cloudflare API token
+            retry_policy: Policy for retrying rate-limited and failed requests.
+                Defaults to RetryPolicy().
+            pool_maxsize: Number of keep-alive connections kept per host
+            rate_limiter: Limiter consulted before every request attempt,
+                including retries
+            cache: Opt-in on-disk cache for GET responses
         """
         self.account_id = account_id
         self.api_token = api_token
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.cache = cache
         self.session = requests.Session()
         self.session.headers.update({
             "Authorization": f"Bearer {api_token}",
             "Content-Type": "application/json"
         })
 
+        # Retries are handled in _send_with_retries, so the adapter must not retry itself
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self) -> None:
+        """Close the underlying HTTP session and its pooled connections."""
+        self.session.close()
+
     def _request(
         self,
         method: str,
         endpoint: str,
         data: Optional[Dict] = None,
         files: Optional[Dict] = None,
-        params: Optional[Dict] = None
+        params: Optional[Dict] = None,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        idempotent: bool = False
     ) -> Dict[str, Any]:
         """Make a request to the Cloudflare API.
 
@@ -50,34 +95,82 @@ class CloudflareClient:
             data: JSON data to send
             files: Files to upload
             params: Query parameters
+            body: Pre-encoded request body (e.g. a MultipartBody), sent as-is
+            headers: Extra request headers
+            idempotent: Retry like a PUT even if the method is POST
 
         Returns:
             API response data
 
+        Raises:
+            CloudflareAPIError: If the API request fails
+        """
+        return self._request_envelope(
+            method, endpoint, data, files, params, body=body, headers=headers,
+            idempotent=idempotent
+        ).get("result", {})
+
+    def _request_envelope(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        files: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        idempotent: bool = False
+    ) -> Dict[str, Any]:
+        """Make a request and return the full response envelope.
+
+        GET requests are served from ``self.cache`` when one is configured,
+        and any other request invalidates the account's cached entries.
+
+        Args:
+            method: HTTP method (GET, POST, PUT, DELETE)
+            endpoint: API endpoint path
+            data: JSON data to send
+            files: Files to upload
+            params: Query parameters
+            body: Pre-encoded request body (e.g. a MultipartBody), sent as-is
+            headers: Extra request headers
+            idempotent: Retry like a PUT even if the method is POST
+
+        Returns:
+            Parsed response including ``result`` and ``result_info``
+
         Raises:
             CloudflareAPIError: If the API request fails
         """
         url = f"{self.BASE_URL}/{endpoint}"
 
-        # Handle file uploads differently
-        headers = None
-        if files:
-            headers = {"Authorization": f"Bearer {self.api_token}"}
-            response = self.session.request(
-                method,
-                url,
-                data=data,
-                files=files,
-                params=params,
-                headers=headers
-            )
-        else:
-            response = self.session.request(
-                method,
-                url,
-                json=data,
-                params=params
+        # Serve reads from the response cache when possible
+        cache_key = None
+        cached = None
+        headers = dict(headers or {})
+        if self.cache is not None and method == "GET":
+            cache_key = self.cache.make_key(
+                self.account_id, endpoint, params, credential=token_fingerprint(self.api_token)
             )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                envelope, etag, fresh = cached
+                if fresh:
+                    return envelope
+                if etag:
+                    headers["If-None-Match"] = etag
+
+        response = self._send_with_retries(
+            method, url, data=data, files=files, params=params, body=body, headers=headers,
+            idempotent=idempotent
+        )
+
+        if self.cache is not None and method != "GET":
+            self.cache.invalidate(self.account_id)
+
+        if response.status_code == 304 and cached is not None:
+            self.cache.refresh(cache_key)
+            return cached[0]
 
         # Parse response
         try:
@@ -98,7 +191,261 @@ class CloudflareClient:
                 errors=errors
             )
 
-        return result.get("result", {})
+        if cache_key is not None:
+            self.cache.put(cache_key, self.account_id, result, response.headers.get("ETag"))
+
+        return result
+
+    def _request_raw(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Make a request whose successful response is not a JSON envelope.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            params: Query parameters
+            body: Pre-encoded request body, sent as-is
+            headers: Extra request headers
+
+        Returns:
+            Raw HTTP response
+
+        Raises:
+            CloudflareAPIError: If the API responds with an error status
+        """
+        response = self._send_with_retries(
+            method, f"{self.BASE_URL}/{endpoint}", params=params, body=body, headers=headers
+        )
+        if response.status_code >= 400:
+            try:
+                errors = response.json().get("errors", [])
+            except ValueError:
+                errors = []
+            messages = [e.get("message", str(e)) for e in errors] or [str(response.status_code)]
+            raise CloudflareAPIError(
+                f"API request failed: {', '.join(messages)}",
+                status_code=response.status_code,
+                errors=errors
+            )
+        if self.cache is not None and method != "GET":
+            self.cache.invalidate(self.account_id)
+        return response
+
+    def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict] = None,
+        files: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        idempotent: bool = False
+    ) -> requests.Response:
+        """Send a request, retrying according to ``self.retry_policy``.
+
+        Args:
+            method: HTTP method
+            url: Full request URL
+            data: JSON data, or form fields when uploading files
+            files: Files to upload
+            params: Query parameters
+            body: Pre-encoded request body, sent as-is
+            headers: Extra request headers
+            idempotent: Retry like a PUT even if the method is POST
+
+        Returns:
+            The last HTTP response received
+        """
+        policy = self.retry_policy
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = self._send(
+                    method, url, data=data, files=files, params=params, body=body,
+                    headers=headers
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                connect_error = isinstance(e, requests.ConnectTimeout)
+                if not policy.should_retry_error(method, connect_error, attempt, idempotent):
+                    raise
+                time.sleep(policy.backoff(attempt))
+                attempt += 1
+                continue
+
+            if policy.should_retry_status(method, response.status_code, attempt, idempotent):
+                delay = policy.parse_retry_after(response.headers.get("Retry-After"))
+                if delay is None:
+                    delay = policy.backoff(attempt)
+                if delay <= policy.max_retry_after:
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+
+            return response
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict] = None,
+        files: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Send a single HTTP request without any error handling.
+
+        Args:
+            method: HTTP method
+            url: Full request URL
+            data: JSON data, or form fields when uploading files
+            files: Files to upload
+            params: Query parameters
+            body: Pre-encoded request body, sent as-is
+            headers: Extra request headers
+
+        Returns:
+            Raw HTTP response
+        """
+        # Pre-encoded bodies carry their own content type
+        if body is not None:
+            content_type = getattr(body, "content_type", "application/octet-stream")
+            return self.session.request(
+                method,
+                url,
+                data=body,
+                params=params,
+                headers={"Content-Type": content_type, **(headers or {})}
+            )
+
+        # Handle file uploads differently
+        if files:
+            upload_headers = {"Authorization": f"Bearer {self.api_token}", **(headers or {})}
+            return self.session.request(
+                method,
+                url,
+                data=data,
+                files=files,
+                params=params,
+                headers=upload_headers
+            )
+
+        return self.session.request(
+            method,
+            url,
+            json=data,
+            params=params,
+            headers=headers
+        )
+
+    @staticmethod
+    def _next_page_params(envelope: Dict[str, Any], params: Dict[str, Any]) -> Optional[Dict]:
+        """Work out the query parameters for the page after this one.
+
+        Args:
+            envelope: Response envelope of the current page
+            params: Query parameters used for the current page
+
+        Returns:
+            Parameters for the next page, or None if this was the last one
+        """
+        if not envelope.get("result"):
+            return None
+
+        info = envelope.get("result_info") or {}
+        if info.get("cursor"):
+            return {**params, "cursor": info["cursor"]}
+
+        page = info.get("page")
+        total_pages = info.get("total_pages")
+        if page and total_pages and page < total_pages:
+            return {**params, "page": page + 1}
+
+        return None
+
+    def _paginate(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        per_page: Optional[int] = None,
+        prefetch: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over every item of a paginated list endpoint.
+
+        Follows both page-number and cursor pagination. Only the page being
+        consumed is held in memory, plus the next one when prefetching.
+
+        Args:
+            endpoint: API endpoint path
+            params: Extra query parameters
+            per_page: Page size to request
+            prefetch: Fetch the next page in the background while the caller
+                consumes the current one
+
+        Yields:
+            Items from the ``result`` list of each page
+        """
+        params = dict(params or {})
+        if per_page:
+            params["per_page"] = per_page
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            envelope = self._request_envelope("GET", endpoint, params=params)
+            while True:
+                next_params = self._next_page_params(envelope, params)
+                pending = None
+                if next_params is not None and executor is not None:
+                    pending = executor.submit(
+                        self._request_envelope, "GET", endpoint, params=next_params
+                    )
+
+                items = envelope.get("result") or []
+                envelope = None
+                yield from items
+                items = None
+
+                if next_params is None:
+                    return
+                if pending is not None:
+                    envelope = pending.result()
+                else:
+                    envelope = self._request_envelope("GET", endpoint, params=next_params)
+                params = next_params
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_workers(
+        self,
+        per_page: Optional[int] = None,
+        prefetch: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all workers in the account, page by page.
+
+        Args:
+            per_page: Page size to request
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            Worker scripts
+        """
+        return self._paginate(
+            f"accounts/{self.account_id}/workers/scripts",
+            per_page=per_page,
+            prefetch=prefetch
+        )
 
     def list_workers(self) -> List[Dict[str, Any]]:
         """List all workers in the account.
@@ -106,7 +453,7 @@ class CloudflareClient:
         Returns:
             List of worker scripts
         """
-        return self._request("GET", f"accounts/{self.account_id}/workers/scripts")
+        return list(self.iter_workers())
 
     def get_worker(self, worker_name: str) -> Dict[str, Any]:
         """Get details of a specific worker.
@@ -122,36 +469,74 @@ class CloudflareClient:
     def upload_worker(
         self,
         worker_name: str,
-        script_content: str,
+        script_content: Content,
         metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Upload or update a worker script.
 
+        The multipart body is streamed with a precomputed Content-Length, so
+        large scripts are not copied into one big request buffer.
+
         Args:
             worker_name: Name of the worker
-            script_content: JavaScript/TypeScript worker code
+            script_content: Worker code as text, bytes, a memoryview, or a
+                binary file object (memory-mapped when backed by a real file)
             metadata: Worker metadata (bindings, vars, etc.)
 
         Returns:
             Upload response
         """
-        # Prepare multipart form data
-        files = {
-            "script": ("worker.js", script_content, "application/javascript+module")
-        }
+        body = MultipartBody()
+        try:
+            if metadata:
+                body.add_part("metadata", json.dumps(metadata), "application/json")
+            body.add_part(
+                "script",
+                script_content,
+                "application/javascript+module",
+                filename="worker.js"
+            )
 
-        # Add metadata if provided
-        data = {}
-        if metadata:
-            import json
-            data["metadata"] = json.dumps(metadata)
+            return self._request(
+                "PUT",
+                f"accounts/{self.account_id}/workers/scripts/{worker_name}",
+                body=body
+            )
+        finally:
+            body.close()
 
-        return self._request(
-            "PUT",
-            f"accounts/{self.account_id}/workers/scripts/{worker_name}",
-            data=data,
-            files=files
-        )
+    def upload_worker_modules(
+        self,
+        worker_name: str,
+        modules: List[Tuple[str, Content, str]],
+        metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Upload or update a worker made of several modules.
+
+        Each module becomes its own multipart part named after the module, so
+        ``metadata["main_module"]`` must match one of the names.
+
+        Args:
+            worker_name: Name of the worker
+            modules: (name, content, content_type) for every module
+            metadata: Worker metadata (main_module, bindings, etc.)
+
+        Returns:
+            Upload response
+        """
+        body = MultipartBody()
+        try:
+            body.add_part("metadata", json.dumps(metadata), "application/json")
+            for name, content, content_type in modules:
+                body.add_part(name, content, content_type, filename=name)
+
+            return self._request(
+                "PUT",
+                f"accounts/{self.account_id}/workers/scripts/{worker_name}",
+                body=body
+            )
+        finally:
+            body.close()
 
     def delete_worker(self, worker_name: str) -> Dict[str, Any]:
         """Delete a worker script.
@@ -167,6 +552,28 @@ class CloudflareClient:
             f"accounts/{self.account_id}/workers/scripts/{worker_name}"
         )
 
+    def iter_routes(
+        self,
+        zone_id: str,
+        per_page: Optional[int] = None,
+        prefetch: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all worker routes of a zone, page by page.
+
+        Args:
+            zone_id: Cloudflare zone ID
+            per_page: Page size to request
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            Routes
+        """
+        return self._paginate(
+            f"zones/{zone_id}/workers/routes",
+            per_page=per_page,
+            prefetch=prefetch
+        )
+
     def get_worker_routes(self, zone_id: str) -> List[Dict[str, Any]]:
         """Get routes for a zone.
 
@@ -176,7 +583,7 @@ class CloudflareClient:
         Returns:
             List of routes
         """
-        return self._request("GET", f"zones/{zone_id}/workers/routes")
+        return list(self.iter_routes(zone_id))
 
     def create_worker_route(
         self,
@@ -200,13 +607,33 @@ class CloudflareClient:
             data={"pattern": pattern, "script": worker_name}
         )
 
+    def iter_kv_namespaces(
+        self,
+        per_page: Optional[int] = None,
+        prefetch: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all KV namespaces in the account, page by page.
+
+        Args:
+            per_page: Page size to request
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            KV namespaces
+        """
+        return self._paginate(
+            f"accounts/{self.account_id}/storage/kv/namespaces",
+            per_page=per_page,
+            prefetch=prefetch
+        )
+
     def list_kv_namespaces(self) -> List[Dict[str, Any]]:
         """List all KV namespaces in the account.
 
         Returns:
             List of KV namespaces
         """
-        return self._request("GET", f"accounts/{self.account_id}/storage/kv/namespaces")
+        return list(self.iter_kv_namespaces())
 
     def create_kv_namespace(self, title: str) -> Dict[str, Any]:
         """Create a KV namespace.
@@ -223,6 +650,260 @@ class CloudflareClient:
             data={"title": title}
         )
 
+    def kv_bulk_put(
+        self,
+        namespace_id: str,
+        pairs: Union[bytes, List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Write up to 10,000 key-value pairs in one request.
+
+        Args:
+            namespace_id: KV namespace ID
+            pairs: Objects with ``key`` and ``value`` (plus optional
+                ``expiration``, ``expiration_ttl``, ``metadata`` and
+                ``base64``), or an already JSON-encoded array of them
+
+        Returns:
+            Bulk write result, including ``unsuccessful_keys`` if any
+        """
+        endpoint = f"accounts/{self.account_id}/storage/kv/namespaces/{namespace_id}/bulk"
+        if isinstance(pairs, (bytes, bytearray, memoryview)):
+            return self._request(
+                "PUT", endpoint, body=pairs, headers={"Content-Type": "application/json"}
+            )
+        return self._request("PUT", endpoint, data=pairs)
+
+    def kv_bulk_delete(self, namespace_id: str, keys: List[str]) -> Dict[str, Any]:
+        """Delete up to 10,000 keys in one request.
+
+        Args:
+            namespace_id: KV namespace ID
+            keys: Key names
+
+        Returns:
+            Bulk delete result
+        """
+        # Deleting keys twice is harmless, so 5xx responses are retried too
+        return self._request(
+            "POST",
+            f"accounts/{self.account_id}/storage/kv/namespaces/{namespace_id}/bulk/delete",
+            data=keys,
+            idempotent=True
+        )
+
+    def iter_kv_keys(
+        self,
+        namespace_id: str,
+        prefix: Optional[str] = None,
+        limit: int = 1000,
+        prefetch: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over the keys of a KV namespace, following the cursor.
+
+        Args:
+            namespace_id: KV namespace ID
+            prefix: Only list keys starting with this prefix
+            limit: Keys per page (maximum 1000)
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            Keys with ``name`` and, when set, ``expiration`` and ``metadata``
+        """
+        params: Dict[str, Any] = {"limit": limit}
+        if prefix:
+            params["prefix"] = prefix
+        return self._paginate(
+            f"accounts/{self.account_id}/storage/kv/namespaces/{namespace_id}/keys",
+            params=params,
+            prefetch=prefetch
+        )
+
+    def get_kv_value(self, namespace_id: str, key: str) -> bytes:
+        """Read the value stored under a KV key.
+
+        Args:
+            namespace_id: KV namespace ID
+            key: Key name
+
+        Returns:
+            Raw value
+
+        Raises:
+            CloudflareAPIError: If the key does not exist (status 404) or the
+                request fails
+        """
+        response = self._request_raw(
+            "GET",
+            f"accounts/{self.account_id}/storage/kv/namespaces/{namespace_id}"
+            f"/values/{quote(key, safe='')}"
+        )
+        return response.content
+
+    def iter_d1_databases(
+        self,
+        per_page: Optional[int] = None,
+        prefetch: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all D1 databases in the account, page by page.
+
+        Args:
+            per_page: Page size to request
+            prefetch: Fetch the next page while the current one is consumed
+
+        Yields:
+            D1 databases
+        """
+        return self._paginate(
+            f"accounts/{self.account_id}/d1/database",
+            per_page=per_page,
+            prefetch=prefetch
+        )
+
+    def list_d1_databases(self) -> List[Dict[str, Any]]:
+        """List all D1 databases in the account.
+
+        Returns:
+            List of D1 databases
+        """
+        return list(self.iter_d1_databases())
+
+    def create_d1_database(self, name: str) -> Dict[str, Any]:
+        """Create a D1 database.
+
+        Args:
+            name: Database name
+
+        Returns:
+            Created database, including its ``uuid``
+        """
+        return self._request("POST", f"accounts/{self.account_id}/d1/database", data={"name": name})
+
+    def get_d1_database(self, database_id: str) -> Dict[str, Any]:
+        """Get details of a D1 database.
+
+        Args:
+            database_id: D1 database ID
+
+        Returns:
+            Database details
+        """
+        return self._request("GET", f"accounts/{self.account_id}/d1/database/{database_id}")
+
+    def delete_d1_database(self, database_id: str) -> Dict[str, Any]:
+        """Delete a D1 database.
+
+        Args:
+            database_id: D1 database ID
+
+        Returns:
+            Delete response
+        """
+        return self._request("DELETE", f"accounts/{self.account_id}/d1/database/{database_id}")
+
+    def query_d1(
+        self,
+        database_id: str,
+        sql: str,
+        params: Optional[List[Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Execute SQL on a D1 database.
+
+        Args:
+            database_id: D1 database ID
+            sql: SQL to run. Without params it may hold several statements
+                separated by semicolons.
+            params: Values for ``?`` placeholders
+
+        Returns:
+            One result per statement, each with ``results`` (rows) and
+            ``meta`` (``duration``, ``rows_read``, ``rows_written``, ...)
+        """
+        data: Dict[str, Any] = {"sql": sql}
+        if params:
+            data["params"] = params
+        return self._request(
+            "POST", f"accounts/{self.account_id}/d1/database/{database_id}/query", data=data
+        )
+
+    def execute_d1_batch(
+        self,
+        database_id: str,
+        statements: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Execute several parameterized statements in one request.
+
+        The statements run in order, in a single transaction.
+
+        Args:
+            database_id: D1 database ID
+            statements: Objects with ``sql`` and optional ``params``
+
+        Returns:
+            One result per statement, as for query_d1()
+        """
+        return self._request(
+            "POST",
+            f"accounts/{self.account_id}/d1/database/{database_id}/query",
+            data={"batch": statements}
+        )
+
+    def iter_d1_results(
+        self,
+        database_id: str,
+        statements: Iterable[StatementLike],
+        concurrency: int = 4,
+        max_batch_bytes: int = DEFAULT_BATCH_BYTES,
+        max_batch_statements: int = DEFAULT_BATCH_STATEMENTS
+    ) -> Iterator[D1Result]:
+        """Execute many statements in as few requests as possible.
+
+        Statements are packed into batches under the payload limits, and up to
+        ``concurrency`` batches run at once. Each batch is its own transaction,
+        so with concurrency above 1 batches must not depend on each other;
+        pass concurrency=1 for ordered writes. Results are yielded in input
+        order as batches finish, and only the batches in flight are held in
+        memory.
+
+        Args:
+            database_id: D1 database ID
+            statements: SQL strings, (sql, params) pairs, D1Statements or
+                dicts with ``sql`` and ``params``, consumed lazily
+            concurrency: Number of batch requests in flight
+            max_batch_bytes: Maximum encoded size of one batch
+            max_batch_statements: Maximum statements per batch
+
+        Yields:
+            One result per statement, with rows and D1's ``meta`` timing
+        """
+        def run(batch):
+            return self.execute_d1_batch(database_id, [stmt.to_json() for _, stmt in batch])
+
+        batches = pack_statements(statements, max_batch_bytes, max_batch_statements)
+        for batch, results in bounded_map(run, batches, max_workers=concurrency, ordered=True):
+            for (index, statement), result in zip(batch, results):
+                yield D1Result(
+                    index, statement, result.get("results") or [], result.get("meta") or {}
+                )
+
+    def iter_d1_rows(
+        self,
+        database_id: str,
+        sql: str,
+        params: Optional[List[Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Run one query and yield its rows.
+
+        Args:
+            database_id: D1 database ID
+            sql: Query
+            params: Values for ``?`` placeholders
+
+        Yields:
+            Rows as dicts
+        """
+        for result in self.iter_d1_results(database_id, [(sql, params or ())], concurrency=1):
+            yield from result.rows
+
     def get_account_info(self) -> Dict[str, Any]:
         """Get account information.
 
@@ -3,11 +3,17 @@
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
 
 
+CONFIG_FILENAME = ".slingshot.json"
+
+# Directories never searched when discovering worker projects
+IGNORED_DIRS = {".git", "node_modules", ".venv", "venv", "__pycache__", "dist", "build"}
+
+
 class Config:
     """Manages configuration for Cloudflare Workers deployment."""
 
@@ -17,7 +23,7 @@ class Config:
         Args:
             config_path: Path to .slingshot.json file. Defaults to current directory.
         """
-        self.config_path = Path(config_path) if config_path else Path.cwd() / ".slingshot.json"
+        self.config_path = Path(config_path) if config_path else Path.cwd() / CONFIG_FILENAME
         self.config_data: Dict[str, Any] = {}
 
         # Load environment variables
@@ -82,6 +88,49 @@ class Config:
         """Get Cloudflare API token from environment."""
         return os.getenv("CLOUDFLARE_API_TOKEN")
 
+    @property
+    def r2_access_key_id(self) -> Optional[str]:
+        """Get R2 S3 API access key ID from environment."""
+        return os.getenv("R2_ACCESS_KEY_ID")
+
+    @property
+    def r2_secret_access_key(self) -> Optional[str]:
+        """Get R2 S3 API secret access key from environment."""
+        return os.getenv("R2_SECRET_ACCESS_KEY")
+
+    @property
+    def r2_endpoint(self) -> Optional[str]:
+        """Get an R2 S3 endpoint override (e.g. for a jurisdiction) from environment."""
+        return os.getenv("R2_ENDPOINT")
+
+    @property
+    def rate_limit(self) -> Optional[float]:
+        """Get client-side API rate limit (requests per second) from environment."""
+        value = os.getenv("SLINGSHOT_RATE_LIMIT")
+        return float(value) if value else None
+
+    @property
+    def rate_limit_burst(self) -> Optional[float]:
+        """Get client-side API rate limit burst size from environment."""
+        value = os.getenv("SLINGSHOT_RATE_LIMIT_BURST")
+        return float(value) if value else None
+
+    @property
+    def rate_limit_file(self) -> Optional[str]:
+        """Get path of the rate limit state file shared between processes."""
+        return os.getenv("SLINGSHOT_RATE_LIMIT_FILE")
+
+    @property
+    def cache_ttl(self) -> Optional[float]:
+        """Get API response cache TTL in seconds; caching is off when unset."""
+        value = os.getenv("SLINGSHOT_CACHE_TTL")
+        return float(value) if value else None
+
+    @property
+    def verify_ttl(self) -> float:
+        """Get how long a successful token verification is reused, in seconds."""
+        return float(os.getenv("SLINGSHOT_VERIFY_TTL", "3600"))
+
     @property
     def worker_name(self) -> Optional[str]:
         """Get worker name from config."""
@@ -92,6 +141,16 @@ class Config:
         """Get main script path from config."""
         return self.get("main", "worker.js")
 
+    @property
+    def project_dir(self) -> Path:
+        """Get the directory containing the config file."""
+        return self.config_path.parent
+
+    @property
+    def main_script_path(self) -> Path:
+        """Get main script path, resolved relative to the config file."""
+        return self.project_dir / self.main_script
+
     @property
     def compatibility_date(self) -> str:
         """Get compatibility date from config."""
@@ -114,12 +173,29 @@ class Config:
         if not self.worker_name:
             errors.append("worker_name not set in config")
 
-        main_path = Path.cwd() / self.main_script
-        if not main_path.exists():
+        if not self.main_script_path.exists():
             errors.append(f"Main script not found: {self.main_script}")
 
         return len(errors) == 0, errors
 
+    @classmethod
+    def discover(cls, root: Optional[str] = None) -> List["Config"]:
+        """Find every worker project config below a directory.
+
+        Args:
+            root: Directory to search. Defaults to current directory.
+
+        Returns:
+            Configs sorted by path
+        """
+        root_path = Path(root) if root else Path.cwd()
+        found = []
+        for dirpath, dirnames, filenames in os.walk(root_path):
+            dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS)
+            if CONFIG_FILENAME in filenames:
+                found.append(cls(str(Path(dirpath) / CONFIG_FILENAME)))
+        return found
+
     @classmethod
     def create_default(cls, worker_name: str, output_path: Optional[str] = None) -> "Config":
         """Create a default configuration file.
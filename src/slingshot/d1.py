@@ -0,0 +1,971 @@
+"""D1 statement batching, result types, bulk import, local mirrors and profiling."""
+
+import csv
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional,
+    Sequence, Tuple, Union
+)
+
+import requests
+
+from .cache import default_cache_dir
+from .parallel import TransferProgress, bounded_map
+
+if TYPE_CHECKING:
+    from .client import CloudflareClient
+
+# Limits of the D1 HTTP API
+D1_MAX_STATEMENT_BYTES = 100_000
+D1_MAX_PARAMS = 100
+
+# Keep request bodies and per-batch result sets moderate
+DEFAULT_BATCH_BYTES = 1024 * 1024
+DEFAULT_BATCH_STATEMENTS = 200
+
+# Rows fetched per query when mirroring a database
+MIRROR_PAGE_ROWS = 1000
+
+# Columns treated as a last-modified timestamp for incremental refreshes
+UPDATED_AT_COLUMNS = ("updated_at", "updatedAt", "modified_at", "modifiedAt")
+
+
+class D1Statement(NamedTuple):
+    """A SQL statement and its bound parameters."""
+
+    sql: str
+    params: Sequence[Any] = ()
+
+    def to_json(self) -> Dict[str, Any]:
+        """Encode for the query endpoint's ``batch`` field."""
+        data: Dict[str, Any] = {"sql": self.sql}
+        if self.params:
+            data["params"] = list(self.params)
+        return data
+
+
+class D1Result(NamedTuple):
+    """The outcome of one statement."""
+
+    index: int
+    statement: D1Statement
+    rows: List[Dict[str, Any]]
+    meta: Dict[str, Any]
+
+    @property
+    def duration(self) -> float:
+        """Execution time reported by D1, in milliseconds."""
+        return float(self.meta.get("duration") or 0.0)
+
+    @property
+    def rows_read(self) -> int:
+        return int(self.meta.get("rows_read") or 0)
+
+    @property
+    def rows_written(self) -> int:
+        return int(self.meta.get("rows_written") or 0)
+
+
+StatementLike = Union[str, D1Statement, Tuple[str, Sequence[Any]], Dict[str, Any]]
+
+
+def as_statement(statement: StatementLike) -> D1Statement:
+    """Coerce SQL text, (sql, params) pairs or dicts into a D1Statement."""
+    if isinstance(statement, D1Statement):
+        return statement
+    if isinstance(statement, str):
+        return D1Statement(statement)
+    if isinstance(statement, dict):
+        return D1Statement(statement["sql"], statement.get("params") or ())
+    sql, params = statement
+    return D1Statement(sql, params or ())
+
+
+def pack_statements(
+    statements: Iterable[StatementLike],
+    max_bytes: int = DEFAULT_BATCH_BYTES,
+    max_statements: int = DEFAULT_BATCH_STATEMENTS
+) -> Iterator[List[Tuple[int, D1Statement]]]:
+    """Group statements into as few query requests as the limits allow.
+
+    Args:
+        statements: Statements, consumed lazily
+        max_bytes: Maximum encoded size of one request's ``batch``
+        max_statements: Maximum statements per request
+
+    Yields:
+        Lists of (input index, statement), in input order
+
+    Raises:
+        ValueError: If a statement exceeds D1's own length or parameter limits
+    """
+    batch: List[Tuple[int, D1Statement]] = []
+    size = 0
+
+    for index, statement in enumerate(statements):
+        statement = as_statement(statement)
+        if len(statement.sql.encode("utf-8")) > D1_MAX_STATEMENT_BYTES:
+            raise ValueError(
+                f"Statement {index} is longer than D1's {D1_MAX_STATEMENT_BYTES} byte limit"
+            )
+        if len(statement.params) > D1_MAX_PARAMS:
+            raise ValueError(
+                f"Statement {index} binds {len(statement.params)} parameters "
+                f"(D1 allows {D1_MAX_PARAMS})"
+            )
+
+        encoded = len(json.dumps(statement.to_json(), separators=(",", ":"))) + 1
+        if batch and (len(batch) >= max_statements or size + encoded > max_bytes):
+            yield batch
+            batch = []
+            size = 0
+        batch.append((index, statement))
+        size += encoded
+
+    if batch:
+        yield batch
+
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+
+# A batch already runs as one transaction, and D1 rejects explicit ones
+_TRANSACTION_RE = re.compile(
+    r"^(BEGIN(\s+(DEFERRED|IMMEDIATE|EXCLUSIVE))?|COMMIT|END)(\s+TRANSACTION)?$", re.I
+)
+
+
+def split_sql(sql: str) -> List[str]:
+    """Split a SQL script into statements.
+
+    Semicolons inside strings, comments and trigger bodies do not end a
+    statement (SQLite's own sqlite3_complete() decides). Comment-only
+    fragments and explicit BEGIN/COMMIT statements are dropped.
+
+    Args:
+        sql: SQL script
+
+    Returns:
+        Statements without their trailing semicolons
+    """
+    statements = []
+    buffer = ""
+    for piece in sql.split(";"):
+        buffer += piece + ";"
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer)
+            buffer = ""
+    if buffer.strip(" \t\r\n;"):
+        statements.append(buffer)
+
+    result = []
+    for statement in statements:
+        statement = statement.strip().rstrip(";").strip()
+        code = _COMMENT_RE.sub(" ", statement).strip()
+        if code and not _TRANSACTION_RE.match(" ".join(code.split())):
+            result.append(statement)
+    return result
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_literal(value: Any) -> str:
+    """Render a Python value as a SQLite literal.
+
+    Args:
+        value: None, bool, int, float, str or bytes
+
+    Returns:
+        SQL literal text
+
+    Raises:
+        TypeError: For unsupported value types
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value) if math.isfinite(value) else "NULL"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "X'" + bytes(value).hex() + "'"
+    raise TypeError(f"Cannot store {type(value).__name__} in D1")
+
+
+INSERT_VERBS = {
+    "insert": "INSERT INTO",
+    "replace": "INSERT OR REPLACE INTO",
+    "ignore": "INSERT OR IGNORE INTO",
+}
+
+
+def insert_statements(
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    mode: str = "insert",
+    max_bytes: int = D1_MAX_STATEMENT_BYTES - 1024
+) -> Iterator[Tuple[str, int]]:
+    """Turn rows into multi-row INSERT statements under D1's size limit.
+
+    Values are inlined as literals rather than bound, because D1 allows only
+    100 parameters per statement but 100 KB of SQL.
+
+    Args:
+        table: Target table
+        columns: Column names, in row order
+        rows: Row tuples, consumed lazily
+        mode: "insert", "replace" or "ignore" (the conflict behaviour)
+        max_bytes: Maximum statement size
+
+    Yields:
+        (statement, number of rows it inserts)
+
+    Raises:
+        ValueError: If a single row does not fit in a statement
+    """
+    head = (f"{INSERT_VERBS[mode]} {quote_identifier(table)} "
+            f"({', '.join(quote_identifier(c) for c in columns)}) VALUES ")
+    head_size = len(head.encode("utf-8"))
+    tuples: List[str] = []
+    size = head_size
+
+    for number, row in enumerate(rows, start=1):
+        if len(row) != len(columns):
+            raise ValueError(f"Row {number} has {len(row)} values, expected {len(columns)}")
+        values = "(" + ",".join(sql_literal(v) for v in row) + ")"
+        value_size = len(values.encode("utf-8"))
+        if head_size + value_size > max_bytes:
+            raise ValueError(f"Row {number} is too large for a single D1 statement")
+        if tuples and size + value_size + 1 > max_bytes:
+            yield head + ",".join(tuples), len(tuples)
+            tuples = []
+            size = head_size
+        size += value_size + (1 if tuples else 0)
+        tuples.append(values)
+
+    if tuples:
+        yield head + ",".join(tuples), len(tuples)
+
+
+def read_csv_rows(path: Path) -> Tuple[List[str], Iterator[List[str]]]:
+    """Stream a CSV file with a header row.
+
+    Files ending in .tsv are read as tab-separated.
+
+    Returns:
+        Tuple of (column names, row iterator). The file is closed once the
+        iterator is exhausted.
+    """
+    f = open(path, "r", encoding="utf-8", newline="", buffering=1024 * 1024)
+    reader = csv.reader(f, delimiter="\t" if Path(path).suffix.lower() == ".tsv" else ",")
+    try:
+        columns = next(reader)
+    except StopIteration:
+        f.close()
+        raise ValueError(f"{path} is empty")
+
+    def rows() -> Iterator[List[str]]:
+        with f:
+            yield from reader
+
+    return columns, rows()
+
+
+def read_sqlite_rows(
+    path: Path,
+    table: str,
+    batch_size: int = 1000
+) -> Tuple[List[str], Iterator[tuple], Optional[str]]:
+    """Stream the rows of a table in a local SQLite database.
+
+    Returns:
+        Tuple of (column names, row iterator, CREATE TABLE statement)
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    if row is None:
+        conn.close()
+        raise ValueError(f"Table '{table}' not found in {path}")
+
+    cursor = conn.execute(f"SELECT * FROM {quote_identifier(table)}")
+    columns = [d[0] for d in cursor.description]
+
+    def rows() -> Iterator[tuple]:
+        try:
+            while True:
+                chunk = cursor.fetchmany(batch_size)
+                if not chunk:
+                    return
+                yield from chunk
+        finally:
+            conn.close()
+
+    return columns, rows(), row[0]
+
+
+_CREATE_TABLE_RE = re.compile(
+    r"""^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?"""
+    r"""(?:"(?:[^"]|"")+"|\[[^\]]+\]|`[^`]+`|[\w$]+)""",
+    re.I
+)
+
+
+def create_table_sql(ddl: str, table: str) -> str:
+    """Rewrite a CREATE TABLE statement for another table name, if not existing."""
+    match = _CREATE_TABLE_RE.match(ddl)
+    if not match:
+        raise ValueError(f"Not a CREATE TABLE statement: {ddl[:60]}")
+    return f"CREATE TABLE IF NOT EXISTS {quote_identifier(table)}" + ddl[match.end():]
+
+
+class ImportCheckpoint:
+    """SQLite record of which chunks of an import have been applied."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize checkpoint store.
+
+        Args:
+            path: SQLite file to store checkpoints in. Defaults to
+                d1import.db in the Slingshot cache directory.
+        """
+        self.path = Path(path) if path else default_cache_dir() / "d1import.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks (import_key TEXT NOT NULL, "
+                "chunk INTEGER NOT NULL, rows INTEGER NOT NULL, "
+                "PRIMARY KEY (import_key, chunk)) WITHOUT ROWID"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection that commits and closes on exit."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def completed(self, import_key: str) -> Dict[int, int]:
+        """Get the chunks already applied, mapped to their row counts."""
+        with self._connect() as conn:
+            return dict(conn.execute(
+                "SELECT chunk, rows FROM chunks WHERE import_key = ?", (import_key,)
+            ))
+
+    def mark(self, import_key: str, chunk: int, rows: int) -> None:
+        """Record a chunk as applied."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chunks (import_key, chunk, rows) VALUES (?, ?, ?)",
+                (import_key, chunk, rows)
+            )
+
+    def clear(self, import_key: str) -> None:
+        """Forget an import, e.g. once it has finished."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM chunks WHERE import_key = ?", (import_key,))
+
+
+def make_import_key(database_id: str, table: str, source: Path, *options: Any) -> str:
+    """Identify an import so an interrupted run can be resumed.
+
+    The key covers the source file's size and mtime and every option that
+    affects chunking, so a changed source starts over instead of resuming.
+    """
+    stat = source.stat()
+    parts = [database_id, table, str(source.resolve()), stat.st_size, stat.st_mtime_ns, *options]
+    return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed chunk is worth sending again.
+
+    Rate limits and connect errors are left out: the client already
+    retries those itself, since they mean the request was not applied.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return False
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and status >= 500
+
+
+def import_rows(
+    client: "CloudflareClient",
+    database_id: str,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    mode: str = "insert",
+    concurrency: int = 4,
+    max_batch_bytes: int = DEFAULT_BATCH_BYTES,
+    checkpoint: Optional[ImportCheckpoint] = None,
+    key: Optional[str] = None,
+    progress: Optional[Callable[[TransferProgress], None]] = None
+) -> Dict[str, Any]:
+    """Insert a stream of rows into a D1 table in parallel, resumably.
+
+    Rows become multi-row INSERT statements, which are grouped into chunks
+    of one batch request each. D1 applies a batch as one transaction, so a
+    chunk is either fully applied or not at all. Chunks recorded in the
+    checkpoint are skipped, and each chunk is recorded as soon as it lands,
+    so an interrupted import resumes where it stopped.
+
+    Failures where the chunk may or may not have been applied (timeouts,
+    dropped connections, 5xx responses) are only retried here with the
+    "replace" and "ignore" modes, where sending a chunk twice is harmless.
+    With "insert" they stop the import, and the chunk is sent again when
+    it is resumed from the checkpoint.
+
+    Args:
+        client: Cloudflare client
+        database_id: D1 database ID
+        table: Target table
+        columns: Column names, in row order
+        rows: Row tuples, consumed lazily
+        mode: "insert", "replace" or "ignore". "replace" and "ignore" make a
+            retried chunk harmless if its first attempt did land, so only
+            they retry chunks whose outcome is unknown.
+        concurrency: Number of chunks in flight
+        max_batch_bytes: Maximum request size of one chunk
+        checkpoint: Where to record applied chunks
+        key: Identifies this import in the checkpoint (see make_import_key())
+        progress: Called after every applied chunk
+
+    Returns:
+        Summary with ``rows``, ``chunks``, ``skipped_rows``, ``retries``,
+        ``duration`` and ``rows_per_second``
+    """
+    done = checkpoint.completed(key) if checkpoint is not None and key else {}
+    stats = TransferProgress()
+    retries = 0
+    policy = client.retry_policy
+    # Replaying an INSERT whose first attempt landed would duplicate rows
+    max_retries = policy.max_retries if mode in ("replace", "ignore") else 0
+    lock = threading.Lock()
+
+    statements = insert_statements(table, columns, rows, mode=mode)
+    chunks = (
+        (number, chunk)
+        for number, chunk in enumerate(_chunk_statements(statements, max_batch_bytes))
+        if number not in done
+    )
+
+    def apply(item: Tuple[int, List[Tuple[str, int]]]) -> int:
+        nonlocal retries
+        number, chunk = item
+        batch = [{"sql": sql} for sql, _ in chunk]
+        attempt = 0
+        while True:
+            try:
+                client.execute_d1_batch(database_id, batch)
+                break
+            except Exception as e:
+                if not _is_transient(e) or attempt >= max_retries:
+                    raise
+                with lock:
+                    retries += 1
+                time.sleep(policy.backoff(attempt))
+                attempt += 1
+        count = sum(n for _, n in chunk)
+        if checkpoint is not None and key:
+            checkpoint.mark(key, number, count)
+        return count
+
+    for _, count in bounded_map(apply, chunks, max_workers=concurrency):
+        stats.add(count)
+        if progress is not None:
+            progress(stats)
+
+    summary = stats.summary()
+    return {
+        "rows": summary["keys"],
+        "chunks": summary["batches"],
+        "skipped_rows": sum(done.values()),
+        "retries": retries,
+        "duration": summary["duration"],
+        "rows_per_second": summary["keys_per_second"],
+    }
+
+
+def _chunk_statements(
+    statements: Iterable[Tuple[str, int]],
+    max_bytes: int
+) -> Iterator[List[Tuple[str, int]]]:
+    """Group (statement, rows) pairs into request-sized chunks."""
+    chunk: List[Tuple[str, int]] = []
+    size = 0
+    for sql, count in statements:
+        encoded = len(json.dumps({"sql": sql})) + 1
+        if chunk and size + encoded > max_bytes:
+            yield chunk
+            chunk = []
+            size = 0
+        chunk.append((sql, count))
+        size += encoded
+    if chunk:
+        yield chunk
+
+
+_WITHOUT_ROWID_RE = re.compile(r"\bWITHOUT\s+ROWID\b[^)]*$", re.I)
+_MIN_ROWID = -(2 ** 63)
+
+
+def _from_json(value: Any) -> Any:
+    """Convert a D1 result value back to a SQLite value (blobs arrive as byte arrays)."""
+    return bytes(value) if isinstance(value, list) else value
+
+
+class D1Mirror:
+    """A local SQLite copy of a D1 database for fast read-only queries.
+
+    Tables are copied page by page. Each page is written in one transaction
+    together with the table's high-water marks (the largest rowid copied
+    and, for tables with an ``updated_at``-style column, the newest
+    timestamp seen), so a refresh only fetches rows added or modified since
+    the last pull, and an interrupted pull picks up where it stopped.
+
+    Deletes are only seen by tables without a rowid, which are copied in
+    full each time, or by a ``full`` refresh.
+    """
+
+    META_TABLE = "_slingshot_mirror"
+
+    def __init__(self, path: Union[str, Path]):
+        """Initialize mirror.
+
+        Args:
+            path: SQLite file holding the mirror, created if missing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.META_TABLE} ("
+                "table_name TEXT PRIMARY KEY, ddl TEXT NOT NULL, mode TEXT NOT NULL, "
+                "max_rowid INTEGER, max_updated, pulled_at REAL)"
+            )
+
+    @staticmethod
+    def default_path(database_id: str) -> Path:
+        """Default mirror location for a database, under the Slingshot cache directory."""
+        return default_cache_dir() / "d1" / f"{database_id}.db"
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection that commits and closes on exit."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def tables(self) -> Dict[str, Dict[str, Any]]:
+        """Get the mirrored tables with their high-water marks and last pull time."""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            return {
+                row["table_name"]: dict(row)
+                for row in conn.execute(f"SELECT * FROM {self.META_TABLE}")
+            }
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> D1Result:
+        """Run a read-only query against the mirror.
+
+        Args:
+            sql: Query
+            params: Values for ``?`` placeholders
+
+        Returns:
+            Result with the rows and the local execution time as ``duration``
+
+        Raises:
+            sqlite3.Error: If the query fails or tries to write
+        """
+        conn = sqlite3.connect(self.path.resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            conn.row_factory = sqlite3.Row
+            start = time.perf_counter()
+            rows = [dict(row) for row in conn.execute(sql, tuple(params))]
+            duration = (time.perf_counter() - start) * 1000
+        finally:
+            conn.close()
+        return D1Result(0, D1Statement(sql, params), rows, {"duration": duration})
+
+    def pull(
+        self,
+        client: "CloudflareClient",
+        database_id: str,
+        tables: Optional[Sequence[str]] = None,
+        full: bool = False,
+        page_size: int = MIRROR_PAGE_ROWS,
+        concurrency: int = 4,
+        progress: Optional[Callable[[TransferProgress], None]] = None
+    ) -> Dict[str, Any]:
+        """Copy new and changed rows from a D1 database into the mirror.
+
+        Tables are pulled concurrently, each as a sequence of keyset-paged
+        queries. A table is copied from scratch the first time, when its
+        schema changed, or when ``full`` is set. Indexes and views are
+        recreated locally so mirrored queries can use them; tables that no
+        longer exist remotely are dropped.
+
+        Args:
+            client: Cloudflare client
+            database_id: D1 database ID
+            tables: Only pull these tables
+            full: Recopy every table instead of refreshing incrementally
+            page_size: Rows fetched per query
+            concurrency: Number of tables pulled at once
+            progress: Called after every page
+
+        Returns:
+            Summary with ``tables`` (per-table ``mode``, ``rows`` and
+            ``reset``), ``rows``, ``rows_read`` (as billed by D1),
+            ``skipped`` (virtual tables), ``dropped`` and ``duration``
+        """
+        schema = client.query_d1(
+            database_id,
+            "SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL "
+            "AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '_cf_%'"
+        )[0].get("results") or []
+        remote = {row["name"]: row["sql"] for row in schema if row["type"] == "table"}
+        skipped = sorted(name for name, ddl in remote.items() if ddl.upper().startswith(
+            "CREATE VIRTUAL"))
+        wanted = [
+            name for name in remote
+            if name not in skipped and (tables is None or name in tables)
+        ]
+        missing = set(tables or ()) - set(remote)
+        if missing:
+            raise ValueError(f"Tables not found in database: {', '.join(sorted(missing))}")
+
+        stats = TransferProgress()
+        lock = threading.Lock()
+
+        def pull_table(name: str) -> Dict[str, Any]:
+            def on_page(rows: int) -> None:
+                with lock:
+                    stats.add(rows)
+                    if progress is not None:
+                        progress(stats)
+
+            return self._pull_table(
+                client, database_id, name, remote[name], full, page_size, on_page
+            )
+
+        results = dict(bounded_map(pull_table, wanted, max_workers=concurrency))
+
+        dropped = []
+        with self._connect() as conn:
+            if tables is None:
+                for name in self.tables():
+                    if name not in remote or name in skipped:
+                        conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(name)}")
+                        conn.execute(
+                            f"DELETE FROM {self.META_TABLE} WHERE table_name = ?", (name,)
+                        )
+                        dropped.append(name)
+            local = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+            for row in schema:
+                if row["type"] in ("index", "view") and row["name"] not in local:
+                    try:
+                        conn.execute(row["sql"])
+                    except sqlite3.OperationalError:
+                        # e.g. an index on a table that was not pulled
+                        pass
+
+        summary = stats.summary()
+        return {
+            "tables": results,
+            "rows": summary["keys"],
+            "rows_read": sum(r["rows_read"] for r in results.values()),
+            "skipped": skipped,
+            "dropped": dropped,
+            "duration": summary["duration"],
+        }
+
+    def _pull_table(
+        self,
+        client: "CloudflareClient",
+        database_id: str,
+        table: str,
+        ddl: str,
+        full: bool,
+        page_size: int,
+        on_page: Callable[[int], None]
+    ) -> Dict[str, Any]:
+        """Pull one table; see pull()."""
+        q = quote_identifier(table)
+        state = self.tables().get(table)
+        reset = full or state is None or state["ddl"] != ddl
+        with self._connect() as conn:
+            if reset:
+                conn.execute(f"DROP TABLE IF EXISTS {q}")
+                conn.execute(ddl)
+                conn.execute(f"DELETE FROM {self.META_TABLE} WHERE table_name = ?", (table,))
+                state = None
+            # Generated columns (hidden 2 and 3) cannot be inserted into
+            columns = [
+                row[1] for row in conn.execute(f"PRAGMA table_xinfo({q})") if row[6] == 0
+            ]
+
+        has_rowid = not _WITHOUT_ROWID_RE.search(ddl)
+        updated = next((c for c in UPDATED_AT_COLUMNS if c in columns), None) if has_rowid else None
+        mode = "updated_at" if updated else "rowid" if has_rowid else "full"
+        max_rowid = state["max_rowid"] if state and state["max_rowid"] is not None else _MIN_ROWID
+        max_updated = state["max_updated"] if state else None
+        select = ", ".join(quote_identifier(c) for c in columns)
+        rows_read = 0
+        fetched = 0
+
+        def fetch(sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+            nonlocal rows_read
+            result = client.query_d1(database_id, sql, params)[0]
+            rows_read += int((result.get("meta") or {}).get("rows_read") or 0)
+            return result.get("results") or []
+
+        def store(rows: List[Dict[str, Any]], first_page: bool = False) -> None:
+            nonlocal fetched, max_rowid, max_updated
+            for row in rows:
+                if has_rowid:
+                    max_rowid = max(max_rowid, row["__rowid__"])
+                value = row.get(updated) if updated else None
+                if value is not None and (
+                    max_updated is None
+                    or (type(value) is type(max_updated) and value > max_updated)
+                ):
+                    max_updated = value
+            with self._connect() as conn:
+                if mode == "full" and first_page:
+                    conn.execute(f"DELETE FROM {q}")
+                if has_rowid:
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO {q} (_rowid_, {select}) "
+                        f"VALUES ({', '.join('?' * (len(columns) + 1))})",
+                        [[row["__rowid__"]] + [_from_json(row.get(c)) for c in columns]
+                         for row in rows]
+                    )
+                else:
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO {q} ({select}) "
+                        f"VALUES ({', '.join('?' * len(columns))})",
+                        [[_from_json(row.get(c)) for c in columns] for row in rows]
+                    )
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.META_TABLE} "
+                    "(table_name, ddl, mode, max_rowid, max_updated, pulled_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (table, ddl, mode, max_rowid if has_rowid else None, max_updated, time.time())
+                )
+            fetched += len(rows)
+            on_page(len(rows))
+
+        if mode == "full":
+            offset = 0
+            while True:
+                rows = fetch(f"SELECT {select} FROM {q} LIMIT ? OFFSET ?", [page_size, offset])
+                store(rows, first_page=offset == 0)
+                if len(rows) < page_size:
+                    break
+                offset += page_size
+        else:
+            # Rows changed since the last pull, at or after the newest
+            # timestamp seen (re-fetching ties is harmless)
+            known_rowid = max_rowid
+            if updated and max_updated is not None and known_rowid > _MIN_ROWID:
+                cursor = [max_updated, _MIN_ROWID]
+                u = quote_identifier(updated)
+                while True:
+                    rows = fetch(
+                        f"SELECT _rowid_ AS __rowid__, {select} FROM {q} "
+                        f"WHERE _rowid_ <= ? AND ({u} > ? OR ({u} = ? AND _rowid_ > ?)) "
+                        f"ORDER BY {u}, _rowid_ LIMIT ?",
+                        [known_rowid, cursor[0], cursor[0], cursor[1], page_size]
+                    )
+                    if rows:
+                        store(rows)
+                        cursor = [rows[-1][updated], rows[-1]["__rowid__"]]
+                    if len(rows) < page_size:
+                        break
+
+            # Rows added since the last pull. An empty table still gets a
+            # state row, so the next pull is incremental.
+            recorded = state is not None
+            while True:
+                rows = fetch(
+                    f"SELECT _rowid_ AS __rowid__, {select} FROM {q} "
+                    f"WHERE _rowid_ > ? ORDER BY _rowid_ LIMIT ?",
+                    [max_rowid, page_size]
+                )
+                if rows or not recorded:
+                    store(rows)
+                    recorded = True
+                if len(rows) < page_size:
+                    break
+
+        return {"mode": mode, "rows": fetched, "reset": reset, "rows_read": rows_read}
+
+
+# Statements that only read, and so are safe to run repeatedly
+_READ_ONLY_RE = re.compile(
+    r"^(SELECT|VALUES|EXPLAIN)\b|^WITH\b(?!.*\)\s*(INSERT|UPDATE|DELETE|REPLACE)\b)", re.I | re.S
+)
+
+# EXPLAIN QUERY PLAN details for full scans ("SCAN t", or "SCAN TABLE t" before SQLite 3.36)
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(?!CONSTANT ROW)([^\s(]\S*)(.*)$")
+
+
+def full_scan(detail: str) -> Optional[str]:
+    """Get what an EXPLAIN QUERY PLAN detail line scans in full, if anything."""
+    match = _SCAN_RE.match(detail)
+    return match.group(1) + match.group(2) if match else None
+
+
+def is_read_only(sql: str) -> bool:
+    """Whether a statement only reads (judged by its leading keyword)."""
+    return bool(_READ_ONLY_RE.match(_COMMENT_RE.sub(" ", sql).strip()))
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of values (0 for none)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class QueryProfile(NamedTuple):
+    """Metrics of one statement over repeated runs."""
+
+    index: int
+    statement: D1Statement
+    durations: List[float]
+    rows_read: List[int]
+    rows_written: List[int]
+    rows_returned: int
+    plan: List[str]
+
+    @property
+    def full_scans(self) -> List[str]:
+        """Tables (or indexes) the query plan scans from end to end."""
+        return [scan for scan in map(full_scan, self.plan) if scan]
+
+    def stats(self) -> Dict[str, float]:
+        """p50 and p95 of duration (ms), rows read and rows written."""
+        return {
+            f"{name}_{label}": percentile(values, p)
+            for name, values in (
+                ("duration", self.durations),
+                ("rows_read", self.rows_read),
+                ("rows_written", self.rows_written),
+            )
+            for label, p in (("p50", 50), ("p95", 95))
+        }
+
+
+def _is_rejected(error: Exception) -> bool:
+    """Whether D1 refused a request (a 4xx, e.g. SQL it cannot plan)."""
+    status = getattr(error, "status_code", None)
+    return status is not None and 400 <= status < 500
+
+
+def _query_plans(
+    client: "CloudflareClient",
+    database_id: str,
+    statements: List[D1Statement],
+    concurrency: int = 1
+) -> List[List[str]]:
+    """EXPLAIN QUERY PLAN every statement, one list of detail lines each.
+
+    The statements are explained in one batch. D1 rejects a batch as a
+    whole if any statement cannot be planned (one reading a table the file
+    drops, say), so then each statement is explained on its own and those
+    that still fail get an empty plan.
+    """
+    plans: List[List[str]] = [[] for _ in statements]
+    explain = [D1Statement("EXPLAIN QUERY PLAN " + st.sql, st.params) for st in statements]
+    try:
+        for result in client.iter_d1_results(database_id, explain, concurrency=concurrency):
+            plans[result.index] = [row.get("detail", "") for row in result.rows]
+        return plans
+    except Exception as e:
+        if not _is_rejected(e):
+            raise
+
+    for i, statement in enumerate(explain):
+        try:
+            for result in client.iter_d1_results(database_id, [statement], concurrency=1):
+                plans[i] = [row.get("detail", "") for row in result.rows]
+        except Exception as e:
+            if not _is_rejected(e):
+                raise
+    return plans
+
+
+def profile_statements(
+    client: "CloudflareClient",
+    database_id: str,
+    statements: Iterable[StatementLike],
+    runs: int = 5,
+    concurrency: int = 1
+) -> List[QueryProfile]:
+    """Run statements repeatedly and collect D1's per-statement metrics.
+
+    Each run executes all statements through iter_d1_results(), so a run
+    costs as few requests as the batch limits allow; runs are sequential,
+    so timings of one run are not skewed by the next. The query plans are
+    fetched after the runs (EXPLAIN QUERY PLAN reads no rows), so tables
+    the file itself creates exist by then.
+
+    Args:
+        client: Cloudflare client
+        database_id: D1 database ID
+        statements: Statements to profile
+        runs: Number of times each statement is executed
+        concurrency: Number of batches of one run in flight
+
+    Returns:
+        One profile per statement, in input order
+    """
+    statements = [as_statement(statement) for statement in statements]
+    durations: List[List[float]] = [[] for _ in statements]
+    rows_read: List[List[int]] = [[] for _ in statements]
+    rows_written: List[List[int]] = [[] for _ in statements]
+    returned = [0] * len(statements)
+    for _ in range(runs):
+        for result in client.iter_d1_results(database_id, statements, concurrency=concurrency):
+            durations[result.index].append(result.duration)
+            rows_read[result.index].append(result.rows_read)
+            rows_written[result.index].append(result.rows_written)
+            returned[result.index] = len(result.rows)
+
+    plans = _query_plans(client, database_id, statements, concurrency=concurrency)
+    return [
+        QueryProfile(i, statement, durations[i], rows_read[i], rows_written[i], returned[i],
+                     plans[i])
+        for i, statement in enumerate(statements)
+    ]
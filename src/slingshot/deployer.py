@@ -1,10 +1,20 @@
 """Worker deployment logic."""
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 
-from .client import CloudflareClient
+from .bundler import BuildCache, BuildError, Bundler
+from .cache import ResponseCache, TokenVerificationCache
+from .client import CloudflareAPIError, CloudflareClient
 from .config import Config
+from .modules import ModuleGraphCache, ModuleResolutionError, WorkerModule, resolve_module_graph
+from .ratelimit import build_rate_limiter
+from .state import DeployStateStore, deployment_digest
 
 
 class DeploymentError(Exception):
@@ -12,14 +22,65 @@ class DeploymentError(Exception):
     pass
 
 
+class AuthenticationError(DeploymentError):
+    """Exception raised when the API rejects the configured credentials."""
+    pass
+
+
+class RemoteEtags:
+    """Etags of the scripts deployed in an account, listed at most once.
+
+    One instance is shared by every deployer using the same client, so
+    checking N workers for remote changes costs one listing, not N.
+    """
+
+    def __init__(self, client: CloudflareClient):
+        self.client = client
+        self._etags: Optional[Dict[str, Optional[str]]] = None
+        self._lock = threading.Lock()
+
+    def get(self, worker_name: str) -> Optional[str]:
+        """Get a script's etag, or None if it is not deployed.
+
+        Raises:
+            CloudflareAPIError: If the scripts cannot be listed
+        """
+        with self._lock:
+            if self._etags is None:
+                self._etags = {
+                    worker.get("id"): worker.get("etag") for worker in self.client.iter_workers()
+                }
+            return self._etags.get(worker_name)
+
+    def set(self, worker_name: str, etag: Optional[str]) -> None:
+        """Record the etag of a script just uploaded."""
+        with self._lock:
+            if self._etags is not None:
+                self._etags[worker_name] = etag
+
+
 class WorkerDeployer:
     """Handles deployment of Cloudflare Workers."""
 
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        client: Optional[CloudflareClient] = None,
+        state: Optional[DeployStateStore] = None,
+        module_cache: Optional[ModuleGraphCache] = None,
+        remote_etags: Optional[RemoteEtags] = None
+    ):
         """Initialize deployer.
 
         Args:
             config: Configuration instance
+            client: Existing client to share with other deployers. Created
+                from the configuration if not given.
+            state: Existing deploy state store to share with other deployers
+            module_cache: Existing module graph cache to share with other
+                deployers
+            remote_etags: Remote script etags to share with other deployers
+                using the same client
         """
         self.config = config
 
@@ -29,11 +90,140 @@ class WorkerDeployer:
             raise DeploymentError(f"Invalid configuration:\n" + "\n".join(f"  - {e}" for e in errors))
 
         # Initialize Cloudflare client
-        self.client = CloudflareClient(
+        self.client = client or self.build_client(config)
+        self.remote_etags = remote_etags or RemoteEtags(self.client)
+
+        # Local stores are opened on first use, so commands that never touch
+        # them (list, info) do not create their SQLite files
+        if state is not None:
+            self.state = state
+        if module_cache is not None:
+            self.module_cache = module_cache
+
+    @cached_property
+    def verification_cache(self) -> Optional[TokenVerificationCache]:
+        """Token verification cache, or None if disabled."""
+        ttl = self.config.verify_ttl
+        return TokenVerificationCache(ttl=ttl) if ttl > 0 else None
+
+    @cached_property
+    def state(self) -> DeployStateStore:
+        """Record of what was last deployed, for skipping unchanged uploads."""
+        return DeployStateStore()
+
+    @cached_property
+    def module_cache(self) -> ModuleGraphCache:
+        """Cache of resolved module import graphs."""
+        return ModuleGraphCache()
+
+    @cached_property
+    def build_cache(self) -> BuildCache:
+        """Cache of transformed modules for bundling."""
+        return BuildCache()
+
+    @staticmethod
+    def build_client(
+        config: Config,
+        pool_maxsize: int = CloudflareClient.DEFAULT_POOL_MAXSIZE
+    ) -> CloudflareClient:
+        """Create a Cloudflare client from configuration.
+
+        Args:
+            config: Configuration instance
+            pool_maxsize: Number of keep-alive connections to pool
+
+        Returns:
+            Configured client
+        """
+        return CloudflareClient(
             account_id=config.account_id,
-            api_token=config.api_token
+            api_token=config.api_token,
+            pool_maxsize=pool_maxsize,
+            rate_limiter=build_rate_limiter(
+                config.rate_limit,
+                burst=config.rate_limit_burst,
+                state_path=config.rate_limit_file
+            ),
+            cache=ResponseCache(ttl=config.cache_ttl) if config.cache_ttl else None
         )
 
+    def resolve_script_path(self, script_path: Optional[str] = None) -> Path:
+        """Resolve the worker script path.
+
+        Args:
+            script_path: Path to script file. Defaults to config main script.
+
+        Returns:
+            Path to the script
+
+        Raises:
+            DeploymentError: If script file does not exist
+        """
+        path = Path(script_path) if script_path else self.config.main_script_path
+
+        if not path.exists():
+            raise DeploymentError(f"Script file not found: {path}")
+
+        return path
+
+    def resolve_modules(self, script_path: Optional[str] = None) -> List[WorkerModule]:
+        """Resolve every module the worker script imports, transitively.
+
+        Args:
+            script_path: Path to script file. Defaults to config main script.
+
+        Returns:
+            Modules to upload, main module first
+
+        Raises:
+            DeploymentError: If the script or one of its imports cannot be found
+        """
+        path = self.resolve_script_path(script_path).resolve()
+        root = self.config.project_dir.resolve()
+        if root not in path.parents:
+            root = path.parent
+
+        try:
+            return resolve_module_graph(path, root, cache=self.module_cache)
+        except (ModuleResolutionError, OSError, ValueError) as e:
+            raise DeploymentError(f"Failed to resolve worker modules: {e}")
+
+    def build(self, outfile: Optional[str] = None, minify: bool = True) -> Dict[str, Any]:
+        """Bundle the worker's local modules into a single script.
+
+        Unchanged files are served from the build cache, so rebuilding after
+        editing one module only transforms that module.
+
+        Args:
+            outfile: Where to write the bundle. Defaults to dist/<main script
+                name> in the project directory.
+            minify: Strip whitespace as well as comments
+
+        Returns:
+            Build result with the output path and cache statistics
+
+        Raises:
+            DeploymentError: If the worker cannot be bundled
+        """
+        entry = self.resolve_script_path()
+        out_path = Path(outfile) if outfile else self.config.project_dir / "dist" / entry.name
+
+        try:
+            result = Bundler(cache=self.build_cache, minify=minify).build(entry)
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            out_path.write_text(result.code, encoding="utf-8")
+        except (BuildError, OSError, UnicodeDecodeError) as e:
+            raise DeploymentError(f"Failed to build worker: {e}")
+
+        return {
+            "worker_name": self.config.worker_name,
+            "outfile": str(out_path),
+            "size": out_path.stat().st_size,
+            "modules": len(result.modules),
+            "transformed": result.transformed,
+            "cached": result.cached,
+        }
+
     def read_script(self, script_path: Optional[str] = None) -> str:
         """Read worker script from file.
 
@@ -46,10 +236,7 @@ class WorkerDeployer:
         Raises:
             DeploymentError: If script file cannot be read
         """
-        path = Path(script_path) if script_path else Path.cwd() / self.config.main_script
-
-        if not path.exists():
-            raise DeploymentError(f"Script file not found: {path}")
+        path = self.resolve_script_path(script_path)
 
         try:
             with open(path, 'r', encoding='utf-8') as f:
@@ -94,12 +281,49 @@ class WorkerDeployer:
 
         return metadata
 
-    def deploy(self, script_path: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+    def is_unchanged(self, digest: str, verify_remote: bool = True) -> bool:
+        """Check whether this exact script and metadata are already deployed.
+
+        Args:
+            digest: Digest from deployment_digest()
+            verify_remote: Also confirm the remote script's etag still matches
+                the one recorded at deploy time
+
+        Returns:
+            True if the upload can be skipped
+        """
+        worker_name = self.config.worker_name
+        record = self.state.get(self.config.account_id, worker_name)
+        if record is None or record["digest"] != digest:
+            return False
+        if not verify_remote or not record["etag"]:
+            return True
+
+        # Someone may have deployed over us from another machine
+        try:
+            return self.remote_etags.get(worker_name) == record["etag"]
+        except CloudflareAPIError:
+            # Cannot tell; uploading again is the safe choice
+            return False
+
+    def deploy(
+        self,
+        script_path: Optional[str] = None,
+        dry_run: bool = False,
+        force: bool = False,
+        verify_remote: bool = True
+    ) -> Dict[str, Any]:
         """Deploy worker to Cloudflare.
 
+        The upload is skipped when the script and metadata digest matches the
+        last successful deploy of this worker, unless force is set.
+
         Args:
             script_path: Path to script file. Defaults to config main script.
             dry_run: If True, validate but don't actually deploy
+            force: If True, upload even if nothing changed
+            verify_remote: Confirm an unchanged digest against the remote
+                script's etag before skipping
 
         Returns:
             Deployment result
@@ -109,37 +333,190 @@ class WorkerDeployer:
         """
         worker_name = self.config.worker_name
 
-        # Read script
-        script_content = self.read_script(script_path)
+        # Locate modules; they are streamed from disk rather than read into memory
+        modules = self.resolve_modules(script_path)
+        script_size = sum(module.path.stat().st_size for module in modules)
 
         # Prepare metadata
+        # Parts are named after their module, so main_module must use the same name
         metadata = self.prepare_metadata()
+        metadata["main_module"] = modules[0].name
+        digest = deployment_digest([(m.name, m.path) for m in modules], metadata)
 
         if dry_run:
             return {
                 "worker_name": worker_name,
-                "script_size": len(script_content),
+                "script_size": script_size,
+                "modules": [module.name for module in modules],
                 "metadata": metadata,
+                "digest": digest,
                 "status": "dry_run"
             }
 
+        if not force and self.is_unchanged(digest, verify_remote=verify_remote):
+            return {
+                "worker_name": worker_name,
+                "script_size": script_size,
+                "digest": digest,
+                "deployed": False,
+                "status": "skipped",
+                "reason": "unchanged"
+            }
+
         # Deploy to Cloudflare
         try:
-            result = self.client.upload_worker(
-                worker_name=worker_name,
-                script_content=script_content,
-                metadata=metadata
-            )
+            with ExitStack() as stack:
+                parts = [
+                    (m.name, stack.enter_context(open(m.path, 'rb')), m.content_type)
+                    for m in modules
+                ]
+                result = self.client.upload_worker_modules(
+                    worker_name=worker_name,
+                    modules=parts,
+                    metadata=metadata
+                )
+
+            etag = result.get("etag") if isinstance(result, dict) else None
+            self.state.record(self.config.account_id, worker_name, digest, etag)
+            self.remote_etags.set(worker_name, etag)
 
             return {
                 "worker_name": worker_name,
-                "script_size": len(script_content),
+                "script_size": script_size,
+                "modules": [module.name for module in modules],
+                "digest": digest,
                 "deployed": True,
                 "result": result
             }
+        except CloudflareAPIError as e:
+            if e.status_code in (401, 403):
+                if self.verification_cache is not None:
+                    self.verification_cache.forget(self.config.api_token)
+                raise AuthenticationError(f"Invalid API credentials: {e}")
+            raise DeploymentError(f"Failed to deploy worker: {e}")
         except Exception as e:
             raise DeploymentError(f"Failed to deploy worker: {e}")
 
+    def timed_deploy(self, dry_run: bool = False, force: bool = False) -> Dict[str, Any]:
+        """Deploy and report the outcome instead of raising.
+
+        Args:
+            dry_run: If True, validate but don't actually deploy
+            force: If True, upload even if nothing changed
+
+        Returns:
+            Result with ``worker_name``, ``status`` ("deployed", "skipped",
+            "dry_run" or "failed"), ``duration`` in seconds and ``error`` on
+            failure
+        """
+        started = time.perf_counter()
+        try:
+            result = self.deploy(dry_run=dry_run, force=force)
+        except Exception as e:
+            return {
+                "worker_name": self.config.worker_name,
+                "status": "failed",
+                "error": str(e),
+                "duration": time.perf_counter() - started
+            }
+
+        result.setdefault("status", "deployed")
+        result["duration"] = time.perf_counter() - started
+        return result
+
+    @classmethod
+    def iter_deploy_many(
+        cls,
+        configs: Iterable[Config],
+        max_workers: int = 8,
+        dry_run: bool = False,
+        force: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """Deploy several workers concurrently, yielding results as they finish.
+
+        Workers that share an account and token share one pooled client and
+        one listing of remote etags, and all workers share one deploy state
+        store and module graph cache.
+
+        Args:
+            configs: Configurations of the workers to deploy
+            max_workers: Maximum number of uploads in flight at once
+            dry_run: If True, validate but don't actually deploy
+            force: If True, upload even unchanged workers
+
+        Yields:
+            Per-worker results in completion order (see timed_deploy)
+        """
+        clients: Dict[Tuple[str, str], CloudflareClient] = {}
+        remote_etags: Dict[Tuple[str, str], RemoteEtags] = {}
+        deployers = []
+        state = DeployStateStore()
+        module_cache = ModuleGraphCache()
+
+        try:
+            for config in configs:
+                key = (config.account_id, config.api_token)
+                try:
+                    if key not in clients and config.account_id and config.api_token:
+                        clients[key] = cls.build_client(
+                            config,
+                            pool_maxsize=max(max_workers, CloudflareClient.DEFAULT_POOL_MAXSIZE)
+                        )
+                        remote_etags[key] = RemoteEtags(clients[key])
+                    deployers.append(cls(
+                        config, client=clients.get(key), state=state, module_cache=module_cache,
+                        remote_etags=remote_etags.get(key)
+                    ))
+                except DeploymentError as e:
+                    yield {
+                        "worker_name": config.worker_name or str(config.config_path),
+                        "status": "failed",
+                        "error": str(e),
+                        "duration": 0.0
+                    }
+
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = [pool.submit(d.timed_deploy, dry_run, force) for d in deployers]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            for client in clients.values():
+                client.close()
+
+    @classmethod
+    def deploy_many(
+        cls,
+        configs: Iterable[Config],
+        max_workers: int = 8,
+        dry_run: bool = False,
+        force: bool = False
+    ) -> Dict[str, Any]:
+        """Deploy several workers concurrently.
+
+        Args:
+            configs: Configurations of the workers to deploy
+            max_workers: Maximum number of uploads in flight at once
+            dry_run: If True, validate but don't actually deploy
+            force: If True, upload even unchanged workers
+
+        Returns:
+            Aggregate report with per-worker results and timing
+        """
+        started = time.perf_counter()
+        results = list(cls.iter_deploy_many(
+            configs, max_workers=max_workers, dry_run=dry_run, force=force
+        ))
+        failed = sum(1 for r in results if r["status"] == "failed")
+        skipped = sum(1 for r in results if r["status"] == "skipped")
+        return {
+            "results": results,
+            "count": len(results),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "skipped": skipped,
+            "duration": time.perf_counter() - started
+        }
+
     def delete(self) -> Dict[str, Any]:
         """Delete worker from Cloudflare.
 
@@ -153,6 +530,7 @@ class WorkerDeployer:
 
         try:
             result = self.client.delete_worker(worker_name)
+            self.state.forget(self.config.account_id, worker_name)
             return {
                 "worker_name": worker_name,
                 "deleted": True,
@@ -190,16 +568,31 @@ class WorkerDeployer:
         except Exception as e:
             raise DeploymentError(f"Failed to list workers: {e}")
 
-    def verify_connection(self) -> bool:
+    def verify_connection(self, use_cache: bool = True) -> bool:
         """Verify connection to Cloudflare API.
 
+        A successful verification is remembered per token fingerprint, so
+        repeated deploys within the TTL skip the round trip.
+
+        Args:
+            use_cache: If False, always ask the API
+
         Returns:
             True if connection is valid
 
         Raises:
             DeploymentError: If connection verification fails
         """
+        token = self.config.api_token
+        cache = self.verification_cache if use_cache else None
+        if cache is not None and cache.is_verified(token):
+            return True
+
         try:
-            return self.client.verify_token()
+            valid = self.client.verify_token()
         except Exception as e:
             raise DeploymentError(f"Failed to verify connection: {e}")
+
+        if valid and self.verification_cache is not None:
+            self.verification_cache.mark_verified(token)
+        return valid
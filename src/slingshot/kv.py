@@ -0,0 +1,532 @@
+"""Bulk Workers KV transfers: streaming readers, batch packing and upload."""
+
+import base64
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any, Callable, Dict, IO, Iterable, Iterator, List, NamedTuple, Optional, TypeVar
+)
+
+from .cache import default_cache_dir
+from .client import CloudflareAPIError, CloudflareClient
+from .parallel import TransferProgress, bounded_map
+
+# Limits of the KV bulk endpoints
+KV_BULK_MAX_KEYS = 10_000
+KV_BULK_MAX_BYTES = 100 * 1024 * 1024
+
+# Smaller than the API limit so a few batches in flight stay cheap to hold
+DEFAULT_BATCH_BYTES = 8 * 1024 * 1024
+
+_RECORD_FIELDS = ("key", "value", "expiration", "expiration_ttl", "metadata", "base64")
+
+T = TypeVar("T")
+
+
+class KVBatch(NamedTuple):
+    """A JSON-encoded array of KV records, ready to send."""
+
+    payload: bytes
+    count: int
+
+
+def _open_text(path: Path) -> IO[str]:
+    """Open a possibly gzip-compressed text file for buffered reading."""
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="", buffering=1024 * 1024)
+
+
+def detect_format(path: Path) -> str:
+    """Guess a dataset's format ("jsonl" or "csv") from its file name."""
+    suffixes = [s.lower() for s in path.suffixes if s.lower() != ".gz"]
+    if suffixes and suffixes[-1] == ".csv":
+        return "csv"
+    return "jsonl"
+
+
+def iter_records(path: Path, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream KV records from a JSONL or CSV file, one at a time.
+
+    JSONL lines are objects with ``key`` and ``value`` and optionally
+    ``expiration``, ``expiration_ttl``, ``metadata`` and ``base64``. CSV files
+    need a header row with the same column names; ``metadata`` holds JSON.
+    Files ending in ``.gz`` are decompressed on the fly.
+
+    Args:
+        path: Dataset file
+        fmt: "jsonl" or "csv". Detected from the file name if not given.
+
+    Yields:
+        Records with a string ``value``
+
+    Raises:
+        ValueError: If a record is malformed
+    """
+    path = Path(path)
+    fmt = fmt or detect_format(path)
+
+    with _open_text(path) as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for line_no, row in enumerate(reader, start=2):
+                record = {
+                    k: v for k, v in row.items() if k in _RECORD_FIELDS and v not in ("", None)
+                }
+                for field in ("expiration", "expiration_ttl"):
+                    if field in record:
+                        record[field] = int(record[field])
+                if "metadata" in record:
+                    record["metadata"] = json.loads(record["metadata"])
+                if "base64" in record:
+                    record["base64"] = record["base64"].lower() in ("1", "true", "yes")
+                yield _normalize(record, f"{path}:{line_no}")
+        elif fmt == "jsonl":
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_no}: invalid JSON: {e}")
+                yield _normalize(record, f"{path}:{line_no}")
+        else:
+            raise ValueError(f"Unknown dataset format: {fmt}")
+
+
+def _normalize(record: Any, where: str) -> Dict[str, Any]:
+    """Check a record and coerce its value to a string."""
+    if not isinstance(record, dict) or "key" not in record or "value" not in record:
+        raise ValueError(f"{where}: records need 'key' and 'value'")
+    record = {k: v for k, v in record.items() if k in _RECORD_FIELDS}
+    record["key"] = str(record["key"])
+    if not isinstance(record["value"], str):
+        record["value"] = json.dumps(record["value"], separators=(",", ":"))
+    return record
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """Encode one record as compact JSON."""
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def pack_batches(
+    records: Iterable[Dict[str, Any]],
+    max_keys: int = KV_BULK_MAX_KEYS,
+    max_bytes: int = DEFAULT_BATCH_BYTES
+) -> Iterator[KVBatch]:
+    """Pack records into JSON arrays that fit the bulk API's limits.
+
+    Args:
+        records: Records to pack, consumed lazily
+        max_keys: Maximum records per batch
+        max_bytes: Maximum encoded size of a batch, brackets and commas included
+
+    Yields:
+        Batches in input order
+
+    Raises:
+        ValueError: If a single record exceeds max_bytes on its own
+    """
+    max_keys = min(max_keys, KV_BULK_MAX_KEYS)
+    max_bytes = min(max_bytes, KV_BULK_MAX_BYTES)
+    parts = []
+    size = 2  # "[" and "]"
+
+    for record in records:
+        encoded = encode_record(record)
+        if len(encoded) + 2 > max_bytes:
+            raise ValueError(f"Record '{record['key']}' is larger than the batch size limit")
+        extra = len(encoded) + (1 if parts else 0)
+        if parts and (len(parts) >= max_keys or size + extra > max_bytes):
+            yield KVBatch(b"[" + b",".join(parts) + b"]", len(parts))
+            parts = []
+            size = 2
+            extra = len(encoded)
+        parts.append(encoded)
+        size += extra
+
+    if parts:
+        yield KVBatch(b"[" + b",".join(parts) + b"]", len(parts))
+
+
+def iter_key_file(path: Path) -> Iterator[str]:
+    """Stream key names from a file with one key per line (optionally .gz)."""
+    with _open_text(Path(path)) as f:
+        for line in f:
+            key = line.rstrip("\r\n")
+            if key:
+                yield key
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Group an iterable into lists of at most size items, lazily."""
+    chunk: List[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def bulk_import(
+    client: CloudflareClient,
+    namespace_id: str,
+    records: Iterable[Dict[str, Any]],
+    concurrency: int = 4,
+    max_keys: int = KV_BULK_MAX_KEYS,
+    max_bytes: int = DEFAULT_BATCH_BYTES,
+    progress: Optional[Callable[[TransferProgress], None]] = None
+) -> Dict[str, Any]:
+    """Write a stream of records to a KV namespace with concurrent bulk calls.
+
+    Memory use is bounded by the number of batches in flight, regardless of
+    how many records the stream holds.
+
+    Args:
+        client: Cloudflare client
+        namespace_id: KV namespace ID
+        records: Records to write, consumed lazily
+        concurrency: Number of bulk requests in flight
+        max_keys: Maximum records per bulk request
+        max_bytes: Maximum payload size per bulk request
+        progress: Called after every finished batch
+
+    Returns:
+        Summary with ``keys``, ``bytes``, ``batches``, ``failed``,
+        ``duration``, ``keys_per_second`` and up to 100 ``failed_keys``
+    """
+    stats = TransferProgress()
+    failed_keys = []
+
+    def upload(batch: KVBatch) -> Dict[str, Any]:
+        return client.kv_bulk_put(namespace_id, batch.payload) or {}
+
+    batches = pack_batches(records, max_keys=max_keys, max_bytes=max_bytes)
+    for batch, result in bounded_map(upload, batches, max_workers=concurrency):
+        unsuccessful = result.get("unsuccessful_keys") or []
+        failed_keys.extend(unsuccessful[:100 - len(failed_keys)])
+        stats.add(batch.count - len(unsuccessful), len(batch.payload), len(unsuccessful))
+        if progress is not None:
+            progress(stats)
+
+    return {**stats.summary(), "failed_keys": failed_keys}
+
+
+def bulk_delete(
+    client: CloudflareClient,
+    namespace_id: str,
+    keys: Iterable[str],
+    concurrency: int = 4,
+    batch_size: int = KV_BULK_MAX_KEYS,
+    dry_run: bool = False,
+    progress: Optional[Callable[[TransferProgress], None]] = None
+) -> Dict[str, Any]:
+    """Delete a stream of keys with concurrent bulk calls.
+
+    Every request goes through the client's rate limiter and retry policy.
+
+    Args:
+        client: Cloudflare client
+        namespace_id: KV namespace ID
+        keys: Key names, consumed lazily (e.g. from iter_kv_keys())
+        concurrency: Number of bulk requests in flight
+        batch_size: Keys per request (at most 10,000)
+        dry_run: Only count the keys that would be deleted
+        progress: Called after every finished batch
+
+    Returns:
+        Summary with ``keys``, ``batches``, ``duration``, ``keys_per_second``
+        and ``dry_run``
+    """
+    stats = TransferProgress()
+    batches = chunked(keys, min(batch_size, KV_BULK_MAX_KEYS))
+
+    if dry_run:
+        for batch in batches:
+            stats.add(len(batch))
+            if progress is not None:
+                progress(stats)
+    else:
+        def delete(batch: List[str]) -> None:
+            client.kv_bulk_delete(namespace_id, batch)
+
+        for batch, _ in bounded_map(delete, batches, max_workers=concurrency):
+            stats.add(len(batch))
+            if progress is not None:
+                progress(stats)
+
+    summary = stats.summary()
+    del summary["bytes"], summary["failed"]
+    return {**summary, "dry_run": dry_run}
+
+
+def _export_line(entry: Dict[str, Any], value: bytes) -> bytes:
+    """Encode one exported key as a JSONL line in the import format."""
+    record: Dict[str, Any] = {"key": entry["name"]}
+    try:
+        record["value"] = value.decode("utf-8")
+    except UnicodeDecodeError:
+        record["value"] = base64.b64encode(value).decode("ascii")
+        record["base64"] = True
+    if entry.get("expiration"):
+        record["expiration"] = entry["expiration"]
+    if entry.get("metadata") is not None:
+        record["metadata"] = entry["metadata"]
+    return encode_record(record) + b"\n"
+
+
+def export_namespace(
+    client: CloudflareClient,
+    namespace_id: str,
+    path: Path,
+    prefix: Optional[str] = None,
+    concurrency: int = 16,
+    compresslevel: int = 6,
+    progress: Optional[Callable[[TransferProgress], None]] = None
+) -> Dict[str, Any]:
+    """Snapshot a KV namespace to a (gzip-compressed) JSONL file.
+
+    Keys are listed page by page while values are fetched by a bounded pool,
+    so memory use does not grow with the namespace. Lines are written in the
+    order values arrive and use the same format ``kv import`` reads; binary
+    values are base64-encoded. The file is written under a temporary name
+    and renamed into place once complete.
+
+    Args:
+        client: Cloudflare client
+        namespace_id: KV namespace ID
+        path: Output file; gzip-compressed if it ends in ``.gz``
+        prefix: Only export keys starting with this prefix
+        concurrency: Number of value reads in flight
+        compresslevel: gzip compression level
+        progress: Called after every exported key
+
+    Returns:
+        Summary with ``keys``, ``bytes`` (uncompressed), ``missing`` (keys
+        deleted while exporting), ``duration`` and ``keys_per_second``
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".partial")
+    stats = TransferProgress()
+    missing = 0
+
+    def fetch(entry: Dict[str, Any]) -> Optional[bytes]:
+        try:
+            return client.get_kv_value(namespace_id, entry["name"])
+        except CloudflareAPIError as e:
+            if e.status_code == 404:
+                return None
+            raise
+
+    keys = client.iter_kv_keys(namespace_id, prefix=prefix, prefetch=True)
+    if path.suffix == ".gz":
+        out = gzip.open(tmp_path, "wb", compresslevel=compresslevel)
+    else:
+        out = open(tmp_path, "wb")
+
+    try:
+        with out:
+            for entry, value in bounded_map(fetch, keys, max_workers=concurrency):
+                if value is None:
+                    missing += 1
+                    continue
+                line = _export_line(entry, value)
+                out.write(line)
+                stats.add(1, len(line))
+                if progress is not None:
+                    progress(stats)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    summary = stats.summary()
+    del summary["batches"], summary["failed"]
+    return {**summary, "missing": missing}
+
+
+def record_hash(record: Dict[str, Any]) -> str:
+    """Hash everything about a record that a put would change."""
+    encoded = json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class KVSyncIndex:
+    """SQLite record of the key -> value hash last synced to each namespace.
+
+    Lets ``sync()`` send only the difference between a new dataset and the
+    previous one, instead of re-uploading everything.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize sync index.
+
+        Args:
+            path: SQLite file to store the index in. Defaults to kvsync.db in
+                the Slingshot cache directory.
+        """
+        self.path = Path(path) if path else default_cache_dir() / "kvsync.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv_index ("
+                "account_id TEXT NOT NULL, namespace_id TEXT NOT NULL, key TEXT NOT NULL, "
+                "hash TEXT NOT NULL, PRIMARY KEY (account_id, namespace_id, key)) WITHOUT ROWID"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection that commits and closes on exit."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def count(self, account_id: str, namespace_id: str) -> int:
+        """Number of keys recorded for a namespace."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM kv_index WHERE account_id = ? AND namespace_id = ?",
+                (account_id, namespace_id)
+            ).fetchone()[0]
+
+    def forget(self, account_id: str, namespace_id: str) -> None:
+        """Drop everything recorded for a namespace."""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM kv_index WHERE account_id = ? AND namespace_id = ?",
+                (account_id, namespace_id)
+            )
+
+    def sync(
+        self,
+        client: CloudflareClient,
+        namespace_id: str,
+        records: Iterable[Dict[str, Any]],
+        concurrency: int = 4,
+        max_bytes: int = DEFAULT_BATCH_BYTES,
+        dry_run: bool = False,
+        full: bool = False,
+        progress: Optional[Callable[[TransferProgress], None]] = None
+    ) -> Dict[str, Any]:
+        """Make a namespace match a dataset by sending only the delta.
+
+        In one streaming pass, each record's hash is compared with the index
+        and only new or changed records are bulk-written. Keys recorded by the
+        previous sync but absent from the dataset are then bulk-deleted.
+        Records with ``expiration_ttl`` are always written, since rewriting
+        them is what refreshes the TTL. Keys written by other tools are not
+        known to the index and are left alone.
+
+        The index is only updated for writes and deletes that succeeded, so
+        an interrupted sync is simply repeated by the next one.
+
+        Args:
+            client: Cloudflare client
+            namespace_id: KV namespace ID
+            records: The complete new dataset, consumed lazily
+            concurrency: Number of bulk requests in flight
+            max_bytes: Maximum payload size per bulk write
+            dry_run: Only count the puts and deletes that would be sent
+            full: Ignore recorded hashes and write every record
+
+        Returns:
+            Summary with ``puts``, ``deletes``, ``unchanged``, ``failed``,
+            ``failed_keys``, ``duration`` and ``dry_run``
+
+        Raises:
+            ValueError: If the dataset contains the same key twice
+        """
+        started = time.monotonic()
+        account_id = client.account_id
+        scope = (account_id, namespace_id)
+        unchanged = 0
+
+        with self._connect() as conn:
+            conn.execute("CREATE TEMP TABLE seen (key TEXT PRIMARY KEY) WITHOUT ROWID")
+            conn.execute(
+                "CREATE TEMP TABLE changed (key TEXT PRIMARY KEY, hash TEXT NOT NULL) WITHOUT ROWID"
+            )
+
+            def changed_records() -> Iterator[Dict[str, Any]]:
+                nonlocal unchanged
+                for record in records:
+                    key = record["key"]
+                    try:
+                        conn.execute("INSERT INTO seen (key) VALUES (?)", (key,))
+                    except sqlite3.IntegrityError:
+                        raise ValueError(f"Duplicate key in dataset: {key}")
+
+                    digest = record_hash(record)
+                    if not full and "expiration_ttl" not in record:
+                        row = conn.execute(
+                            "SELECT hash FROM kv_index "
+                            "WHERE account_id = ? AND namespace_id = ? AND key = ?",
+                            (*scope, key)
+                        ).fetchone()
+                        if row is not None and row[0] == digest:
+                            unchanged += 1
+                            continue
+
+                    conn.execute("INSERT INTO changed (key, hash) VALUES (?, ?)", (key, digest))
+                    yield record
+
+            if dry_run:
+                put_summary = {"keys": sum(1 for _ in changed_records()), "failed": 0,
+                               "failed_keys": []}
+            else:
+                put_summary = bulk_import(
+                    client, namespace_id, changed_records(), concurrency=concurrency,
+                    max_bytes=max_bytes, progress=progress
+                )
+
+            stale_query = (
+                "SELECT key FROM kv_index WHERE account_id = ? AND namespace_id = ? "
+                "AND key NOT IN (SELECT key FROM seen)"
+            )
+            stale_keys = (row[0] for row in conn.execute(stale_query, scope))
+            delete_summary = bulk_delete(
+                client, namespace_id, stale_keys, concurrency=concurrency, dry_run=dry_run
+            )
+
+            if not dry_run:
+                failed_keys = put_summary["failed_keys"]
+                if put_summary["failed"] > len(failed_keys):
+                    # Not every rejected key is known; re-send all changes next time
+                    conn.execute("DELETE FROM changed")
+                else:
+                    conn.executemany("DELETE FROM changed WHERE key = ?",
+                                     [(key,) for key in failed_keys])
+                conn.execute(
+                    "DELETE FROM kv_index WHERE account_id = ? AND namespace_id = ? "
+                    "AND key NOT IN (SELECT key FROM seen)",
+                    scope
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO kv_index (account_id, namespace_id, key, hash) "
+                    "SELECT ?, ?, key, hash FROM changed",
+                    scope
+                )
+
+        return {
+            "puts": put_summary["keys"],
+            "deletes": delete_summary["keys"],
+            "unchanged": unchanged,
+            "failed": put_summary["failed"],
+            "failed_keys": put_summary["failed_keys"],
+            "duration": time.monotonic() - started,
+            "dry_run": dry_run,
+        }
@@ -0,0 +1,236 @@
+"""D1 schema migrations: SQL files applied in order and recorded in a table."""
+
+import hashlib
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from .client import CloudflareAPIError
+from .d1 import (
+    D1_MAX_STATEMENT_BYTES, DEFAULT_BATCH_BYTES, DEFAULT_BATCH_STATEMENTS, quote_identifier,
+    split_sql
+)
+
+if TYPE_CHECKING:
+    from .client import CloudflareClient
+
+DEFAULT_MIGRATIONS_DIR = "migrations"
+
+# Same table name as wrangler, so either tool sees the other's migrations
+DEFAULT_MIGRATIONS_TABLE = "d1_migrations"
+
+
+class MigrationError(Exception):
+    """Exception raised when migrations cannot be planned or applied."""
+    pass
+
+
+class Migration(NamedTuple):
+    """One migration file."""
+
+    name: str
+    path: Path
+    checksum: str
+    statements: List[str]
+
+    @property
+    def size(self) -> int:
+        """Encoded size of the migration's statements."""
+        return sum(len(sql.encode("utf-8")) for sql in self.statements)
+
+
+def load_migrations(directory: Path) -> List[Migration]:
+    """Read the ``*.sql`` files of a migrations directory, ordered by name.
+
+    The checksum covers the file content with line endings normalized, so
+    a checkout on another platform does not look like an edit.
+
+    Raises:
+        MigrationError: If the directory does not exist or a statement is
+            longer than D1 accepts
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        raise MigrationError(f"Migrations directory not found: {directory}")
+
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        text = path.read_text(encoding="utf-8").replace("\r\n", "\n")
+        statements = split_sql(text)
+        for statement in statements:
+            if len(statement.encode("utf-8")) > D1_MAX_STATEMENT_BYTES:
+                raise MigrationError(
+                    f"{path.name} has a statement longer than D1's "
+                    f"{D1_MAX_STATEMENT_BYTES} byte limit"
+                )
+        checksum = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        migrations.append(Migration(path.name, path, checksum, statements))
+    return migrations
+
+
+def applied_migrations(
+    client: "CloudflareClient",
+    database_id: str,
+    table: str = DEFAULT_MIGRATIONS_TABLE,
+    create: bool = True
+) -> Dict[str, Optional[str]]:
+    """Get the migrations recorded in a database, in one request.
+
+    Args:
+        client: Cloudflare client
+        database_id: D1 database ID
+        table: Migrations table
+        create: Create the table if it does not exist. Without it a missing
+            table simply means nothing has been applied.
+
+    Returns:
+        Applied migration names mapped to their checksums. Migrations
+        recorded by tools that do not store checksums map to None.
+    """
+    q = quote_identifier(table)
+    select = f"SELECT name, checksum FROM {q} ORDER BY id"
+    statements = [{"sql": select}]
+    if create:
+        statements.insert(0, {"sql": (
+            f"CREATE TABLE IF NOT EXISTS {q} (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "name TEXT UNIQUE, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL, "
+            "checksum TEXT)"
+        )})
+
+    try:
+        results = client.execute_d1_batch(database_id, statements)
+    except CloudflareAPIError as e:
+        message = str(e).lower()
+        if "no such table" in message and not create:
+            return {}
+        if "no such column" not in message:
+            raise
+        # A table created by wrangler, which does not record checksums
+        if create:
+            client.query_d1(database_id, f"ALTER TABLE {q} ADD COLUMN checksum TEXT")
+            results = client.execute_d1_batch(database_id, statements)
+        else:
+            results = client.execute_d1_batch(database_id, [
+                {"sql": f"SELECT name, NULL AS checksum FROM {q} ORDER BY id"}
+            ])
+
+    rows = results[-1].get("results") or []
+    return {row["name"]: row["checksum"] for row in rows}
+
+
+def plan_migrations(
+    migrations: List[Migration],
+    applied: Dict[str, Optional[str]]
+) -> List[Migration]:
+    """Work out which migrations still need to run.
+
+    Args:
+        migrations: Local migrations, in order
+        applied: Output of applied_migrations()
+
+    Returns:
+        Pending migrations, in order
+
+    Raises:
+        MigrationError: If an applied migration file has been edited since
+    """
+    changed = [
+        m.name for m in migrations
+        if applied.get(m.name) is not None and applied[m.name] != m.checksum
+    ]
+    if changed:
+        raise MigrationError(
+            "Applied migrations were modified afterwards: " + ", ".join(changed)
+            + ". Add a new migration instead of editing one that has run."
+        )
+    return [m for m in migrations if m.name not in applied]
+
+
+def pack_migrations(
+    migrations: Iterable[Migration],
+    max_bytes: int = DEFAULT_BATCH_BYTES,
+    max_statements: int = DEFAULT_BATCH_STATEMENTS
+) -> List[List[Migration]]:
+    """Group migrations into as few batch requests as the limits allow.
+
+    A migration is never split across requests, so it is applied and
+    recorded in the same transaction. One that exceeds the limits on its
+    own gets a request to itself.
+    """
+    batches: List[List[Migration]] = []
+    batch: List[Migration] = []
+    size = 0
+    count = 0
+    for migration in migrations:
+        # Each migration also needs the statement that records it
+        statements = len(migration.statements) + 1
+        if batch and (size + migration.size > max_bytes or count + statements > max_statements):
+            batches.append(batch)
+            batch = []
+            size = 0
+            count = 0
+        batch.append(migration)
+        size += migration.size
+        count += statements
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def apply_migrations(
+    client: "CloudflareClient",
+    database_id: str,
+    pending: List[Migration],
+    table: str = DEFAULT_MIGRATIONS_TABLE,
+    max_bytes: int = DEFAULT_BATCH_BYTES,
+    max_statements: int = DEFAULT_BATCH_STATEMENTS,
+    progress: Optional[Callable[[List[Migration]], None]] = None
+) -> Dict[str, Any]:
+    """Apply pending migrations in batched requests.
+
+    Each request holds whole migrations followed by the rows recording
+    them, and D1 runs a request as one transaction, so a migration is
+    never half-applied or applied without being recorded. Requests run in
+    order and stop at the first failure.
+
+    Args:
+        client: Cloudflare client
+        database_id: D1 database ID
+        pending: Output of plan_migrations()
+        table: Migrations table
+        max_bytes: Maximum statement bytes per request
+        max_statements: Maximum statements per request
+        progress: Called with the migrations of each applied request
+
+    Returns:
+        Summary with ``applied`` (names), ``requests`` and ``duration``
+
+    Raises:
+        MigrationError: If a request fails. Earlier requests stay applied.
+    """
+    q = quote_identifier(table)
+    applied: List[str] = []
+    start = time.monotonic()
+    batches = pack_migrations(pending, max_bytes, max_statements)
+
+    for batch in batches:
+        statements = [{"sql": sql} for migration in batch for sql in migration.statements]
+        statements += [
+            {"sql": f"INSERT INTO {q} (name, checksum) VALUES (?, ?)",
+             "params": [migration.name, migration.checksum]}
+            for migration in batch
+        ]
+        try:
+            client.execute_d1_batch(database_id, statements)
+        except CloudflareAPIError as e:
+            names = ", ".join(m.name for m in batch)
+            raise MigrationError(f"Failed applying {names}: {e}") from e
+        applied += [m.name for m in batch]
+        if progress is not None:
+            progress(batch)
+
+    return {
+        "applied": applied,
+        "requests": len(batches),
+        "duration": time.monotonic() - start,
+    }
@@ -0,0 +1,366 @@
+"""Worker module graph resolution for multi-module uploads."""
+
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from .cache import default_cache_dir
+
+# Module types understood by the Workers runtime, keyed by file extension
+MODULE_TYPES = {
+    ".js": "application/javascript+module",
+    ".mjs": "application/javascript+module",
+    ".cjs": "application/javascript",
+    ".txt": "text/plain",
+    ".html": "text/plain",
+    ".sql": "text/plain",
+    ".wasm": "application/wasm",
+    ".bin": "application/octet-stream",
+}
+
+# Extensions tried, in order, for extensionless relative imports
+RESOLVE_EXTENSIONS = (".js", ".mjs", ".cjs")
+
+JS_EXTENSIONS = {".js", ".mjs", ".cjs"}
+
+_IMPORT_PATTERNS = [
+    re.compile(r"""\b(?:import|export)\b[^;'"`]*?\bfrom\s*(['"])([^'"\n]+)\1"""),
+    re.compile(r"""\bimport\s*(['"])([^'"\n]+)\1"""),
+    re.compile(r"""\bimport\s*\(\s*(['"])([^'"\n]+)\1\s*\)"""),
+]
+
+# Tokens after which a "/" starts a regular expression rather than a division
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^") | {
+    "return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void",
+    "throw", "yield", "await", "instanceof",
+}
+
+
+class WorkerModule(NamedTuple):
+    """One module of a worker upload."""
+
+    name: str
+    path: Path
+    content_type: str
+
+
+class ModuleResolutionError(Exception):
+    """Exception raised when a module graph cannot be resolved."""
+    pass
+
+
+def strip_comments(source: str, collapse_whitespace: bool = False) -> str:
+    """Remove JavaScript comments while leaving strings and regexes intact.
+
+    Comments are replaced by a single space (or the newlines they contained)
+    so tokens on either side stay separated.
+
+    Args:
+        source: JavaScript source
+        collapse_whitespace: Also squeeze every run of whitespace and comments
+            outside literals into one space, or one newline if the run spans
+            lines (newlines are kept so automatic semicolon insertion still
+            behaves the same)
+
+    Returns:
+        Source without comments
+    """
+    out = []
+    i = 0
+    n = len(source)
+    last_token = ""
+
+    while i < n:
+        c = source[i]
+
+        if c in "'\"`":
+            end = _skip_string(source, i)
+            out.append(source[i:end])
+            last_token = "str"
+            i = end
+            continue
+
+        if collapse_whitespace and (c.isspace() or source.startswith(("//", "/*"), i)):
+            newline = False
+            while i < n:
+                if source[i].isspace():
+                    newline = newline or source[i] == "\n"
+                    i += 1
+                elif source.startswith("//", i):
+                    end = source.find("\n", i)
+                    i = n if end == -1 else end
+                elif source.startswith("/*", i):
+                    end = source.find("*/", i + 2)
+                    end = n if end == -1 else end + 2
+                    newline = newline or "\n" in source[i:end]
+                    i = end
+                else:
+                    break
+            if out and i < n:
+                out.append("\n" if newline else " ")
+            continue
+
+        if c == "/" and i + 1 < n and source[i + 1] == "/":
+            end = source.find("\n", i)
+            i = n if end == -1 else end
+            out.append(" ")
+            continue
+
+        if c == "/" and i + 1 < n and source[i + 1] == "*":
+            end = source.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            out.append("\n" * source.count("\n", i, end) or " ")
+            i = end
+            continue
+
+        if c == "/" and (last_token == "" or last_token in _REGEX_PRECEDERS):
+            end = _skip_regex(source, i)
+            out.append(source[i:end])
+            last_token = "regex"
+            i = end
+            continue
+
+        if c.isalnum() or c in "_$":
+            j = i
+            while j < n and (source[j].isalnum() or source[j] in "_$"):
+                j += 1
+            last_token = source[i:j]
+            out.append(last_token)
+            i = j
+            continue
+
+        if not c.isspace():
+            last_token = c
+        out.append(c)
+        i += 1
+
+    return "".join(out)
+
+
+def _skip_string(source: str, start: int) -> int:
+    """Return the index just past the string literal starting at start."""
+    quote = source[start]
+    i = start + 1
+    n = len(source)
+    while i < n:
+        c = source[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == quote:
+            return i + 1
+        if quote == "`" and c == "$" and i + 1 < n and source[i + 1] == "{":
+            # Skip a template substitution, which may itself contain strings
+            depth = 1
+            i += 2
+            while i < n and depth:
+                if source[i] in "'\"`":
+                    i = _skip_string(source, i)
+                    continue
+                if source[i] == "{":
+                    depth += 1
+                elif source[i] == "}":
+                    depth -= 1
+                i += 1
+            continue
+        if quote != "`" and c == "\n":
+            return i
+        i += 1
+    return n
+
+
+def _skip_regex(source: str, start: int) -> int:
+    """Return the index just past the regex literal starting at start."""
+    i = start + 1
+    n = len(source)
+    in_class = False
+    while i < n:
+        c = source[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "\n":
+            return i
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            i += 1
+            while i < n and (source[i].isalnum() or source[i] in "_$"):
+                i += 1
+            return i
+        i += 1
+    return n
+
+
+def find_imports(source: str) -> List[str]:
+    """Find the module specifiers imported by a JavaScript source.
+
+    Args:
+        source: JavaScript source
+
+    Returns:
+        Specifiers in order of first appearance, without duplicates
+    """
+    code = strip_comments(source)
+    found: Dict[int, str] = {}
+    for pattern in _IMPORT_PATTERNS:
+        for match in pattern.finditer(code):
+            found.setdefault(match.start(2), match.group(2))
+    return list(dict.fromkeys(spec for _, spec in sorted(found.items())))
+
+
+def resolve_specifier(
+    importer: Path,
+    specifier: str,
+    extensions: Sequence[str] = RESOLVE_EXTENSIONS
+) -> Optional[Path]:
+    """Resolve a relative import specifier to a file.
+
+    Args:
+        importer: File containing the import
+        specifier: Import specifier
+        extensions: Extensions to try for extensionless specifiers. The
+            Workers runtime itself does not do this, so unbundled uploads
+            pass an empty tuple.
+
+    Returns:
+        Resolved path, or None for bare specifiers provided by the runtime
+        (e.g. ``node:buffer`` or ``cloudflare:sockets``)
+
+    Raises:
+        ModuleResolutionError: If a relative specifier matches no file
+    """
+    if not specifier.startswith(("./", "../", "/")):
+        return None
+
+    base = (importer.parent / specifier.split("?", 1)[0]).resolve()
+    candidates = [base]
+    candidates += [base.with_name(base.name + ext) for ext in extensions]
+    candidates += [base / f"index{ext}" for ext in extensions]
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+
+    message = f"Cannot resolve '{specifier}' imported from {importer}"
+    if not extensions:
+        message += " (imports must name the file exactly, including its extension)"
+    raise ModuleResolutionError(message)
+
+
+class ModuleGraphCache:
+    """Remembers each module's imports keyed by its mtime and size.
+
+    Resolving a graph then only stats unchanged files instead of reading
+    and scanning them again.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize module graph cache.
+
+        Args:
+            path: SQLite file to store imports in. Defaults to modules.db in
+                the Slingshot cache directory.
+        """
+        self.path = Path(path) if path else default_cache_dir() / "modules.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS module_imports ("
+                "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+                "imports TEXT NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection that commits and closes on exit."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, path: Path, stat: os.stat_result) -> Optional[List[str]]:
+        """Get the cached imports of a file if it has not changed."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT mtime_ns, size, imports FROM module_imports WHERE path = ?",
+                (str(path),)
+            ).fetchone()
+        if row is None or row[0] != stat.st_mtime_ns or row[1] != stat.st_size:
+            return None
+        return json.loads(row[2])
+
+    def put(self, path: Path, stat: os.stat_result, imports: List[str]) -> None:
+        """Store the imports of a file."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO module_imports (path, mtime_ns, size, imports) "
+                "VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_mtime_ns, stat.st_size, json.dumps(imports))
+            )
+
+
+def module_type(path: Path) -> str:
+    """Get the Workers module MIME type for a file."""
+    return MODULE_TYPES.get(path.suffix.lower(), "application/octet-stream")
+
+
+def resolve_module_graph(
+    main_path: Path,
+    root: Path,
+    cache: Optional[ModuleGraphCache] = None
+) -> List[WorkerModule]:
+    """Collect every module reachable from a worker's main module.
+
+    Args:
+        main_path: Entry module
+        root: Project directory; module names are paths relative to it
+        cache: Optional cache of per-file imports
+
+    Returns:
+        Modules with the main module first, then in discovery order
+
+    Raises:
+        ModuleResolutionError: If an import cannot be resolved or escapes root
+    """
+    root = root.resolve()
+    main_path = main_path.resolve()
+    modules: List[WorkerModule] = []
+    seen = set()
+    queue = [main_path]
+
+    while queue:
+        path = queue.pop(0)
+        if path in seen:
+            continue
+        seen.add(path)
+
+        try:
+            name = PurePosixPath(path.relative_to(root).as_posix())
+        except ValueError:
+            raise ModuleResolutionError(f"Module {path} is outside the project directory {root}")
+        modules.append(WorkerModule(str(name), path, module_type(path)))
+
+        if path.suffix.lower() not in JS_EXTENSIONS:
+            continue
+
+        stat = path.stat()
+        imports = cache.get(path, stat) if cache is not None else None
+        if imports is None:
+            imports = find_imports(path.read_text(encoding="utf-8"))
+            if cache is not None:
+                cache.put(path, stat, imports)
+
+        for specifier in imports:
+            resolved = resolve_specifier(path, specifier, extensions=())
+            if resolved is not None and resolved not in seen:
+                queue.append(resolved)
+
+    return modules
@@ -0,0 +1,128 @@
+"""Streaming multipart/form-data bodies for large uploads."""
+
+import io
+import mmap
+import os
+import stat
+import uuid
+from typing import Any, BinaryIO, Iterator, List, Optional, Union
+
+# Anything upload_worker and friends accept as part content
+Content = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MultipartBody:
+    """A multipart/form-data body that is streamed instead of built in memory.
+
+    Parts are kept as references to the caller's buffers (or an mmap of the
+    caller's file), and the body is produced as a sequence of memoryview
+    slices over them. The total length is known up front, so requests sends
+    a Content-Length header rather than chunked encoding. Iterating again
+    restarts from the beginning, which lets the client retry an upload.
+    """
+
+    def __init__(self, boundary: Optional[str] = None):
+        """Initialize an empty multipart body.
+
+        Args:
+            boundary: Multipart boundary. Random if not given.
+        """
+        self.boundary = boundary or uuid.uuid4().hex
+        self._segments: List[Any] = []
+        self._mmaps: List[mmap.mmap] = []
+
+    @property
+    def content_type(self) -> str:
+        """Content-Type header value for this body."""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def add_part(
+        self,
+        name: str,
+        content: Content,
+        content_type: Optional[str] = None,
+        filename: Optional[str] = None
+    ) -> None:
+        """Append a part to the body.
+
+        Args:
+            name: Form field name
+            content: Part payload. Text is UTF-8 encoded; bytes-like objects are
+                referenced without copying; real files are memory-mapped.
+            content_type: MIME type of the part
+            filename: Filename to advertise in Content-Disposition
+        """
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type:
+            header += f"Content-Type: {content_type}\r\n"
+        header += "\r\n"
+
+        self._segments.append(header.encode("utf-8"))
+        self._segments.append(self._as_buffer(content))
+        self._segments.append(b"\r\n")
+
+    def _as_buffer(self, content: Content) -> Any:
+        """Turn part content into something with a known length."""
+        if isinstance(content, str):
+            return content.encode("utf-8")
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return memoryview(content).cast("B")
+        if isinstance(content, io.BytesIO):
+            return content.getbuffer()
+
+        fileno = getattr(content, "fileno", None)
+        if fileno is not None:
+            try:
+                fd = fileno()
+            except (OSError, io.UnsupportedOperation):
+                fd = None
+            # Pipes, sockets and ttys report no size and cannot be mapped
+            st = os.fstat(fd) if fd is not None else None
+            if st is not None and stat.S_ISREG(st.st_mode):
+                if st.st_size == 0:
+                    return b""
+                mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+                self._mmaps.append(mapped)
+                return memoryview(mapped)
+
+        if hasattr(content, "read"):
+            data = content.read()
+            return data.encode("utf-8") if isinstance(data, str) else data
+
+        raise TypeError(f"Unsupported part content: {type(content).__name__}")
+
+    def _closing(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode("utf-8")
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self._segments) + len(self._closing())
+
+    def __iter__(self) -> Iterator[Any]:
+        for segment in self._segments:
+            view = memoryview(segment)
+            for start in range(0, len(view), CHUNK_SIZE):
+                yield view[start:start + CHUNK_SIZE]
+        yield self._closing()
+
+    def to_bytes(self) -> bytes:
+        """Materialize the whole body. Mostly useful for tests and debugging."""
+        return b"".join(bytes(chunk) for chunk in self)
+
+    def close(self) -> None:
+        """Release memory maps held for file parts."""
+        for segment in self._segments:
+            if isinstance(segment, memoryview):
+                segment.release()
+        self._segments = []
+        for mapped in self._mmaps:
+            try:
+                mapped.close()
+            except BufferError:
+                # A caller still holds a slice; the map is freed with it
+                pass
+        self._mmaps = []
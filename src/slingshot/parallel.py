@@ -0,0 +1,128 @@
+"""Bounded concurrent execution over lazy inputs, and progress tracking."""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = 4,
+    max_pending: Optional[int] = None,
+    ordered: bool = False
+) -> Iterator[Tuple[T, R]]:
+    """Run fn over items concurrently with a bounded number in flight.
+
+    Items are pulled from the iterable only when there is room, so a lazy
+    producer (a file reader, a paginated listing) is throttled to the speed
+    of the workers instead of being read ahead into memory.
+
+    Args:
+        fn: Function to apply
+        items: Inputs, consumed lazily
+        max_workers: Number of threads
+        max_pending: Maximum submitted-but-unfinished items. Defaults to
+            twice max_workers.
+        ordered: Yield results in input order instead of completion order
+
+    Yields:
+        (item, result) pairs
+
+    Raises:
+        Exception: The first exception raised by fn; pending work is cancelled
+    """
+    max_pending = max_pending or max_workers * 2
+    iterator = iter(items)
+    pending: Dict[Future, T] = {}
+    queue: Deque[Future] = deque()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    future = executor.submit(fn, item)
+                    pending[future] = item
+                    if ordered:
+                        queue.append(future)
+                if not pending:
+                    return
+
+                if ordered:
+                    done = [queue.popleft()]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    yield item, future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+class TransferProgress:
+    """Thread-safe counters with a rolling throughput estimate."""
+
+    def __init__(self, window: float = 5.0):
+        """Initialize progress counters.
+
+        Args:
+            window: Seconds of history used for the current rate
+        """
+        self.window = window
+        self.started = time.monotonic()
+        self.keys = 0
+        self.bytes = 0
+        self.batches = 0
+        self.failed = 0
+        self._samples: Deque[Tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+
+    def add(self, keys: int, nbytes: int = 0, failed: int = 0) -> None:
+        """Record a finished batch."""
+        now = time.monotonic()
+        with self._lock:
+            self.keys += keys
+            self.bytes += nbytes
+            self.batches += 1
+            self.failed += failed
+            self._samples.append((now, self.keys))
+            while self._samples and now - self._samples[0][0] > self.window:
+                self._samples.popleft()
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        """Keys per second over the recent window."""
+        with self._lock:
+            if len(self._samples) < 2:
+                return self.keys / self.elapsed if self.elapsed > 0 else 0.0
+            (t0, k0), (t1, k1) = self._samples[0], self._samples[-1]
+        return (k1 - k0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals as a plain dict."""
+        elapsed = self.elapsed
+        return {
+            "keys": self.keys,
+            "bytes": self.bytes,
+            "batches": self.batches,
+            "failed": self.failed,
+            "duration": elapsed,
+            "keys_per_second": self.keys / elapsed if elapsed > 0 else 0.0,
+            "bytes_per_second": self.bytes / elapsed if elapsed > 0 else 0.0,
+        }
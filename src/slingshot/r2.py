@@ -0,0 +1,1333 @@
+"""R2 object storage through its S3-compatible API."""
+
+import base64
+import hashlib
+import hmac
+import json
+import mimetypes
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import tee
+from pathlib import Path
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+)
+from urllib.parse import parse_qsl, quote, urlsplit
+from xml.sax.saxutils import escape as xml_escape
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import default_cache_dir
+from .parallel import TransferProgress, bounded_map
+from .retry import RetryPolicy
+
+R2_ENDPOINT = "https://{account_id}.r2.cloudflarestorage.com"
+R2_REGION = "auto"
+
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+# Presigned URLs are valid for at most 7 days
+DEFAULT_PRESIGN_EXPIRES = 3600
+MAX_PRESIGN_EXPIRES = 7 * 24 * 3600
+
+# S3 multipart limits (R2 requires equal-sized parts, except the last)
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+
+# DeleteObjects accepts at most this many keys per request
+DELETE_MAX_KEYS = 1000
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+_MD5_HEX_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class R2Error(Exception):
+    """Exception raised for R2 S3 API errors."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, code: Optional[str] = None):
+        self.message = message
+        self.status_code = status_code
+        self.code = code
+        super().__init__(self.message)
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _quote(value: str, safe: str = "-_.~") -> str:
+    """Percent-encode as SigV4 canonicalization expects."""
+    return quote(value, safe=safe)
+
+
+def canonical_query(query: str) -> str:
+    """Sort and re-encode a query string for signing."""
+    pairs = parse_qsl(query, keep_blank_values=True)
+    return "&".join(f"{_quote(k)}={_quote(v)}" for k, v in sorted(pairs))
+
+
+class SigV4Signer:
+    """AWS Signature Version 4 request signing for R2's S3 API.
+
+    The signing key only depends on the date, region and service, so it is
+    derived once per day and reused for every request.
+    """
+
+    ALGORITHM = "AWS4-HMAC-SHA256"
+
+    def __init__(
+        self,
+        access_key_id: str,
+        secret_access_key: str,
+        region: str = R2_REGION,
+        service: str = "s3"
+    ):
+        """Initialize signer.
+
+        Args:
+            access_key_id: R2 access key ID
+            secret_access_key: R2 secret access key
+            region: Signing region ("auto" for R2)
+            service: Signing service name
+        """
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.region = region
+        self.service = service
+        self._keys: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def signing_key(self, date: str) -> bytes:
+        """Get the derived signing key for a YYYYMMDD date."""
+        key = self._keys.get(date)
+        if key is None:
+            key = _hmac(("AWS4" + self.secret_access_key).encode("utf-8"), date)
+            for part in (self.region, self.service, "aws4_request"):
+                key = _hmac(key, part)
+            with self._lock:
+                self._keys = {date: key}
+        return key
+
+    def scope(self, date: str) -> str:
+        """Credential scope for a YYYYMMDD date."""
+        return f"{date}/{self.region}/{self.service}/aws4_request"
+
+    def sign(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        payload_hash: str = UNSIGNED_PAYLOAD,
+        now: Optional[datetime] = None
+    ) -> Dict[str, str]:
+        """Sign a request in the Authorization header.
+
+        Args:
+            method: HTTP method
+            url: Full URL, with the path and query already percent-encoded
+            headers: Headers to send, all of which are signed
+            payload_hash: Hex SHA-256 of the body, or UNSIGNED-PAYLOAD
+            now: Signing time. Defaults to the current time.
+
+        Returns:
+            The headers plus ``x-amz-date``, ``x-amz-content-sha256`` and
+            ``Authorization``
+        """
+        parts = urlsplit(url)
+        amz_date = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+        date = amz_date[:8]
+
+        headers = dict(headers or {})
+        headers["x-amz-date"] = amz_date
+        headers["x-amz-content-sha256"] = payload_hash
+        canonical = {name.lower(): " ".join(str(value).split()) for name, value in headers.items()}
+        canonical["host"] = parts.netloc
+        names = sorted(canonical)
+        signed_headers = ";".join(names)
+
+        canonical_request = "\n".join([
+            method.upper(),
+            parts.path or "/",
+            canonical_query(parts.query),
+            "".join(f"{name}:{canonical[name]}\n" for name in names),
+            signed_headers,
+            payload_hash,
+        ])
+        string_to_sign = "\n".join([
+            self.ALGORITHM,
+            amz_date,
+            self.scope(date),
+            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+        ])
+        signature = hmac.new(
+            self.signing_key(date), string_to_sign.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+
+        headers["Authorization"] = (
+            f"{self.ALGORITHM} Credential={self.access_key_id}/{self.scope(date)}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        return headers
+
+    def presign(
+        self,
+        method: str,
+        url: str,
+        expires: int = DEFAULT_PRESIGN_EXPIRES,
+        now: Optional[datetime] = None
+    ) -> str:
+        """Sign a URL in its query string, so it can be used without credentials."""
+        return next(self.presign_many(method, [url], expires, now))
+
+    def presign_many(
+        self,
+        method: str,
+        urls: Iterable[str],
+        expires: int = DEFAULT_PRESIGN_EXPIRES,
+        now: Optional[datetime] = None
+    ) -> Iterator[str]:
+        """Presign URLs in bulk, entirely offline.
+
+        All URLs share one signing time, so the derived key, the credential
+        scope and the common query parameters are computed once, and the
+        keyed HMAC state is copied rather than rebuilt. Each URL then costs
+        one SHA-256 and one HMAC over short strings.
+
+        Args:
+            method: HTTP method the URLs are valid for
+            urls: Full URLs, with the path already percent-encoded
+            expires: Seconds the URLs stay valid (at most 7 days)
+            now: Signing time. Defaults to the current time.
+
+        Returns:
+            Iterator of presigned URLs, in input order, signed lazily
+
+        Raises:
+            ValueError: If expires is out of range
+        """
+        if not 1 <= expires <= MAX_PRESIGN_EXPIRES:
+            raise ValueError(f"expires must be between 1 and {MAX_PRESIGN_EXPIRES} seconds")
+
+        method = method.upper()
+        amz_date = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+        date = amz_date[:8]
+        scope = self.scope(date)
+        query = (
+            f"X-Amz-Algorithm={self.ALGORITHM}"
+            f"&X-Amz-Credential={_quote(f'{self.access_key_id}/{scope}')}"
+            f"&X-Amz-Date={amz_date}&X-Amz-Expires={expires}&X-Amz-SignedHeaders=host"
+        )
+        prefix = f"{self.ALGORITHM}\n{amz_date}\n{scope}\n"
+        mac = hmac.new(self.signing_key(date), digestmod=hashlib.sha256)
+
+        def sign(url: str) -> str:
+            parts = urlsplit(url)
+            canonical = canonical_query(f"{parts.query}&{query}") if parts.query else query
+            canonical_request = (
+                f"{method}\n{parts.path or '/'}\n{canonical}\n"
+                f"host:{parts.netloc}\n\nhost\n{UNSIGNED_PAYLOAD}"
+            )
+            signer = mac.copy()
+            signer.update(
+                (prefix + hashlib.sha256(canonical_request.encode("utf-8")).hexdigest())
+                .encode("utf-8")
+            )
+            separator = "&" if parts.query else "?"
+            return f"{url}{separator}{query}&X-Amz-Signature={signer.hexdigest()}"
+
+        return map(sign, urls)
+
+
+def _xml_text(root: ET.Element, tag: str) -> Optional[str]:
+    """Find the text of the first element with a tag, ignoring namespaces."""
+    for element in root.iter():
+        if element.tag.rsplit("}", 1)[-1] == tag:
+            return element.text
+    return None
+
+
+def _strip_etag(etag: Optional[str]) -> str:
+    return (etag or "").strip('"')
+
+
+class R2Client:
+    """Client for R2 object operations over the S3-compatible API."""
+
+    DEFAULT_POOL_MAXSIZE = 32
+
+    def __init__(
+        self,
+        account_id: str,
+        access_key_id: str,
+        secret_access_key: str,
+        endpoint: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+    ):
+        """Initialize R2 client.
+
+        Args:
+            account_id: Cloudflare account ID
+            access_key_id: R2 access key ID
+            secret_access_key: R2 secret access key
+            endpoint: S3 endpoint. Defaults to the account's R2 endpoint.
+            retry_policy: Policy for retrying failed requests
+            pool_maxsize: Number of keep-alive connections kept per host
+        """
+        self.account_id = account_id
+        self.endpoint = (endpoint or R2_ENDPOINT.format(account_id=account_id)).rstrip("/")
+        self.signer = SigV4Signer(access_key_id, secret_access_key)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self) -> None:
+        """Close the underlying HTTP session and its pooled connections."""
+        self.session.close()
+
+    def url(self, bucket: str, key: str = "", params: Optional[Dict[str, Any]] = None) -> str:
+        """Build a path-style object URL with a canonical query string."""
+        url = f"{self.endpoint}/{_quote(bucket)}"
+        if key:
+            url += "/" + _quote(key, safe="/-_.~")
+        if params:
+            url += "?" + canonical_query("&".join(
+                f"{_quote(str(k))}={_quote(str(v))}" for k, v in params.items()
+            ))
+        return url
+
+    def _request(
+        self,
+        method: str,
+        bucket: str,
+        key: str = "",
+        params: Optional[Dict[str, Any]] = None,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False
+    ) -> requests.Response:
+        """Send a signed request, retrying according to ``self.retry_policy``.
+
+        Raises:
+            R2Error: If the response is an error
+        """
+        url = self.url(bucket, key, params)
+        policy = self.retry_policy
+        attempt = 0
+
+        while True:
+            # Each attempt is signed afresh, since signatures carry a timestamp
+            signed = self.signer.sign(method, url, headers)
+            try:
+                response = self.session.request(
+                    method, url, data=body, headers=signed, stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                connect_error = isinstance(e, requests.ConnectTimeout)
+                if not policy.should_retry_error(method, connect_error, attempt):
+                    raise
+                time.sleep(policy.backoff(attempt))
+                attempt += 1
+                continue
+
+            if policy.should_retry_status(method, response.status_code, attempt):
+                delay = policy.parse_retry_after(response.headers.get("Retry-After"))
+                if delay is None:
+                    delay = policy.backoff(attempt)
+                if delay <= policy.max_retry_after:
+                    response.close()
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+            break
+
+        if response.status_code >= 400:
+            code = message = None
+            if response.content:
+                try:
+                    root = ET.fromstring(response.content)
+                    code = _xml_text(root, "Code")
+                    message = _xml_text(root, "Message")
+                except ET.ParseError:
+                    pass
+            raise R2Error(
+                f"{method} {bucket}/{key}: {message or code or response.reason} "
+                f"(HTTP {response.status_code})",
+                status_code=response.status_code,
+                code=code
+            )
+        return response
+
+    def put_object(
+        self,
+        bucket: str,
+        key: str,
+        data: Union[bytes, memoryview],
+        content_type: Optional[str] = None
+    ) -> str:
+        """Upload an object in one request, verified with Content-MD5.
+
+        Returns:
+            Object ETag
+        """
+        headers = {"Content-MD5": base64.b64encode(hashlib.md5(data).digest()).decode("ascii")}
+        if content_type:
+            headers["Content-Type"] = content_type
+        response = self._request("PUT", bucket, key, body=data, headers=headers)
+        return _strip_etag(response.headers.get("ETag"))
+
+    def create_multipart_upload(
+        self,
+        bucket: str,
+        key: str,
+        content_type: Optional[str] = None
+    ) -> str:
+        """Start a multipart upload.
+
+        Returns:
+            Upload ID
+        """
+        headers = {"Content-Type": content_type} if content_type else None
+        response = self._request("POST", bucket, key, params={"uploads": ""}, headers=headers)
+        upload_id = _xml_text(ET.fromstring(response.content), "UploadId")
+        if not upload_id:
+            raise R2Error(f"No upload ID returned for {bucket}/{key}")
+        return upload_id
+
+    def upload_part(
+        self,
+        bucket: str,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        data: Union[bytes, memoryview]
+    ) -> str:
+        """Upload one part of a multipart upload.
+
+        The part's MD5 is sent as Content-MD5, so R2 rejects a part that was
+        corrupted in transit, and the returned ETag is checked against it.
+
+        Returns:
+            Part ETag
+
+        Raises:
+            R2Error: If the upload fails or the ETag does not match
+        """
+        digest = hashlib.md5(data).digest()
+        response = self._request(
+            "PUT",
+            bucket,
+            key,
+            params={"partNumber": part_number, "uploadId": upload_id},
+            body=data,
+            headers={"Content-MD5": base64.b64encode(digest).decode("ascii")}
+        )
+        etag = _strip_etag(response.headers.get("ETag"))
+        if _MD5_HEX_RE.match(etag) and etag != digest.hex():
+            raise R2Error(f"Checksum mismatch for part {part_number} of {bucket}/{key}")
+        return etag
+
+    def list_parts(self, bucket: str, key: str, upload_id: str) -> Dict[int, str]:
+        """List the parts R2 has received for a multipart upload.
+
+        Returns:
+            Part numbers mapped to ETags
+        """
+        parts: Dict[int, str] = {}
+        marker = None
+        while True:
+            params: Dict[str, Any] = {"uploadId": upload_id}
+            if marker:
+                params["part-number-marker"] = marker
+            root = ET.fromstring(self._request("GET", bucket, key, params=params).content)
+            for element in root.iter():
+                if element.tag.rsplit("}", 1)[-1] == "Part":
+                    number = _xml_text(element, "PartNumber")
+                    if number:
+                        parts[int(number)] = _strip_etag(_xml_text(element, "ETag"))
+            if (_xml_text(root, "IsTruncated") or "").lower() != "true":
+                return parts
+            marker = _xml_text(root, "NextPartNumberMarker")
+
+    def complete_multipart_upload(
+        self,
+        bucket: str,
+        key: str,
+        upload_id: str,
+        parts: Dict[int, str]
+    ) -> str:
+        """Assemble the uploaded parts into the object.
+
+        Returns:
+            Object ETag
+        """
+        body = "<CompleteMultipartUpload>" + "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>\"{etag}\"</ETag></Part>"
+            for number, etag in sorted(parts.items())
+        ) + "</CompleteMultipartUpload>"
+        response = self._request(
+            "POST", bucket, key, params={"uploadId": upload_id}, body=body.encode("utf-8"),
+            headers={"Content-Type": "application/xml"}
+        )
+        root = ET.fromstring(response.content)
+        # Completion can fail after a 200 status line; the error is in the body
+        if root.tag.rsplit("}", 1)[-1] == "Error":
+            raise R2Error(
+                f"Completing {bucket}/{key} failed: {_xml_text(root, 'Message')}",
+                code=_xml_text(root, "Code")
+            )
+        return _strip_etag(_xml_text(root, "ETag"))
+
+    def abort_multipart_upload(self, bucket: str, key: str, upload_id: str) -> None:
+        """Abort a multipart upload and discard its parts."""
+        self._request("DELETE", bucket, key, params={"uploadId": upload_id})
+
+    def presign_urls(
+        self,
+        bucket: str,
+        keys: Iterable[str],
+        expires: int = DEFAULT_PRESIGN_EXPIRES,
+        method: str = "GET",
+        now: Optional[datetime] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """Presign object URLs locally, without any requests.
+
+        Returns:
+            Iterator of (key, presigned URL) pairs, in input order
+        """
+        keys, to_sign = tee(keys)
+        urls = (self.url(bucket, key) for key in to_sign)
+        return zip(keys, self.signer.presign_many(method, urls, expires, now))
+
+    def head_object(self, bucket: str, key: str) -> Tuple[int, str]:
+        """Get an object's size and ETag.
+
+        Returns:
+            Tuple of (size, etag)
+        """
+        response = self._request("HEAD", bucket, key)
+        size = int(response.headers.get("Content-Length", 0))
+        return size, _strip_etag(response.headers.get("ETag"))
+
+    def get_object(
+        self,
+        bucket: str,
+        key: str,
+        byte_range: Optional[Tuple[int, int]] = None,
+        if_match: Optional[str] = None
+    ) -> requests.Response:
+        """Start downloading an object, or an inclusive byte range of it.
+
+        The response is streamed; the caller reads and closes it.
+
+        Args:
+            bucket: Bucket name
+            key: Object key
+            byte_range: (first, last) byte offsets, inclusive
+            if_match: Fail with HTTP 412 unless the object still has this ETag
+
+        Raises:
+            R2Error: If the request fails or the range is not honoured
+        """
+        headers = {}
+        if byte_range is not None:
+            headers["Range"] = f"bytes={byte_range[0]}-{byte_range[1]}"
+        if if_match:
+            headers["If-Match"] = f'"{if_match}"'
+        response = self._request("GET", bucket, key, headers=headers, stream=True)
+        if byte_range is not None and response.status_code != 206:
+            response.close()
+            raise R2Error(f"GET {bucket}/{key}: range request answered with the whole object",
+                          status_code=response.status_code)
+        return response
+
+    def list_objects(self, bucket: str, prefix: str = "") -> Iterator[Tuple[str, int, str]]:
+        """List the objects under a prefix with ListObjectsV2, one page at a time.
+
+        Yields:
+            (key, size, etag) tuples
+        """
+        token = None
+        while True:
+            params: Dict[str, Any] = {"list-type": 2}
+            if prefix:
+                params["prefix"] = prefix
+            if token:
+                params["continuation-token"] = token
+            root = ET.fromstring(self._request("GET", bucket, params=params).content)
+            for element in root.iter():
+                if element.tag.rsplit("}", 1)[-1] == "Contents":
+                    yield (
+                        _xml_text(element, "Key") or "",
+                        int(_xml_text(element, "Size") or 0),
+                        _strip_etag(_xml_text(element, "ETag")),
+                    )
+            token = _xml_text(root, "NextContinuationToken")
+            if (_xml_text(root, "IsTruncated") or "").lower() != "true" or not token:
+                return
+
+    def delete_objects(self, bucket: str, keys: List[str]) -> List[str]:
+        """Delete up to DELETE_MAX_KEYS objects in one request.
+
+        Returns:
+            Keys R2 reported as not deleted
+        """
+        body = ("<Delete><Quiet>true</Quiet>" + "".join(
+            f"<Object><Key>{xml_escape(key)}</Key></Object>" for key in keys
+        ) + "</Delete>").encode("utf-8")
+        response = self._request(
+            "POST", bucket, params={"delete": ""}, body=body,
+            headers={
+                "Content-Type": "application/xml",
+                "Content-MD5": base64.b64encode(hashlib.md5(body).digest()).decode("ascii"),
+            }
+        )
+        failed = []
+        if response.content:
+            for element in ET.fromstring(response.content).iter():
+                if element.tag.rsplit("}", 1)[-1] == "Error":
+                    failed.append(_xml_text(element, "Key") or "")
+        return failed
+
+
+class UploadState:
+    """SQLite record of in-progress multipart uploads and their finished parts."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize upload state store.
+
+        Args:
+            path: SQLite file to store state in. Defaults to r2uploads.db in
+                the Slingshot cache directory.
+        """
+        self.path = Path(path) if path else default_cache_dir() / "r2uploads.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS uploads (upload_key TEXT PRIMARY KEY, "
+                "bucket TEXT NOT NULL, object_key TEXT NOT NULL, upload_id TEXT NOT NULL, "
+                "part_size INTEGER NOT NULL, created REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS parts (upload_key TEXT NOT NULL, "
+                "part_number INTEGER NOT NULL, etag TEXT NOT NULL, "
+                "PRIMARY KEY (upload_key, part_number)) WITHOUT ROWID"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection that commits and closes on exit."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, upload_key: str) -> Optional[Tuple[str, Dict[int, str]]]:
+        """Get the upload ID and finished parts of an upload, if one was started."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT upload_id FROM uploads WHERE upload_key = ?", (upload_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            parts = dict(conn.execute(
+                "SELECT part_number, etag FROM parts WHERE upload_key = ?", (upload_key,)
+            ))
+        return row[0], parts
+
+    def start(self, upload_key: str, bucket: str, key: str, upload_id: str, part_size: int) -> None:
+        """Record a new multipart upload."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM parts WHERE upload_key = ?", (upload_key,))
+            conn.execute(
+                "INSERT OR REPLACE INTO uploads "
+                "(upload_key, bucket, object_key, upload_id, part_size, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (upload_key, bucket, key, upload_id, part_size, time.time())
+            )
+
+    def mark_part(self, upload_key: str, part_number: int, etag: str) -> None:
+        """Record a finished part."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO parts (upload_key, part_number, etag) VALUES (?, ?, ?)",
+                (upload_key, part_number, etag)
+            )
+
+    def clear(self, upload_key: str) -> None:
+        """Forget an upload, e.g. once it has completed."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM parts WHERE upload_key = ?", (upload_key,))
+            conn.execute("DELETE FROM uploads WHERE upload_key = ?", (upload_key,))
+
+
+def make_upload_key(bucket: str, key: str, path: Path, part_size: int) -> str:
+    """Identify an upload so a crashed one can be resumed.
+
+    The key covers the file's size and mtime, so a changed file starts a
+    new upload instead of mixing parts of two versions. ``part_size`` is
+    the requested size; it is adjusted with choose_part_size() exactly as
+    upload_file() does, so callers get the key of the upload it records.
+    """
+    stat = path.stat()
+    part_size = choose_part_size(stat.st_size, part_size)
+    parts = [bucket, key, str(path.resolve()), stat.st_size, stat.st_mtime_ns, part_size]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def choose_part_size(size: int, part_size: int = DEFAULT_PART_SIZE) -> int:
+    """Grow the part size if needed so the file fits in MAX_PARTS parts."""
+    part_size = max(part_size, MIN_PART_SIZE)
+    while -(-size // part_size) > MAX_PARTS:
+        part_size *= 2
+    return part_size
+
+
+def upload_file(
+    client: R2Client,
+    bucket: str,
+    key: str,
+    path: Path,
+    part_size: int = DEFAULT_PART_SIZE,
+    concurrency: int = 8,
+    content_type: Optional[str] = None,
+    state: Optional[UploadState] = None,
+    progress: Optional[Callable[[TransferProgress], None]] = None
+) -> Dict[str, Any]:
+    """Upload a file to R2, in parallel parts when it is large.
+
+    The file is memory-mapped and parts are sent as slices of the mapping,
+    so nothing is copied into Python buffers. The upload ID and each
+    finished part's ETag are recorded in ``state`` as soon as they are
+    known. If the same file is uploaded again after a crash, the parts R2
+    still holds with matching ETags are skipped.
+
+    Args:
+        client: R2 client
+        bucket: Bucket name
+        key: Object key
+        path: File to upload
+        part_size: Bytes per part (raised to fit R2's limits if needed)
+        concurrency: Number of parts in flight
+        content_type: Object content type. Guessed from the file name if not given.
+        state: Where to record progress for resuming
+        progress: Called after every finished part
+
+    Returns:
+        Summary with ``size``, ``parts``, ``skipped_parts``, ``bytes_sent``,
+        ``resumed``, ``etag``, ``duration`` and ``bytes_per_second``
+
+    Raises:
+        R2Error: If a request fails. The recorded state is kept so the
+            upload can be resumed.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    content_type = content_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    part_size = choose_part_size(size, part_size)
+    stats = TransferProgress()
+
+    with open(path, "rb") as f:
+        if size == 0:
+            etag = client.put_object(bucket, key, b"", content_type)
+            return _upload_summary(stats, size, 1, 0, False, etag)
+
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        try:
+            if size <= part_size:
+                etag = client.put_object(bucket, key, view, content_type)
+                stats.add(1, size)
+                if progress is not None:
+                    progress(stats)
+                return _upload_summary(stats, size, 1, 0, False, etag)
+
+            return _upload_parts(
+                client, bucket, key, path, view, part_size, concurrency, content_type,
+                state, stats, progress
+            )
+        finally:
+            view.release()
+            try:
+                mapped.close()
+            except BufferError:
+                # A finished request still holds a slice; the map is freed with it
+                pass
+
+
+def _upload_parts(
+    client: R2Client,
+    bucket: str,
+    key: str,
+    path: Path,
+    view: memoryview,
+    part_size: int,
+    concurrency: int,
+    content_type: str,
+    state: Optional[UploadState],
+    stats: TransferProgress,
+    progress: Optional[Callable[[TransferProgress], None]]
+) -> Dict[str, Any]:
+    """Multipart half of upload_file()."""
+    size = len(view)
+    count = -(-size // part_size)
+    upload_key = make_upload_key(bucket, key, path, part_size)
+    done: Dict[int, str] = {}
+    upload_id = None
+
+    saved = state.get(upload_key) if state is not None else None
+    if saved is not None:
+        upload_id, recorded = saved
+        try:
+            remote = client.list_parts(bucket, key, upload_id)
+        except R2Error as e:
+            if e.status_code != 404:
+                raise
+            # The upload was aborted or expired; start over
+            upload_id = None
+        else:
+            done = {n: etag for n, etag in recorded.items() if remote.get(n) == etag}
+
+    resumed = upload_id is not None
+    if upload_id is None:
+        upload_id = client.create_multipart_upload(bucket, key, content_type)
+        if state is not None:
+            state.start(upload_key, bucket, key, upload_id, part_size)
+
+    def send(number: int) -> str:
+        offset = (number - 1) * part_size
+        etag = client.upload_part(bucket, key, upload_id, number, view[offset:offset + part_size])
+        if state is not None:
+            state.mark_part(upload_key, number, etag)
+        return etag
+
+    pending = [n for n in range(1, count + 1) if n not in done]
+    parts = dict(done)
+    for number, etag in bounded_map(send, pending, max_workers=concurrency):
+        parts[number] = etag
+        stats.add(1, min(part_size, size - (number - 1) * part_size))
+        if progress is not None:
+            progress(stats)
+
+    etag = client.complete_multipart_upload(bucket, key, upload_id, parts)
+    if state is not None:
+        state.clear(upload_key)
+    return _upload_summary(stats, size, count, len(done), resumed, etag)
+
+
+def _upload_summary(
+    stats: TransferProgress,
+    size: int,
+    parts: int,
+    skipped: int,
+    resumed: bool,
+    etag: str
+) -> Dict[str, Any]:
+    summary = stats.summary()
+    return {
+        "size": size,
+        "parts": parts,
+        "skipped_parts": skipped,
+        "bytes_sent": summary["bytes"],
+        "resumed": resumed,
+        "etag": etag,
+        "duration": summary["duration"],
+        "bytes_per_second": summary["bytes_per_second"],
+    }
+
+
+class DownloadState:
+    """Sidecar JSON file recording the finished ranges of a download.
+
+    Lives next to the partial file, so a download can be resumed by
+    running the same command again, and is removed once it completes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def load(self, bucket: str, key: str, size: int, etag: str, range_size: int) -> List[int]:
+        """Get the finished ranges, if the state matches this download."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return []
+        expected = {"bucket": bucket, "key": key, "size": size, "etag": etag,
+                    "range_size": range_size}
+        if any(data.get(name) != value for name, value in expected.items()):
+            return []
+        return [int(index) for index in data.get("done", [])]
+
+    def save(
+        self,
+        bucket: str,
+        key: str,
+        size: int,
+        etag: str,
+        range_size: int,
+        done: List[int]
+    ) -> None:
+        """Record finished ranges, replacing the file atomically."""
+        data = {"bucket": bucket, "key": key, "size": size, "etag": etag,
+                "range_size": range_size, "done": sorted(done)}
+        temp = self.path.with_name(self.path.name + ".tmp")
+        temp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(temp, self.path)
+
+    def clear(self) -> None:
+        """Remove the state file."""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class _ShortRead(Exception):
+    """A range response ended before all its bytes arrived."""
+    pass
+
+
+def _pwrite(fd: int, data: bytes, offset: int) -> None:
+    """Write all of data at an offset without moving a shared file position."""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def download_file(
+    client: R2Client,
+    bucket: str,
+    key: str,
+    destination: Path,
+    range_size: int = DEFAULT_PART_SIZE,
+    concurrency: int = 8,
+    progress: Optional[Callable[[TransferProgress], None]] = None
+) -> Dict[str, Any]:
+    """Download an object with concurrent Range requests.
+
+    The object is fetched into ``<destination>.part``, preallocated to its
+    full size, and each range is written at its offset with os.pwrite as it
+    streams in, so workers never share a file position or buffer a whole
+    range. A range that breaks off is retried from the last byte received.
+    Every request carries If-Match with the object's ETag, so a download
+    never mixes two versions.
+
+    Finished ranges are recorded in a ``<destination>.part.json`` sidecar.
+    Running the same download again after a failure only fetches the
+    ranges that are missing. The partial file is renamed over the
+    destination once complete.
+
+    Args:
+        client: R2 client
+        bucket: Bucket name
+        key: Object key
+        destination: File to write
+        range_size: Bytes per Range request
+        concurrency: Number of ranges in flight
+        progress: Called after every finished range
+
+    Returns:
+        Summary with ``size``, ``ranges``, ``skipped_ranges``,
+        ``bytes_received``, ``resumed``, ``etag``, ``duration`` and
+        ``bytes_per_second``
+
+    Raises:
+        R2Error: If a request fails, or the downloaded data does not match
+            the object's MD5 ETag. The partial file and its state are kept
+            for resuming, except after a checksum mismatch.
+    """
+    destination = Path(destination)
+    partial = destination.with_name(destination.name + ".part")
+    state = DownloadState(partial.with_name(partial.name + ".json"))
+    size, etag = client.head_object(bucket, key)
+    count = max(1, -(-size // range_size))
+    stats = TransferProgress()
+    policy = client.retry_policy
+
+    done = set(state.load(bucket, key, size, etag, range_size)) if partial.exists() else set()
+    resumed = bool(done)
+    if not done:
+        state.clear()
+
+    fd = os.open(partial, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        if not resumed:
+            os.ftruncate(fd, 0)
+            if size and hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(fd, 0, size)
+                except OSError:
+                    # Not supported by every filesystem; the file just grows sparse
+                    pass
+            os.ftruncate(fd, size)
+
+        def fetch(index: int) -> int:
+            start = index * range_size
+            end = min(start + range_size, size) - 1
+            position = start
+            attempt = 0
+            while True:
+                try:
+                    with client.get_object(bucket, key, (position, end), etag) as response:
+                        for chunk in response.iter_content(HASH_BLOCK_SIZE):
+                            _pwrite(fd, chunk, position)
+                            position += len(chunk)
+                    if position <= end:
+                        raise _ShortRead(f"{end + 1 - position} bytes missing")
+                    return end + 1 - start
+                except (requests.RequestException, _ShortRead):
+                    if attempt >= policy.max_retries:
+                        raise R2Error(
+                            f"GET {bucket}/{key}: range {start}-{end} failed after "
+                            f"{attempt + 1} attempts"
+                        )
+                    time.sleep(policy.backoff(attempt))
+                    attempt += 1
+
+        pending = [index for index in range(count) if index not in done] if size else []
+        last_save = time.monotonic()
+        try:
+            for index, received in bounded_map(fetch, pending, max_workers=concurrency):
+                done.add(index)
+                stats.add(1, received)
+                if progress is not None:
+                    progress(stats)
+                if time.monotonic() - last_save >= 1.0:
+                    # Ranges are only recorded once their bytes are on disk
+                    os.fsync(fd)
+                    state.save(bucket, key, size, etag, range_size, list(done))
+                    last_save = time.monotonic()
+        finally:
+            if len(done) < count and done:
+                os.fsync(fd)
+                state.save(bucket, key, size, etag, range_size, list(done))
+    finally:
+        os.close(fd)
+
+    if _MD5_HEX_RE.match(etag) and file_checksums(partial)[0] != etag:
+        state.clear()
+        partial.unlink()
+        raise R2Error(f"Checksum mismatch downloading {bucket}/{key}")
+
+    os.replace(partial, destination)
+    state.clear()
+    summary = stats.summary()
+    return {
+        "size": size,
+        "ranges": count,
+        "skipped_ranges": count - len(pending) if size else 0,
+        "bytes_received": summary["bytes"],
+        "resumed": resumed,
+        "etag": etag,
+        "duration": summary["duration"],
+        "bytes_per_second": summary["bytes_per_second"],
+    }
+
+
+def scan_directory(root: Path) -> Iterator[Tuple[str, Path, int, int]]:
+    """Walk a directory tree with os.scandir, reusing its cached stat results.
+
+    Symlinks to files are followed; symlinked directories are not, so a
+    link cycle cannot make the walk endless.
+
+    Yields:
+        (relative POSIX path, path, size, mtime_ns) for every regular file
+    """
+    root = Path(root)
+    stack = [(root, "")]
+    while stack:
+        directory, relative = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = relative + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((Path(entry.path), name + "/"))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    yield name, Path(entry.path), stat.st_size, stat.st_mtime_ns
+
+
+def file_checksums(path: Path, part_size: int = DEFAULT_PART_SIZE) -> Tuple[str, str]:
+    """Hash a file the way R2 computes its ETag, in one pass.
+
+    Files that upload_file() sends in one request get their MD5 as ETag;
+    multipart uploads get the MD5 of the part MD5s plus the part count.
+
+    Returns:
+        Tuple of (MD5 hex digest, expected ETag)
+    """
+    size = Path(path).stat().st_size
+    part_size = choose_part_size(size, part_size)
+    whole = hashlib.md5()
+    part = hashlib.md5()
+    part_digests = []
+    filled = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(min(HASH_BLOCK_SIZE, part_size - filled))
+            if not block:
+                break
+            whole.update(block)
+            part.update(block)
+            filled += len(block)
+            if filled == part_size:
+                part_digests.append(part.digest())
+                part = hashlib.md5()
+                filled = 0
+    if filled:
+        part_digests.append(part.digest())
+
+    md5 = whole.hexdigest()
+    if size <= part_size:
+        return md5, md5
+    return md5, f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+
+class ManifestEntry(NamedTuple):
+    """What is known about one synced object."""
+
+    size: int
+    mtime_ns: Optional[int]
+    md5: Optional[str]
+    etag: str
+
+
+class R2SyncManifest:
+    """SQLite record of the files last synced to each bucket.
+
+    Lets ``sync()`` skip hashing files whose size and mtime are unchanged,
+    and skip uploading files whose content is unchanged, without listing
+    the bucket.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize sync manifest.
+
+        Args:
+            path: SQLite file to store the manifest in. Defaults to r2sync.db
+                in the Slingshot cache directory.
+        """
+        self.path = Path(path) if path else default_cache_dir() / "r2sync.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS r2_manifest ("
+                "account_id TEXT NOT NULL, bucket TEXT NOT NULL, key TEXT NOT NULL, "
+                "size INTEGER NOT NULL, mtime_ns INTEGER, md5 TEXT, etag TEXT NOT NULL, "
+                "PRIMARY KEY (account_id, bucket, key)) WITHOUT ROWID"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection that commits and closes on exit."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def entries(self, account_id: str, bucket: str, prefix: str = "") -> Dict[str, ManifestEntry]:
+        """Get the recorded objects under a prefix."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, size, mtime_ns, md5, etag FROM r2_manifest "
+                "WHERE account_id = ? AND bucket = ? AND substr(key, 1, length(?)) = ?",
+                (account_id, bucket, prefix, prefix)
+            )
+            return {row[0]: ManifestEntry(*row[1:]) for row in rows}
+
+    def forget(self, account_id: str, bucket: str, prefix: str = "") -> None:
+        """Drop everything recorded under a prefix."""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM r2_manifest "
+                "WHERE account_id = ? AND bucket = ? AND substr(key, 1, length(?)) = ?",
+                (account_id, bucket, prefix, prefix)
+            )
+
+    def sync(
+        self,
+        client: R2Client,
+        bucket: str,
+        prefix: str,
+        root: Path,
+        concurrency: int = 8,
+        part_size: int = DEFAULT_PART_SIZE,
+        delete: bool = False,
+        dry_run: bool = False,
+        full: bool = False,
+        remote: bool = False,
+        state: Optional[UploadState] = None,
+        progress: Optional[Callable[[TransferProgress], None]] = None
+    ) -> Dict[str, Any]:
+        """Make a bucket prefix match a directory by sending only the delta.
+
+        Files whose size and mtime match the manifest are taken as unchanged
+        without reading them. The rest are hashed in a thread pool (hashlib
+        releases the GIL) and compared by content. When nothing is recorded
+        for the prefix yet, or with ``remote``, the comparison is against
+        the ETags of a bucket listing instead, so a first sync of an
+        existing bucket does not re-upload everything.
+
+        Changed files are uploaded concurrently and objects that no longer
+        have a file are bulk-deleted. The manifest is updated as each
+        upload finishes, so an interrupted sync is picked up by the next.
+
+        Args:
+            client: R2 client
+            bucket: Bucket name
+            prefix: Key prefix the directory maps to
+            root: Local directory
+            concurrency: Number of files hashed or uploaded at once
+            part_size: Multipart part size for large files
+            delete: Also delete objects under the prefix that have no file
+            dry_run: Only work out what would be sent
+            full: Upload every file regardless of recorded hashes
+            remote: Compare with the bucket listing instead of the manifest
+            state: Multipart upload state, for resuming large files
+            progress: Called after every finished upload
+
+        Returns:
+            Summary with ``uploaded``, ``deleted``, ``unchanged``, ``hashed``,
+            ``bytes_sent``, ``bytes_skipped``, ``failed``, ``failed_keys``,
+            ``compared_with``, ``duration`` and ``dry_run``
+        """
+        started = time.monotonic()
+        account_id = client.account_id
+        prefix = prefix.strip("/")
+        prefix = prefix + "/" if prefix else ""
+
+        recorded = {} if remote else self.entries(account_id, bucket, prefix)
+        compared_with = "manifest"
+        if not recorded:
+            compared_with = "remote"
+            recorded = {
+                key: ManifestEntry(size, None, None, etag)
+                for key, size, etag in client.list_objects(bucket, prefix)
+            }
+
+        local: Dict[str, Tuple[Path, int, int]] = {}
+        unchanged: List[Tuple[str, ManifestEntry]] = []
+        to_hash: List[str] = []
+        for name, path, size, mtime_ns in scan_directory(root):
+            key = prefix + name
+            local[key] = (path, size, mtime_ns)
+            entry = recorded.get(key)
+            if (not full and entry is not None and entry.md5 is not None
+                    and entry.size == size and entry.mtime_ns == mtime_ns):
+                unchanged.append((key, entry))
+            else:
+                to_hash.append(key)
+
+        uploads: List[Tuple[str, str]] = []
+        for key, (md5, etag) in bounded_map(
+            lambda k: file_checksums(local[k][0], part_size), to_hash, max_workers=concurrency
+        ):
+            path, size, mtime_ns = local[key]
+            entry = recorded.get(key)
+            if (not full and entry is not None and entry.size == size
+                    and (entry.md5 == md5 if entry.md5 else entry.etag == etag)):
+                unchanged.append((key, ManifestEntry(size, mtime_ns, md5, entry.etag)))
+            else:
+                uploads.append((key, md5))
+
+        stale = sorted(key for key in recorded if key not in local) if delete else []
+        bytes_skipped = sum(entry.size for _, entry in unchanged)
+        failed_keys: List[str] = []
+        stats = TransferProgress()
+
+        if dry_run:
+            return {
+                "uploaded": len(uploads),
+                "deleted": len(stale),
+                "unchanged": len(unchanged),
+                "hashed": len(to_hash),
+                "bytes_sent": sum(local[key][1] for key, _ in uploads),
+                "bytes_skipped": bytes_skipped,
+                "failed": 0,
+                "failed_keys": [],
+                "compared_with": compared_with,
+                "duration": time.monotonic() - started,
+                "dry_run": True,
+            }
+
+        def upload(item: Tuple[str, str]) -> Union[str, Exception]:
+            key, _ = item
+            try:
+                # Files are already uploaded side by side, so parts go one at a time
+                return upload_file(client, bucket, key, local[key][0], part_size=part_size,
+                                   concurrency=1, state=state)["etag"]
+            except (R2Error, OSError, requests.RequestException) as e:
+                return e
+
+        def delete_batch(keys: List[str]) -> Union[List[str], Exception]:
+            try:
+                return client.delete_objects(bucket, keys)
+            except (R2Error, requests.RequestException) as e:
+                return e
+
+        record = (
+            "INSERT OR REPLACE INTO r2_manifest "
+            "(account_id, bucket, key, size, mtime_ns, md5, etag) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        )
+        uploaded = deleted = 0
+        with self._connect() as conn:
+            conn.executemany(record, [
+                (account_id, bucket, key, *entry) for key, entry in unchanged
+            ])
+            conn.commit()
+
+            for (key, md5), result in bounded_map(upload, uploads, max_workers=concurrency):
+                if isinstance(result, Exception):
+                    failed_keys.append(key)
+                    stats.add(0, failed=1)
+                else:
+                    _, size, mtime_ns = local[key]
+                    conn.execute(record, (account_id, bucket, key, size, mtime_ns, md5, result))
+                    conn.commit()
+                    uploaded += 1
+                    stats.add(1, size)
+                if progress is not None:
+                    progress(stats)
+
+            batches = [stale[i:i + DELETE_MAX_KEYS] for i in range(0, len(stale), DELETE_MAX_KEYS)]
+            for batch, result in bounded_map(delete_batch, batches, max_workers=concurrency):
+                failed = set(batch if isinstance(result, Exception) else result)
+                failed_keys += [key for key in batch if key in failed]
+                done = [key for key in batch if key not in failed]
+                conn.executemany(
+                    "DELETE FROM r2_manifest WHERE account_id = ? AND bucket = ? AND key = ?",
+                    [(account_id, bucket, key) for key in done]
+                )
+                deleted += len(done)
+
+        return {
+            "uploaded": uploaded,
+            "deleted": deleted,
+            "unchanged": len(unchanged),
+            "hashed": len(to_hash),
+            "bytes_sent": stats.bytes,
+            "bytes_skipped": bytes_skipped,
+            "failed": len(failed_keys),
+            "failed_keys": failed_keys,
+            "compared_with": compared_with,
+            "duration": time.monotonic() - started,
+            "dry_run": False,
+        }
@@ -0,0 +1,184 @@
+"""Client-side rate limiting for Cloudflare API requests."""
+
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+class RateLimiter(ABC):
+    """Base class for rate limiters used by CloudflareClient."""
+
+    @abstractmethod
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until the requested number of tokens is available.
+
+        Args:
+            tokens: Number of tokens to consume
+
+        Returns:
+            Seconds spent waiting
+        """
+
+
+class TokenBucket(RateLimiter):
+    """Thread-safe token bucket shared by everything in one process."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity. Defaults to one second's worth of tokens.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until the requested number of tokens is available."""
+        if tokens > self.burst:
+            raise ValueError("Cannot acquire more tokens than the bucket holds")
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+
+                delay = (tokens - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+class SQLiteTokenBucket(RateLimiter):
+    """Token bucket whose state lives in a SQLite file.
+
+    Every process pointing at the same file draws from the same budget, so
+    parallel CI jobs on one runner share the account's API allowance. SQLite's
+    write lock serializes the refill-and-take step across processes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        rate: float,
+        burst: Optional[float] = None,
+        key: str = "default"
+    ):
+        """Initialize shared token bucket.
+
+        Args:
+            path: Path to the SQLite state file. Created if missing.
+            rate: Tokens added per second
+            burst: Bucket capacity. Defaults to one second's worth of tokens.
+            key: Bucket name, so one file can hold several independent budgets
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.path = Path(path)
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.key = key
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection to the state file."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _take(self, tokens: float) -> float:
+        """Refill and try to take tokens in one locked transaction.
+
+        Returns:
+            0 if the tokens were taken, otherwise seconds until they will be
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (self.key,)
+            ).fetchone()
+            if row is None:
+                available = self.burst
+            else:
+                available = min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+
+            if available >= tokens:
+                available -= tokens
+                delay = 0.0
+            else:
+                delay = (tokens - available) / self.rate
+
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (self.key, available, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return delay
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until the requested number of tokens is available."""
+        if tokens > self.burst:
+            raise ValueError("Cannot acquire more tokens than the bucket holds")
+
+        waited = 0.0
+        while True:
+            delay = self._take(tokens)
+            if delay == 0.0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+
+def build_rate_limiter(
+    rate: Optional[float],
+    burst: Optional[float] = None,
+    state_path: Optional[str] = None
+) -> Optional[RateLimiter]:
+    """Create the rate limiter described by configuration values.
+
+    Args:
+        rate: Requests per second, or None to disable rate limiting
+        burst: Bucket capacity
+        state_path: SQLite file to share the budget across processes
+
+    Returns:
+        Rate limiter instance, or None if no rate is configured
+    """
+    if not rate:
+        return None
+    if state_path:
+        return SQLiteTokenBucket(os.path.expanduser(state_path), rate=rate, burst=burst)
+    return TokenBucket(rate=rate, burst=burst)
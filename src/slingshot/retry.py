@@ -0,0 +1,143 @@
+"""Retry policy for Cloudflare API requests."""
+
+import random
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+
+class RetryPolicy:
+    """Decides whether and when a failed API request should be retried.
+
+    Backoff is exponential with full jitter. A ``Retry-After`` header on the
+    response always takes precedence over the computed backoff. Requests with
+    non-idempotent methods (POST, PATCH) are only replayed when the server
+    explicitly rejected them with a rate-limit status, since any other failure
+    may have happened after the request was applied.
+    """
+
+    DEFAULT_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        max_retry_after: float = 120.0,
+        retry_statuses: Optional[Iterable[int]] = None
+    ):
+        """Initialize retry policy.
+
+        Args:
+            max_retries: Maximum number of retries after the first attempt
+            backoff_factor: Base delay in seconds, doubled on every retry
+            max_backoff: Upper bound for the computed backoff delay
+            max_retry_after: Give up instead of sleeping if the server asks for
+                a longer Retry-After than this
+            retry_statuses: HTTP status codes that are worth retrying
+        """
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = (
+            frozenset(retry_statuses) if retry_statuses is not None
+            else self.DEFAULT_RETRY_STATUSES
+        )
+
+    @classmethod
+    def disabled(cls) -> "RetryPolicy":
+        """Create a policy that never retries."""
+        return cls(max_retries=0)
+
+    def is_idempotent(self, method: str) -> bool:
+        """Check whether a request with this method can be safely replayed."""
+        return method.upper() in self.IDEMPOTENT_METHODS
+
+    def should_retry_status(
+        self,
+        method: str,
+        status_code: int,
+        attempt: int,
+        idempotent: bool = False
+    ) -> bool:
+        """Check whether a response status warrants another attempt.
+
+        Args:
+            method: HTTP method of the request
+            status_code: HTTP status of the response
+            attempt: Zero-based number of the attempt that just failed
+            idempotent: The request is safe to replay whatever its method,
+                e.g. a POST that deletes keys
+
+        Returns:
+            True if the request should be retried
+        """
+        if attempt >= self.max_retries or status_code not in self.retry_statuses:
+            return False
+        return status_code == 429 or idempotent or self.is_idempotent(method)
+
+    def should_retry_error(
+        self,
+        method: str,
+        connect_error: bool,
+        attempt: int,
+        idempotent: bool = False
+    ) -> bool:
+        """Check whether a transport error warrants another attempt.
+
+        Args:
+            method: HTTP method of the request
+            connect_error: True if the connection was never established, so
+                the request cannot have reached the server
+            attempt: Zero-based number of the attempt that just failed
+            idempotent: The request is safe to replay whatever its method
+
+        Returns:
+            True if the request should be retried
+        """
+        if attempt >= self.max_retries:
+            return False
+        return connect_error or idempotent or self.is_idempotent(method)
+
+    def backoff(self, attempt: int) -> float:
+        """Compute the jittered delay before the next attempt.
+
+        Args:
+            attempt: Zero-based number of the attempt that just failed
+
+        Returns:
+            Delay in seconds
+        """
+        ceiling = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date.
+
+        Args:
+            value: Raw header value
+
+        Returns:
+            Delay in seconds, or None if the header is missing or invalid
+        """
+        if not value:
+            return None
+
+        value = value.strip()
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,113 @@
+"""Local record of what was last deployed, used to skip no-op deploys."""
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from .cache import default_cache_dir
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def deployment_digest(files: Sequence[Tuple[str, Path]], metadata: Dict[str, Any]) -> str:
+    """Compute a stable digest of a worker's modules and metadata.
+
+    Args:
+        files: (module name, path) of every uploaded file, main module first
+        metadata: Metadata that will be uploaded with the script
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(metadata, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    for name, path in files:
+        digest.update(b"\0" + name.encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DeployStateStore:
+    """SQLite record of the last deployed digest per account and worker."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize deploy state store.
+
+        Args:
+            path: SQLite file to store state in. Defaults to deploys.db in
+                the Slingshot cache directory.
+        """
+        self.path = Path(path) if path else default_cache_dir() / "deploys.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS deployments ("
+                "account_id TEXT NOT NULL, worker_name TEXT NOT NULL, digest TEXT NOT NULL, "
+                "etag TEXT, deployed REAL NOT NULL, PRIMARY KEY (account_id, worker_name))"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection that commits and closes on exit."""
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, account_id: str, worker_name: str) -> Optional[Dict[str, Any]]:
+        """Look up the last recorded deployment of a worker.
+
+        Args:
+            account_id: Cloudflare account ID
+            worker_name: Name of the worker
+
+        Returns:
+            Dict with ``digest``, ``etag`` and ``deployed``, or None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT digest, etag, deployed FROM deployments "
+                "WHERE account_id = ? AND worker_name = ?",
+                (account_id, worker_name)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"digest": row[0], "etag": row[1], "deployed": row[2]}
+
+    def record(
+        self,
+        account_id: str,
+        worker_name: str,
+        digest: str,
+        etag: Optional[str] = None
+    ) -> None:
+        """Record a successful deployment.
+
+        Args:
+            account_id: Cloudflare account ID
+            worker_name: Name of the worker
+            digest: Digest from deployment_digest()
+            etag: Script etag reported by the API, if any
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO deployments "
+                "(account_id, worker_name, digest, etag, deployed) VALUES (?, ?, ?, ?, ?)",
+                (account_id, worker_name, digest, etag, time.time())
+            )
+
+    def forget(self, account_id: str, worker_name: str) -> None:
+        """Drop the record for a worker, e.g. after it was deleted."""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM deployments WHERE account_id = ? AND worker_name = ?",
+                (account_id, worker_name)
+            )
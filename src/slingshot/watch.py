@@ -0,0 +1,310 @@
+"""File watching and the `slingshot dev` redeploy loop."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from .deployer import DeploymentError, WorkerDeployer
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+# Editors often save by writing a temp file and renaming it over the
+# original, so directories are watched and events filtered by name
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+    | _IN_CREATE | _IN_DELETE
+)
+_EVENT = struct.Struct("iIII")
+
+
+class FileWatcher(ABC):
+    """Base class for watchers that report changes to a set of files."""
+
+    def __init__(self, paths: Iterable[Path]):
+        """Initialize watcher.
+
+        Args:
+            paths: Files to watch
+        """
+        self.paths: Set[Path] = set()
+        self.set_paths(paths)
+
+    def set_paths(self, paths: Iterable[Path]) -> None:
+        """Replace the set of watched files."""
+        self.paths = {Path(p).resolve() for p in paths}
+
+    @abstractmethod
+    def poll(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Wait for changes.
+
+        Args:
+            timeout: Seconds to wait; None waits indefinitely
+
+        Returns:
+            Watched files that changed, empty if the timeout expired
+        """
+
+    def close(self) -> None:
+        """Release any OS resources."""
+        pass
+
+
+class PollingWatcher(FileWatcher):
+    """Detects changes by comparing file mtimes and sizes."""
+
+    def __init__(self, paths: Iterable[Path], interval: float = 0.5):
+        """Initialize polling watcher.
+
+        Args:
+            paths: Files to watch
+            interval: Seconds between scans
+        """
+        self.interval = interval
+        self._snapshot: Dict[Path, Optional[Tuple[int, int]]] = {}
+        super().__init__(paths)
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def set_paths(self, paths: Iterable[Path]) -> None:
+        super().set_paths(paths)
+        self._snapshot = {
+            path: self._snapshot[path] if path in self._snapshot else self._stat(path)
+            for path in self.paths
+        }
+
+    def poll(self, timeout: Optional[float] = None) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, previous in self._snapshot.items():
+                current = self._stat(path)
+                if current != previous:
+                    self._snapshot[path] = current
+                    changed.add(path)
+            if changed:
+                return changed
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+
+
+class InotifyWatcher(FileWatcher):
+    """Linux inotify watcher, using libc directly through ctypes."""
+
+    def __init__(self, paths: Iterable[Path]):
+        """Initialize inotify watcher.
+
+        Args:
+            paths: Files to watch
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._watches: Dict[int, Path] = {}
+        try:
+            super().__init__(paths)
+        except OSError:
+            self.close()
+            raise
+
+    def set_paths(self, paths: Iterable[Path]) -> None:
+        super().set_paths(paths)
+        wanted = {path.parent for path in self.paths}
+        watched = set(self._watches.values())
+
+        for wd, directory in list(self._watches.items()):
+            if directory not in wanted:
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._watches[wd]
+
+        for directory in wanted - watched:
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(str(directory)), _WATCH_MASK
+            )
+            if wd < 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, f"Cannot watch {directory}: {os.strerror(errno)}")
+            self._watches[wd] = directory
+
+    def poll(self, timeout: Optional[float] = None) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return set()
+
+            changed = set()
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                data = b""
+            offset = 0
+            while offset + _EVENT.size <= len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    # Events were dropped; assume everything changed
+                    changed |= self.paths
+                    continue
+                directory = self._watches.get(wd)
+                if directory is not None and name:
+                    path = directory / os.fsdecode(name)
+                    if path in self.paths:
+                        changed.add(path)
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(paths: Iterable[Path], poll_interval: float = 0.5) -> FileWatcher:
+    """Create an inotify watcher, falling back to polling where unavailable.
+
+    Args:
+        paths: Files to watch
+        poll_interval: Seconds between scans for the polling fallback
+
+    Returns:
+        File watcher
+    """
+    paths = list(paths)
+    try:
+        return InotifyWatcher(paths)
+    except (OSError, AttributeError):
+        return PollingWatcher(paths, interval=poll_interval)
+
+
+def wait_for_changes(
+    watcher: FileWatcher,
+    debounce: float = 0.2,
+    timeout: Optional[float] = None
+) -> Tuple[Set[Path], float]:
+    """Wait for a burst of changes to settle.
+
+    After the first change, further changes are collected until none has
+    arrived for ``debounce`` seconds, so a save that touches several files
+    (or writes one file in several steps) triggers a single redeploy.
+
+    Args:
+        watcher: File watcher
+        debounce: Quiet period that ends a burst, in seconds
+        timeout: Seconds to wait for the first change; None waits indefinitely
+
+    Returns:
+        Tuple of (changed files, monotonic time of the first change). The
+        set is empty if the timeout expired.
+    """
+    changed = watcher.poll(timeout)
+    first_change = time.monotonic()
+    while changed:
+        more = watcher.poll(debounce)
+        if not more:
+            break
+        changed |= more
+    return changed, first_change
+
+
+def watch_and_deploy(
+    deployer: WorkerDeployer,
+    watcher: Optional[FileWatcher] = None,
+    debounce: float = 0.2,
+    poll_interval: float = 0.5,
+    max_cycles: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """Deploy a worker, then redeploy it whenever its files change.
+
+    The deployer (and its HTTP session) stays alive across cycles, and the
+    config file is re-read in place, so a cycle costs a digest and, when
+    the content changed, a single upload.
+
+    Args:
+        deployer: Deployer for the worker
+        watcher: File watcher. Created with create_watcher() if not given.
+        debounce: Quiet period that ends a burst of saves, in seconds
+        poll_interval: Seconds between scans if inotify is unavailable
+        max_cycles: Stop after this many cycles (including the initial
+            deploy); None runs until interrupted
+
+    Yields:
+        Deploy results with ``changed`` (files that triggered the cycle) and
+        ``latency`` (seconds from the first detected change until the worker
+        was live, or the skip/failure was known). Failures are reported with
+        status "failed" and an ``error`` message instead of being raised.
+    """
+    config = deployer.config
+    cycle = 0
+    changed: Set[Path] = set()
+    started = time.monotonic()
+    owns_watcher = watcher is None
+
+    try:
+        while max_cycles is None or cycle < max_cycles:
+            try:
+                if config.config_path.resolve() in changed:
+                    config.load()
+                # Only the first cycle checks the remote etag; after that we
+                # know what we last uploaded
+                result = deployer.deploy(verify_remote=cycle == 0)
+            except (DeploymentError, ValueError) as e:
+                result = {"worker_name": config.worker_name, "status": "failed", "error": str(e)}
+            result["changed"] = sorted(str(path) for path in changed)
+            result["latency"] = time.monotonic() - started
+            cycle += 1
+            yield result
+
+            if max_cycles is not None and cycle >= max_cycles:
+                break
+
+            try:
+                paths = [module.path for module in deployer.resolve_modules()]
+            except DeploymentError:
+                # Keep watching what we had until the import is fixed
+                paths = list(watcher.paths) if watcher is not None else []
+            paths.append(config.config_path.resolve())
+            paths.append(config.main_script_path.resolve())
+
+            if watcher is None:
+                watcher = create_watcher(paths, poll_interval=poll_interval)
+            else:
+                watcher.set_paths(paths)
+            changed, started = wait_for_changes(watcher, debounce=debounce)
+    finally:
+        if owns_watcher and watcher is not None:
+            watcher.close()
@@ -6,6 +6,12 @@ import tempfile
 import os
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep Slingshot's local state out of the real home directory."""
+    monkeypatch.setenv("SLINGSHOT_CACHE_DIR", str(tmp_path / "slingshot-cache"))
+
+
 @pytest.fixture
 def temp_dir():
     """Create a temporary directory for tests."""
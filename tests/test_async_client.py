@@ -0,0 +1,121 @@
+"""Tests for the asyncio Cloudflare API client."""
+
+import asyncio
+import inspect
+
+import pytest
+import responses
+from slingshot.async_client import AsyncCloudflareClient
+from slingshot.client import CloudflareAPIError, CloudflareClient
+
+
+BASE = "https://api.cloudflare.com/client/v4/accounts/test_account_id"
+
+
+@pytest.fixture
+def async_client():
+    """Create a test async Cloudflare client."""
+    client = AsyncCloudflareClient(
+        account_id="test_account_id",
+        api_token="test_api_token",
+        max_concurrency=4
+    )
+    yield client
+    client.close()
+
+
+def test_async_client_invalid_concurrency():
+    """Test that a non-positive concurrency limit is rejected."""
+    with pytest.raises(ValueError):
+        AsyncCloudflareClient("test_account_id", "test_api_token", max_concurrency=0)
+
+
+@responses.activate
+def test_async_list_workers(async_client):
+    """Test listing workers through the async client."""
+    responses.add(
+        responses.GET,
+        f"{BASE}/workers/scripts",
+        json={"success": True, "result": [{"id": "worker-1"}]},
+        status=200
+    )
+
+    workers = asyncio.run(async_client.list_workers())
+    assert workers[0]["id"] == "worker-1"
+
+
+@responses.activate
+def test_async_fan_out_delete(async_client):
+    """Test running many calls concurrently with gather."""
+    for i in range(10):
+        responses.add(
+            responses.DELETE,
+            f"{BASE}/workers/scripts/worker-{i}",
+            json={"success": True, "result": {"id": f"worker-{i}"}},
+            status=200
+        )
+
+    async def run():
+        return await asyncio.gather(
+            *(async_client.delete_worker(f"worker-{i}") for i in range(10))
+        )
+
+    results = asyncio.run(run())
+    assert [r["id"] for r in results] == [f"worker-{i}" for i in range(10)]
+
+
+@responses.activate
+def test_async_api_error(async_client):
+    """Test that API errors propagate out of the coroutine."""
+    responses.add(
+        responses.POST,
+        f"{BASE}/storage/kv/namespaces",
+        json={"success": False, "errors": [{"message": "Bad title"}]},
+        status=400
+    )
+
+    with pytest.raises(CloudflareAPIError) as exc_info:
+        asyncio.run(async_client.create_kv_namespace("bad"))
+
+    assert exc_info.value.status_code == 400
+
+
+def test_async_client_covers_every_client_method(async_client):
+    """Test that every public client method can be awaited."""
+    names = [
+        name for name in dir(CloudflareClient)
+        if not name.startswith("_") and callable(getattr(CloudflareClient, name))
+    ]
+    missing = [
+        name for name in names
+        if name != "close" and not (
+            inspect.iscoroutinefunction(getattr(async_client, name))
+            or inspect.isasyncgenfunction(getattr(async_client, name))
+        )
+    ]
+    assert missing == []
+    with pytest.raises(AttributeError):
+        async_client.no_such_method
+
+
+@responses.activate
+def test_async_iter_methods_fetch_pages_lazily(async_client):
+    """Test that iterator methods become async iterators pulling one chunk at a time."""
+    url = f"{BASE}/storage/kv/namespaces/ns1/keys"
+    first_page = {"success": True, "result": [{"name": "a"}, {"name": "b"}],
+                  "result_info": {"cursor": "next"}}
+    last_page = {"success": True, "result": [{"name": "c"}], "result_info": {"cursor": ""}}
+    for page in (first_page, first_page, last_page):
+        responses.add(responses.GET, url, json=page, status=200)
+    async_client.ITER_CHUNK_SIZE = 2
+
+    async def first_key():
+        async for key in async_client.iter_kv_keys("ns1"):
+            return key["name"]
+
+    async def all_keys():
+        return [key["name"] async for key in async_client.iter_kv_keys("ns1")]
+
+    assert asyncio.run(first_key()) == "a"
+    assert len(responses.calls) == 1
+    assert asyncio.run(all_keys()) == ["a", "b", "c"]
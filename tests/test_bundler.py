@@ -0,0 +1,100 @@
+"""Tests for the worker bundler."""
+
+import pytest
+from slingshot.bundler import BuildCache, BuildError, Bundler, transform
+
+
+def write_project(root):
+    """Create a small multi-module worker."""
+    (root / "lib").mkdir()
+    (root / "worker.js").write_text(
+        '// entry point\n'
+        'import { greet, VERSION as V } from "./lib/util.js";\n'
+        'import Router from "./lib/router";\n'
+        'import * as sockets from "cloudflare:sockets";\n'
+        'export { default as R } from "./lib/router.js";\n'
+        '\n'
+        'export default {\n'
+        '  async fetch(req) {\n'
+        '    /* respond */\n'
+        '    return new Response(greet("x") + V + new Router().name);\n'
+        '  }\n'
+        '};\n'
+    )
+    (root / "lib" / "util.js").write_text(
+        'export const VERSION = "1.0";\n'
+        'export function greet(n) { return `hi   ${n}`; }\n'
+    )
+    (root / "lib" / "router.js").write_text(
+        'import { VERSION } from "./util.js";\n'
+        'export default class Router { constructor() { this.name = "r" + VERSION; } }\n'
+    )
+
+
+def test_transform_rewrites_imports_and_exports():
+    """Test that module syntax becomes plain bindings."""
+    module = transform(
+        'import a, { b as c } from "./x.js";\n'
+        'import "./side.js";\n'
+        'export const d = 1;\n'
+        'export default function main() {}\n'
+        'export { c as e };\n'
+    )
+
+    assert module.deps == ["./x.js", "./side.js"]
+    assert "const a = __SLINGSHOT_DEP_0__.default;" in module.code
+    assert "const { b: c } = __SLINGSHOT_DEP_0__;" in module.code
+    assert "import" not in module.code
+    assert "export" not in module.code
+    assert module.exports == [("e", "c"), ("default", "main"), ("d", "d")]
+
+
+def test_transform_minify_keeps_literals():
+    """Test that minifying leaves strings and templates untouched."""
+    module = transform('const s = "a  //  b";\n\n\n   const t = `x\n\n  y`;  // note\n')
+    assert module.code == 'const s = "a  //  b";\nconst t = `x\n\n  y`;'
+
+
+def test_transform_rejects_local_dynamic_import():
+    """Test that dynamic imports of bundled files fail loudly."""
+    with pytest.raises(BuildError, match="Dynamic import"):
+        transform('const m = await import("./lazy.js");')
+
+
+def test_bundle_inlines_modules(temp_dir):
+    """Test bundling a graph into one module."""
+    write_project(temp_dir)
+    result = Bundler().build(temp_dir / "worker.js")
+
+    assert [p.name for p in result.modules] == ["util.js", "router.js", "worker.js"]
+    assert result.code.startswith('import * as __slingshot_ext_0 from "cloudflare:sockets";')
+    assert result.code.count("import ") == 1
+    assert "const __slingshot_m0 = (() => {" in result.code
+    assert "export { __slingshot_default as default };" in result.code
+    assert "export { __slingshot_re_0 as R };" in result.code
+    assert "entry point" not in result.code
+    assert "`hi   ${n}`" in result.code
+
+
+def test_bundle_uses_build_cache(temp_dir):
+    """Test that only changed files are transformed again."""
+    write_project(temp_dir)
+    cache = BuildCache(str(temp_dir / "build.db"))
+
+    first = Bundler(cache=cache).build(temp_dir / "worker.js")
+    assert (first.transformed, first.cached) == (3, 0)
+
+    (temp_dir / "lib" / "util.js").write_text('export const VERSION = "2.0";\n'
+                                               'export function greet(n) { return n; }\n')
+    second = Bundler(cache=cache).build(temp_dir / "worker.js")
+    assert (second.transformed, second.cached) == (1, 2)
+    assert '"2.0"' in second.code
+
+
+def test_bundle_rejects_cycles(temp_dir):
+    """Test that circular imports are reported."""
+    (temp_dir / "a.js").write_text('import "./b.js";\nexport default 1;\n')
+    (temp_dir / "b.js").write_text('import "./a.js";\n')
+
+    with pytest.raises(BuildError, match="Circular import: a.js -> b.js -> a.js"):
+        Bundler().build(temp_dir / "a.js")
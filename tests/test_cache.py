@@ -0,0 +1,117 @@
+"""Tests for the API response cache."""
+
+import pytest
+import responses
+from slingshot.cache import ResponseCache, TokenVerificationCache, default_cache_dir
+from slingshot.client import CloudflareClient
+
+
+WORKERS_URL = "https://api.cloudflare.com/client/v4/accounts/test_account_id/workers/scripts"
+
+
+@pytest.fixture
+def cache(temp_dir):
+    """Create a response cache in a temporary directory."""
+    return ResponseCache(str(temp_dir / "responses.db"), ttl=60)
+
+
+@pytest.fixture
+def cached_client(cache):
+    """Create a test client backed by the response cache."""
+    return CloudflareClient("test_account_id", "test_api_token", cache=cache)
+
+
+def test_default_cache_dir_override(monkeypatch, temp_dir):
+    """Test that SLINGSHOT_CACHE_DIR overrides the default location."""
+    monkeypatch.setenv("SLINGSHOT_CACHE_DIR", str(temp_dir))
+    assert default_cache_dir() == temp_dir
+
+
+def test_cache_key_depends_on_params_and_credential():
+    """Test that distinct requests never share a key."""
+    key = ResponseCache.make_key("acct", "workers/scripts", {"page": 1})
+    assert key == ResponseCache.make_key("acct", "workers/scripts", {"page": 1})
+    assert key != ResponseCache.make_key("acct", "workers/scripts", {"page": 2})
+    assert key != ResponseCache.make_key("acct", "workers/scripts", {"page": 1}, credential="x")
+
+
+def test_cache_evicts_least_recently_used(temp_dir):
+    """Test that the size bound evicts the oldest entries first."""
+    cache = ResponseCache(str(temp_dir / "responses.db"), max_bytes=120)
+    body = {"result": "x" * 40}
+    cache.put("a", "acct", body)
+    cache.put("b", "acct", body)
+    cache.get("a")
+    cache.put("c", "acct", body)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+@responses.activate
+def test_fresh_entry_skips_network(cached_client):
+    """Test that repeated reads are served from the cache."""
+    responses.add(
+        responses.GET,
+        WORKERS_URL,
+        json={"success": True, "result": [{"id": "worker-1"}]},
+        status=200
+    )
+
+    assert cached_client.list_workers() == cached_client.list_workers()
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_stale_entry_revalidated_with_etag(temp_dir):
+    """Test If-None-Match revalidation of a stale entry."""
+    cache = ResponseCache(str(temp_dir / "responses.db"), ttl=0)
+    client = CloudflareClient("test_account_id", "test_api_token", cache=cache)
+    responses.add(
+        responses.GET,
+        WORKERS_URL,
+        json={"success": True, "result": [{"id": "worker-1"}]},
+        headers={"ETag": '"v1"'},
+        status=200
+    )
+    responses.add(responses.GET, WORKERS_URL, status=304)
+
+    client.list_workers()
+    assert client.list_workers()[0]["id"] == "worker-1"
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+
+@responses.activate
+def test_mutation_invalidates_cache(cached_client):
+    """Test that a write drops the account's cached reads."""
+    responses.add(
+        responses.GET,
+        WORKERS_URL,
+        json={"success": True, "result": [{"id": "worker-1"}]},
+        status=200
+    )
+    responses.add(
+        responses.DELETE,
+        f"{WORKERS_URL}/worker-1",
+        json={"success": True, "result": {"id": "worker-1"}},
+        status=200
+    )
+
+    cached_client.list_workers()
+    cached_client.delete_worker("worker-1")
+    cached_client.list_workers()
+    assert len(responses.calls) == 3
+
+
+def test_token_verification_cache(temp_dir):
+    """Test remembering and forgetting verified tokens."""
+    cache = TokenVerificationCache(str(temp_dir / "tokens.db"), ttl=60)
+    assert cache.is_verified("secret") is False
+
+    cache.mark_verified("secret")
+    assert cache.is_verified("secret") is True
+    assert "secret" not in (temp_dir / "tokens.db").read_bytes().decode("latin-1")
+
+    cache.forget("secret")
+    assert cache.is_verified("secret") is False
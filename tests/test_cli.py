@@ -92,3 +92,299 @@ def test_deploy_dry_run(cli_runner, temp_dir, mock_env_credentials, sample_worke
         result = cli_runner.invoke(main, ['deploy', '--dry-run'])
         assert result.exit_code == 0
         assert 'Validation successful' in result.output
+
+
+def test_deploy_all_dry_run(cli_runner, temp_dir, mock_env_credentials, sample_worker_script,
+                            monkeypatch):
+    """Test deploying every project below the current directory."""
+    import json
+
+    monkeypatch.chdir(temp_dir)
+    for name in ('one', 'two'):
+        Path(name).mkdir()
+        Path(name, '.slingshot.json').write_text(json.dumps({"worker_name": name}))
+        Path(name, 'worker.js').write_text(sample_worker_script)
+
+    result = cli_runner.invoke(main, ['deploy', '--all', '--dry-run', '--jobs', '2'])
+    assert result.exit_code == 0
+    assert 'one' in result.output
+    assert 'two' in result.output
+    assert 'Deploy report (2 workers)' in result.output
+
+
+def test_deploy_all_rejects_config(cli_runner, temp_dir, mock_env_credentials, monkeypatch):
+    """Test that --config is refused with --all instead of being ignored."""
+    monkeypatch.chdir(temp_dir)
+
+    result = cli_runner.invoke(main, ['deploy', '--all', '--config', 'other/.slingshot.json'])
+    assert result.exit_code == 1
+    assert '--config cannot be combined with --all' in result.output
+
+
+def test_build_command(cli_runner, temp_dir, mock_env_credentials, sample_config, monkeypatch):
+    """Test bundling a worker into dist/."""
+    import json
+
+    monkeypatch.chdir(temp_dir)
+    Path('.slingshot.json').write_text(json.dumps(sample_config))
+    Path('util.js').write_text('export const greeting = "hello";\n')
+    Path('worker.js').write_text(
+        'import { greeting } from "./util.js";\n'
+        'export default { fetch() { return new Response(greeting); } };\n'
+    )
+
+    result = cli_runner.invoke(main, ['build'])
+    assert result.exit_code == 0
+    assert 'Modules: 2 (2 transformed, 0 cached)' in result.output
+    assert 'import' not in Path('dist', 'worker.js').read_text()
+
+
+def test_kv_import_command(cli_runner, temp_dir, mock_env_credentials, monkeypatch):
+    """Test importing a dataset into a namespace named by its binding."""
+    import json
+    import responses
+
+    monkeypatch.chdir(temp_dir)
+    Path('.slingshot.json').write_text(json.dumps({
+        "worker_name": "w", "kv_namespaces": [{"binding": "CACHE", "id": "ns1"}]
+    }))
+    Path('data.jsonl').write_text('{"key": "a", "value": "1"}\n{"key": "b", "value": "2"}\n')
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.PUT,
+            "https://api.cloudflare.com/client/v4/accounts/test_account_id"
+            "/storage/kv/namespaces/ns1/bulk",
+            json={"success": True, "result": {"successful_key_count": 2, "unsuccessful_keys": []}}
+        )
+        result = cli_runner.invoke(main, ['kv', 'import', 'CACHE', 'data.jsonl'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Imported 2 keys in 1 batches' in result.output
+
+
+def test_kv_purge_dry_run(cli_runner, temp_dir, mock_env_credentials, monkeypatch):
+    """Test counting the keys a prefix purge would delete."""
+    import responses
+
+    monkeypatch.chdir(temp_dir)
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.GET,
+            "https://api.cloudflare.com/client/v4/accounts/test_account_id"
+            "/storage/kv/namespaces/ns1/keys",
+            json={"success": True, "result": [{"name": "tmp:1"}, {"name": "tmp:2"}],
+                  "result_info": {"cursor": ""}}
+        )
+        result = cli_runner.invoke(main, ['kv', 'purge', 'ns1', '--prefix', 'tmp:', '--dry-run'])
+
+    assert result.exit_code == 0, result.output
+    assert "2 keys starting with 'tmp:' would be deleted" in result.output
+
+
+def test_d1_import_csv(cli_runner, temp_dir, mock_env_credentials, monkeypatch):
+    """Test importing a CSV file into a database named by its binding."""
+    import json
+    import responses
+
+    monkeypatch.chdir(temp_dir)
+    Path('.slingshot.json').write_text(json.dumps({
+        "worker_name": "w", "d1_databases": [{"binding": "DB", "database_id": "db1"}]
+    }))
+    Path('users.csv').write_text('id,name\n1,Ada\n2,Grace\n')
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.POST,
+            "https://api.cloudflare.com/client/v4/accounts/test_account_id/d1/database/db1/query",
+            json={"success": True, "result": [{"results": [], "meta": {}}]}
+        )
+        result = cli_runner.invoke(main, ['d1', 'import', 'DB', 'users.csv', '--table', 'users'])
+        sent = json.loads(rsps.calls[0].request.body)
+
+    assert result.exit_code == 0, result.output
+    assert 'Imported 2 rows into users in 1 chunks' in result.output
+    assert sent == {"batch": [{
+        "sql": 'INSERT INTO "users" ("id", "name") VALUES (\'1\',\'Ada\'),(\'2\',\'Grace\')'
+    }]}
+
+
+def test_d1_query_local(cli_runner, temp_dir, monkeypatch):
+    """Test querying the local mirror without calling the API."""
+    import json
+    import sqlite3
+    from slingshot.d1 import D1Mirror
+
+    monkeypatch.chdir(temp_dir)
+    Path('.slingshot.json').write_text(json.dumps({
+        "worker_name": "w", "d1_databases": [{"binding": "DB", "database_id": "db1"}]
+    }))
+
+    result = cli_runner.invoke(main, ['d1', 'query', 'DB', 'SELECT 1', '--local'])
+    assert result.exit_code == 1
+    assert 'slingshot d1 pull DB' in result.output
+
+    path = D1Mirror.default_path('db1')
+    D1Mirror(path)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.execute("INSERT INTO users VALUES (1, 'Ada')")
+    conn.commit()
+    conn.close()
+
+    result = cli_runner.invoke(main, ['d1', 'query', 'DB', 'SELECT name FROM users', '--local',
+                                      '--json'])
+    assert result.exit_code == 0, result.output
+    assert result.output.strip() == '{"name": "Ada"}'
+
+
+def test_d1_migrate_plan(cli_runner, temp_dir, mock_env_credentials, monkeypatch):
+    """Test listing pending migrations without applying them."""
+    import json
+    import responses
+
+    monkeypatch.chdir(temp_dir)
+    Path('.slingshot.json').write_text(json.dumps({
+        "worker_name": "w",
+        "d1_databases": [{"binding": "DB", "database_id": "db1", "migrations_dir": "sql"}]
+    }))
+    Path('sql').mkdir()
+    Path('sql', '0001_init.sql').write_text('CREATE TABLE a (x);')
+    Path('sql', '0002_more.sql').write_text('CREATE TABLE b (x);')
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.POST,
+            "https://api.cloudflare.com/client/v4/accounts/test_account_id/d1/database/db1/query",
+            json={"success": True, "result": [{"results": [
+                {"name": "0001_init.sql", "checksum": None}
+            ], "meta": {}}]}
+        )
+        result = cli_runner.invoke(main, ['d1', 'migrate', 'DB', '--plan'])
+        sent = json.loads(rsps.calls[0].request.body)
+
+    assert result.exit_code == 0, result.output
+    assert '0002_more.sql' in result.output
+    assert '0001_init.sql' not in result.output
+    assert '1 migrations would be applied in 1 requests' in result.output
+    assert [s["sql"] for s in sent["batch"]] == [
+        'SELECT name, checksum FROM "d1_migrations" ORDER BY id'
+    ]
+
+
+def test_d1_profile_refuses_writes(cli_runner, temp_dir, mock_env_credentials, monkeypatch):
+    """Test that statements modifying data are not repeated without --allow-writes."""
+    monkeypatch.chdir(temp_dir)
+    Path('hot.sql').write_text("SELECT * FROM users;\nDELETE FROM sessions WHERE expired = 1;\n")
+
+    result = cli_runner.invoke(main, ['d1', 'profile', 'db1', 'hot.sql'])
+
+    assert result.exit_code == 1
+    assert '1 statements modify data and would run 5 times' in result.output
+    assert 'DELETE FROM sessions' in result.output
+
+
+def test_r2_put_small_file(cli_runner, temp_dir, mock_env_credentials, monkeypatch):
+    """Test uploading to a bucket named by its binding, keyed by the file name."""
+    import json
+    import responses
+
+    monkeypatch.chdir(temp_dir)
+    monkeypatch.setenv('R2_ACCESS_KEY_ID', 'key-id')
+    monkeypatch.setenv('R2_SECRET_ACCESS_KEY', 'secret')
+    Path('.slingshot.json').write_text(json.dumps({
+        "worker_name": "w", "r2_buckets": [{"binding": "ASSETS", "bucket_name": "assets"}]
+    }))
+    Path('logo.svg').write_text('<svg/>')
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.PUT,
+            "https://test_account_id.r2.cloudflarestorage.com/assets/img/logo.svg",
+            headers={"ETag": '"abc"'}
+        )
+        result = cli_runner.invoke(main, ['r2', 'put', 'logo.svg', 'ASSETS/img/'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Uploaded logo.svg to assets/img/logo.svg' in result.output
+
+
+def test_r2_put_requires_credentials(cli_runner, temp_dir, mock_env_credentials, monkeypatch):
+    """Test the error when no R2 API token is configured."""
+    monkeypatch.chdir(temp_dir)
+    monkeypatch.delenv('R2_ACCESS_KEY_ID', raising=False)
+    Path('logo.svg').write_text('<svg/>')
+
+    result = cli_runner.invoke(main, ['r2', 'put', 'logo.svg', 'assets'])
+
+    assert result.exit_code == 1
+    assert 'R2 credentials not configured' in result.output
+
+
+def test_r2_sync_dry_run(cli_runner, temp_dir, mock_env_credentials, monkeypatch):
+    """Test that a dry run lists the bucket but uploads nothing."""
+    import responses
+
+    monkeypatch.chdir(temp_dir)
+    monkeypatch.setenv('R2_ACCESS_KEY_ID', 'key-id')
+    monkeypatch.setenv('R2_SECRET_ACCESS_KEY', 'secret')
+    Path('site').mkdir()
+    Path('site/index.html').write_text('<h1>hi</h1>')
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.GET,
+            "https://test_account_id.r2.cloudflarestorage.com/assets?list-type=2&prefix=www%2F",
+            body="<ListBucketResult><IsTruncated>false</IsTruncated></ListBucketResult>"
+        )
+        result = cli_runner.invoke(main, ['r2', 'sync', 'site', 'assets/www', '--dry-run'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Would upload 1 files' in result.output
+    assert 'compared with bucket ETags' in result.output
+
+
+def test_r2_get_into_directory(cli_runner, temp_dir, mock_env_credentials, monkeypatch):
+    """Test downloading an object into a directory, named after its key."""
+    import hashlib
+    import responses
+
+    monkeypatch.chdir(temp_dir)
+    monkeypatch.setenv('R2_ACCESS_KEY_ID', 'key-id')
+    monkeypatch.setenv('R2_SECRET_ACCESS_KEY', 'secret')
+    Path('backups').mkdir()
+    url = "https://test_account_id.r2.cloudflarestorage.com/assets/db/dump.sql"
+    etag = f'"{hashlib.md5(b"SELECT 1;").hexdigest()}"'
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.HEAD, url, headers={"ETag": etag, "Content-Length": "9"})
+        rsps.add(responses.GET, url, body=b"SELECT 1;", status=206)
+        result = cli_runner.invoke(main, ['r2', 'get', 'assets/db/dump.sql', 'backups'])
+
+    assert result.exit_code == 0, result.output
+    assert Path('backups/dump.sql').read_bytes() == b"SELECT 1;"
+    assert 'Downloaded assets/db/dump.sql' in result.output
+
+
+def test_r2_presign_from_file(cli_runner, temp_dir, mock_env_credentials, monkeypatch):
+    """Test presigning keys from a file under a prefix, offline."""
+    import json
+    import responses
+
+    monkeypatch.chdir(temp_dir)
+    monkeypatch.setenv('R2_ACCESS_KEY_ID', 'key-id')
+    monkeypatch.setenv('R2_SECRET_ACCESS_KEY', 'secret')
+    Path('keys.txt').write_text('a.png\n\nb.png\n')
+
+    with responses.RequestsMock():
+        result = cli_runner.invoke(main, [
+            'r2', 'presign', 'assets/img', '--from-file', 'keys.txt', '--json', '-e', '60'
+        ])
+
+    assert result.exit_code == 0, result.output
+    rows = [json.loads(line) for line in result.output.splitlines()]
+    assert [row['key'] for row in rows] == ['img/a.png', 'img/b.png']
+    assert rows[0]['url'].startswith(
+        'https://test_account_id.r2.cloudflarestorage.com/assets/img/a.png?X-Amz-Algorithm='
+    )
+    assert 'X-Amz-Expires=60&' in rows[1]['url']
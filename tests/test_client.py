@@ -1,7 +1,10 @@
 """Tests for Cloudflare API client."""
 
+import json
+
 import pytest
 import responses
+from responses import matchers
 from slingshot.client import CloudflareClient, CloudflareAPIError
 
 
@@ -118,3 +121,108 @@ def test_delete_worker(client):
 
     result = client.delete_worker("test-worker")
     assert result is not None
+
+
+@responses.activate
+def test_iter_kv_namespaces_follows_pages(client):
+    """Test that page-number pagination is followed to the last page."""
+    url = "https://api.cloudflare.com/client/v4/accounts/test_account_id/storage/kv/namespaces"
+    for page in (1, 2, 3):
+        query = {"per_page": "2"}
+        if page > 1:
+            query["page"] = str(page)
+        responses.add(
+            responses.GET,
+            url,
+            match=[matchers.query_param_matcher(query)],
+            json={
+                "success": True,
+                "result": [{"id": f"ns-{page}a"}, {"id": f"ns-{page}b"}],
+                "result_info": {"page": page, "per_page": 2, "total_pages": 3}
+            },
+            status=200
+        )
+
+    ids = [ns["id"] for ns in client.iter_kv_namespaces(per_page=2)]
+    assert ids == ["ns-1a", "ns-1b", "ns-2a", "ns-2b", "ns-3a", "ns-3b"]
+
+
+@responses.activate
+def test_iter_routes_follows_cursor(client):
+    """Test that cursor pagination is followed until the cursor runs out."""
+    url = "https://api.cloudflare.com/client/v4/zones/zone-1/workers/routes"
+    responses.add(
+        responses.GET,
+        url,
+        match=[matchers.query_param_matcher({})],
+        json={"success": True, "result": [{"id": "r1"}], "result_info": {"cursor": "abc"}},
+        status=200
+    )
+    responses.add(
+        responses.GET,
+        url,
+        match=[matchers.query_param_matcher({"cursor": "abc"})],
+        json={"success": True, "result": [{"id": "r2"}], "result_info": {"cursor": ""}},
+        status=200
+    )
+
+    assert [r["id"] for r in client.iter_routes("zone-1", prefetch=True)] == ["r1", "r2"]
+    assert len(client.get_worker_routes("zone-1")) == 2
+
+
+@responses.activate
+def test_iter_workers_is_lazy(client):
+    """Test that later pages are not fetched until they are needed."""
+    url = "https://api.cloudflare.com/client/v4/accounts/test_account_id/workers/scripts"
+    responses.add(
+        responses.GET,
+        url,
+        json={
+            "success": True,
+            "result": [{"id": "worker-1"}],
+            "result_info": {"page": 1, "total_pages": 5}
+        },
+        status=200
+    )
+
+    workers = client.iter_workers()
+    assert next(workers)["id"] == "worker-1"
+    workers.close()
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_kv_bulk_put():
+    """Test bulk KV writes from objects and pre-encoded payloads."""
+    url = ("https://api.cloudflare.com/client/v4/accounts/test_account_id"
+           "/storage/kv/namespaces/ns1/bulk")
+    responses.add(responses.PUT, url, json={"success": True, "result": {"successful_key_count": 1}})
+    responses.add(responses.PUT, url, json={"success": True, "result": {"successful_key_count": 1}})
+
+    client = CloudflareClient("test_account_id", "test_api_token")
+    assert client.kv_bulk_put("ns1", [{"key": "a", "value": "1"}])["successful_key_count"] == 1
+    client.kv_bulk_put("ns1", b'[{"key":"b","value":"2"}]')
+
+    assert responses.calls[0].request.body == b'[{"key": "a", "value": "1"}]'
+    assert responses.calls[1].request.body == b'[{"key":"b","value":"2"}]'
+    assert responses.calls[1].request.headers["Content-Type"] == "application/json"
+
+
+@responses.activate
+def test_d1_database_management():
+    """Test listing, creating and querying D1 databases."""
+    base = "https://api.cloudflare.com/client/v4/accounts/test_account_id/d1/database"
+    responses.add(responses.GET, base, json={
+        "success": True, "result": [{"uuid": "db1", "name": "main"}],
+        "result_info": {"page": 1, "total_pages": 1}
+    })
+    responses.add(responses.POST, base, json={"success": True, "result": {"uuid": "db2"}})
+    responses.add(responses.POST, base + "/db1/query", json={
+        "success": True, "result": [{"results": [{"n": 1}], "meta": {"duration": 0.1}}]
+    })
+
+    client = CloudflareClient("test_account_id", "test_api_token")
+    assert client.list_d1_databases() == [{"uuid": "db1", "name": "main"}]
+    assert client.create_d1_database("other")["uuid"] == "db2"
+    assert client.query_d1("db1", "SELECT ? AS n", [1])[0]["results"] == [{"n": 1}]
+    assert json.loads(responses.calls[2].request.body) == {"sql": "SELECT ? AS n", "params": [1]}
@@ -0,0 +1,361 @@
+"""Tests for D1 statement batching and streamed results."""
+
+import json
+import sqlite3
+
+import pytest
+import responses
+from slingshot.client import CloudflareAPIError, CloudflareClient
+from slingshot.d1 import (
+    D1_MAX_PARAMS, D1Mirror, D1Statement, ImportCheckpoint, as_statement, create_table_sql,
+    import_rows, insert_statements, is_read_only, pack_statements, percentile,
+    profile_statements, read_sqlite_rows, sql_literal,
+)
+from slingshot.retry import RetryPolicy
+
+QUERY_URL = ("https://api.cloudflare.com/client/v4/accounts/test_account_id"
+             "/d1/database/db1/query")
+
+
+def echo_batch(request):
+    """Answer a batch query with one row per statement echoing its params."""
+    batch = json.loads(request.body)["batch"]
+    results = [
+        {"results": [{"sql": stmt["sql"], "params": stmt.get("params", [])}],
+         "success": True,
+         "meta": {"duration": 0.5, "rows_read": 1, "rows_written": 0}}
+        for stmt in batch
+    ]
+    return 200, {}, json.dumps({"success": True, "result": results})
+
+
+def test_as_statement_accepts_common_shapes():
+    """Test coercing strings, pairs and dicts."""
+    assert as_statement("SELECT 1") == D1Statement("SELECT 1")
+    assert as_statement(("SELECT ?", [1])) == D1Statement("SELECT ?", [1])
+    assert as_statement({"sql": "SELECT ?", "params": [2]}).to_json() == {
+        "sql": "SELECT ?", "params": [2]
+    }
+
+
+def test_pack_statements_respects_limits():
+    """Test splitting by statement count and encoded size."""
+    statements = [("INSERT INTO t VALUES (?)", [i]) for i in range(10)]
+
+    assert [len(b) for b in pack_statements(statements, max_statements=4)] == [4, 4, 2]
+
+    by_size = list(pack_statements(statements, max_bytes=120))
+    assert all(len(batch) == 2 for batch in by_size)
+    assert [i for batch in by_size for i, _ in batch] == list(range(10))
+
+
+def test_pack_statements_rejects_too_many_params():
+    """Test that D1's parameter limit is checked before sending."""
+    with pytest.raises(ValueError, match="parameters"):
+        list(pack_statements([("SELECT 1", [0] * (D1_MAX_PARAMS + 1))]))
+
+
+@responses.activate
+def test_iter_d1_results_batches_and_keeps_order():
+    """Test that concurrent batches still yield results in input order."""
+    responses.add_callback(responses.POST, QUERY_URL, callback=echo_batch)
+    client = CloudflareClient("test_account_id", "test_api_token")
+    statements = (("SELECT ?", [i]) for i in range(25))
+
+    results = list(client.iter_d1_results("db1", statements, concurrency=3,
+                                          max_batch_statements=10))
+
+    assert len(responses.calls) == 3
+    assert [r.index for r in results] == list(range(25))
+    assert [r.rows[0]["params"] for r in results] == [[i] for i in range(25)]
+    assert results[0].duration == 0.5
+    assert results[0].rows_read == 1
+
+
+@responses.activate
+def test_iter_d1_rows_streams_query_rows():
+    """Test the single-query row generator."""
+    responses.add(responses.POST, QUERY_URL, json={
+        "success": True,
+        "result": [{"results": [{"id": 1}, {"id": 2}], "success": True, "meta": {}}],
+    })
+    client = CloudflareClient("test_account_id", "test_api_token")
+
+    rows = client.iter_d1_rows("db1", "SELECT id FROM t WHERE id > ?", [0])
+    assert next(rows) == {"id": 1}
+    assert list(rows) == [{"id": 2}]
+    assert json.loads(responses.calls[0].request.body) == {
+        "batch": [{"sql": "SELECT id FROM t WHERE id > ?", "params": [0]}]
+    }
+
+
+def test_sql_literal_escapes_values():
+    """Test rendering values as SQLite literals."""
+    assert sql_literal(None) == "NULL"
+    assert sql_literal(True) == "1"
+    assert sql_literal(42) == "42"
+    assert sql_literal(1.5) == "1.5"
+    assert sql_literal("it's") == "'it''s'"
+    assert sql_literal(b"\x00\xff") == "X'00ff'"
+    with pytest.raises(TypeError):
+        sql_literal(object())
+
+
+def test_insert_statements_fill_up_to_size_limit():
+    """Test that rows are packed into as few statements as fit."""
+    rows = [(i, f"name-{i}") for i in range(100)]
+    statements = list(insert_statements("users", ["id", "name"], rows, mode="replace",
+                                        max_bytes=400))
+
+    assert all(len(sql) <= 400 for sql, _ in statements)
+    assert sum(n for _, n in statements) == 100
+    assert len(statements) < 100
+    assert statements[0][0].startswith(
+        'INSERT OR REPLACE INTO "users" ("id", "name") VALUES (0,\'name-0\'),(1,'
+    )
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+    for sql, _ in statements:
+        conn.execute(sql)
+    assert conn.execute("SELECT COUNT(*), MAX(name) FROM users").fetchone() == (100, "name-99")
+
+
+def test_read_sqlite_rows_streams_table(temp_dir):
+    """Test reading columns, rows and schema from a local database."""
+    path = temp_dir / "seed.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, data BLOB)")
+    conn.executemany("INSERT INTO items VALUES (?, ?)", [(i, bytes([i])) for i in range(5)])
+    conn.commit()
+    conn.close()
+
+    columns, rows, ddl = read_sqlite_rows(path, "items", batch_size=2)
+    assert columns == ["id", "data"]
+    assert list(rows) == [(i, bytes([i])) for i in range(5)]
+    assert create_table_sql(ddl, "copy") == (
+        'CREATE TABLE IF NOT EXISTS "copy" (id INTEGER PRIMARY KEY, data BLOB)'
+    )
+
+
+@responses.activate
+def test_import_rows_resumes_from_checkpoint(temp_dir):
+    """Test that a rerun after a failure only sends chunks that did not land."""
+    applied = []
+    failures = [True]
+
+    def callback(request):
+        batch = json.loads(request.body)["batch"]
+        if "(6," in batch[0]["sql"] and failures.pop() if failures else False:
+            return 400, {}, json.dumps({"success": False, "errors": [{"message": "bad row"}]})
+        applied.append(batch[0]["sql"])
+        return 200, {}, json.dumps({"success": True, "result": [{"meta": {}} for _ in batch]})
+
+    responses.add_callback(responses.POST, QUERY_URL, callback=callback)
+    client = CloudflareClient("test_account_id", "test_api_token")
+    checkpoint = ImportCheckpoint(str(temp_dir / "d1import.db"))
+    # ~30 KB per row gives three rows per statement and one statement per chunk
+    rows = [(i, "x" * 30000) for i in range(12)]
+
+    with pytest.raises(CloudflareAPIError):
+        import_rows(client, "db1", "t", ["id", "data"], iter(rows), concurrency=1,
+                    max_batch_bytes=100000, checkpoint=checkpoint, key="k1")
+    completed = checkpoint.completed("k1")
+    assert {0, 1} <= set(completed) and 2 not in completed
+
+    summary = import_rows(client, "db1", "t", ["id", "data"], iter(rows), concurrency=1,
+                          max_batch_bytes=100000, checkpoint=checkpoint, key="k1")
+    assert summary["skipped_rows"] == sum(completed.values())
+    assert summary["rows"] == 12 - summary["skipped_rows"]
+    # Every chunk landed exactly once across both runs
+    first_ids = sorted(int(sql.split("VALUES (")[1].split(",")[0]) for sql in applied)
+    assert first_ids == [0, 3, 6, 9]
+
+
+@responses.activate
+def test_import_rows_retries_transient_failures():
+    """Test that 5xx responses are retried for an idempotent chunk."""
+    responses.add(responses.POST, QUERY_URL, status=503, body="unavailable")
+    responses.add(responses.POST, QUERY_URL, json={"success": True, "result": [{"meta": {}}]})
+    client = CloudflareClient("test_account_id", "test_api_token",
+                              retry_policy=RetryPolicy(max_retries=2, backoff_factor=0))
+
+    summary = import_rows(client, "db1", "t", ["id"], iter([(1,), (2,)]), mode="ignore")
+    assert summary["rows"] == 2
+    assert summary["retries"] == 1
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_import_rows_does_not_replay_plain_inserts():
+    """Test that an insert chunk with an unknown outcome is left to the checkpoint."""
+    responses.add(responses.POST, QUERY_URL, status=503, body="unavailable")
+    client = CloudflareClient("test_account_id", "test_api_token",
+                              retry_policy=RetryPolicy(max_retries=2, backoff_factor=0))
+
+    with pytest.raises(CloudflareAPIError):
+        import_rows(client, "db1", "t", ["id"], iter([(1,), (2,)]))
+    assert len(responses.calls) == 1
+
+
+def _fake_d1(remote):
+    """Answer D1 query requests from a local SQLite connection."""
+    def callback(request):
+        body = json.loads(request.body)
+        cursor = remote.execute(body["sql"], body.get("params", []))
+        columns = [c[0] for c in cursor.description or ()]
+        rows = [
+            {c: list(v) if isinstance(v, bytes) else v for c, v in zip(columns, row)}
+            for row in cursor.fetchall()
+        ]
+        remote.commit()
+        return 200, {}, json.dumps({
+            "success": True, "result": [{"results": rows, "meta": {"rows_read": len(rows)}}]
+        })
+    return callback
+
+
+@responses.activate
+def test_mirror_pull_and_incremental_refresh(temp_dir):
+    """Test copying a database, then refreshing only added and modified rows."""
+    remote = sqlite3.connect(":memory:", check_same_thread=False)
+    remote.executescript("""
+        CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, avatar BLOB, updated_at INTEGER);
+        CREATE INDEX users_name ON users (name);
+        CREATE TABLE tags (name TEXT PRIMARY KEY, n INTEGER) WITHOUT ROWID;
+        CREATE TABLE logs (line TEXT);
+        INSERT INTO tags VALUES ('a', 1), ('b', 2);
+    """)
+    remote.executemany("INSERT INTO users VALUES (?, ?, ?, ?)",
+                       [(i, f"user{i}", b"\x00\x01", 100 + i) for i in range(1, 6)])
+    remote.commit()
+    responses.add_callback(responses.POST, QUERY_URL, callback=_fake_d1(remote))
+    client = CloudflareClient("test_account_id", "test_api_token")
+    mirror = D1Mirror(temp_dir / "mirror.db")
+
+    summary = mirror.pull(client, "db1", page_size=2, concurrency=2)
+    assert summary["rows"] == 7
+    assert {name: r["mode"] for name, r in summary["tables"].items()} == {
+        "users": "updated_at", "tags": "full", "logs": "rowid"
+    }
+    result = mirror.query("SELECT name, avatar FROM users WHERE id = ?", [3])
+    assert result.rows == [{"name": "user3", "avatar": b"\x00\x01"}]
+    assert mirror.query(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+    ).rows == [{"name": "users_name"}]
+
+    remote.execute("UPDATE users SET name = 'renamed', updated_at = 200 WHERE id = 2")
+    remote.execute("INSERT INTO users VALUES (6, 'user6', NULL, 106)")
+    remote.execute("INSERT INTO logs VALUES ('started')")
+    remote.commit()
+
+    summary = mirror.pull(client, "db1", page_size=2)
+    # The modified row, the new row and the row at the old high-water mark
+    assert summary["tables"]["users"]["rows"] == 3
+    assert summary["tables"]["users"]["reset"] is False
+    assert summary["tables"]["logs"]["rows"] == 1
+    assert mirror.query("SELECT id, name FROM users WHERE id IN (2, 6) ORDER BY id").rows == [
+        {"id": 2, "name": "renamed"}, {"id": 6, "name": "user6"}
+    ]
+    assert mirror.query("SELECT COUNT(*) AS n FROM users").rows == [{"n": 6}]
+
+    remote.execute("DROP TABLE logs")
+    remote.commit()
+    summary = mirror.pull(client, "db1")
+    assert summary["dropped"] == ["logs"]
+    assert summary["tables"]["users"]["rows"] == 1
+
+    with pytest.raises(sqlite3.OperationalError):
+        mirror.query("DELETE FROM users")
+
+
+def test_percentile_nearest_rank():
+    """Test p50/p95 on small samples."""
+    assert percentile([], 50) == 0.0
+    assert percentile([5], 95) == 5
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile(list(range(1, 21)), 95) == 19
+
+
+def test_is_read_only():
+    """Test classifying statements by their leading keyword."""
+    assert is_read_only("-- report\nSELECT 1")
+    assert is_read_only("WITH t AS (SELECT 1) SELECT * FROM t")
+    assert not is_read_only("WITH t AS (SELECT 1) DELETE FROM x WHERE id IN t")
+    assert not is_read_only("UPDATE users SET name = 'x'")
+
+
+@responses.activate
+def test_profile_statements_aggregates_runs_and_flags_scans():
+    """Test collecting metrics over runs and reading scans from the query plan."""
+    remote = sqlite3.connect(":memory:", check_same_thread=False)
+    remote.executescript(
+        "CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT);"
+        "INSERT INTO users (email) VALUES ('a@x'), ('b@x'), ('c@x');"
+    )
+    durations = iter(range(1, 100))
+
+    def callback(request):
+        results = []
+        for stmt in json.loads(request.body)["batch"]:
+            cursor = remote.execute(stmt["sql"], stmt.get("params", []))
+            columns = [c[0] for c in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            meta = {"duration": float(next(durations)), "rows_read": len(rows) * 10}
+            results.append({"results": rows, "meta": meta})
+        return 200, {}, json.dumps({"success": True, "result": results})
+
+    responses.add_callback(responses.POST, QUERY_URL, callback=callback)
+    client = CloudflareClient("test_account_id", "test_api_token")
+
+    profiles = profile_statements(client, "db1", [
+        "SELECT * FROM users WHERE email = 'b@x'",
+        "SELECT * FROM users WHERE id = 2",
+    ], runs=4)
+
+    # One request per run, then one for the plans
+    assert len(responses.calls) == 5
+    scan, lookup = profiles
+    assert scan.full_scans == ["users"]
+    assert lookup.full_scans == []
+    assert scan.rows_returned == 1
+    assert scan.durations == [1.0, 3.0, 5.0, 7.0]
+    assert scan.stats()["duration_p50"] == 3.0
+    assert scan.stats()["duration_p95"] == 7.0
+    assert scan.stats()["rows_read_p95"] == 10
+
+
+@responses.activate
+def test_profile_statements_plans_tables_the_file_creates():
+    """Test that plans are fetched after the runs, one by one if the batch fails."""
+    # No statement cache, which would keep planning a dropped table
+    remote = sqlite3.connect(":memory:", check_same_thread=False, cached_statements=0)
+
+    def callback(request):
+        results = []
+        try:
+            for stmt in json.loads(request.body)["batch"]:
+                cursor = remote.execute(stmt["sql"], stmt.get("params", []))
+                columns = [c[0] for c in cursor.description or []]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                results.append({"results": rows, "meta": {"duration": 1.0}})
+        except sqlite3.Error as e:
+            return 400, {}, json.dumps({"success": False, "errors": [{"message": str(e)}]})
+        return 200, {}, json.dumps({"success": True, "result": results})
+
+    responses.add_callback(responses.POST, QUERY_URL, callback=callback)
+    client = CloudflareClient("test_account_id", "test_api_token")
+
+    statements = [
+        "CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY, kind TEXT)",
+        "SELECT * FROM events WHERE kind = 'click'",
+    ]
+
+    created = profile_statements(client, "db1", statements, runs=2)[1]
+    assert created.full_scans == ["events"]
+    assert len(created.durations) == 2
+
+    # The file drops its table again, so the SELECT can no longer be planned
+    dropped = profile_statements(client, "db1", statements + ["DROP TABLE events"], runs=2)[1]
+    assert dropped.plan == []
+    assert len(dropped.durations) == 2
@@ -27,6 +27,21 @@ def test_deployer_initialization(temp_dir, mock_env_credentials, sample_worker_s
         os.chdir(original_cwd)
 
 
+def test_deployer_opens_local_stores_lazily(temp_dir, mock_env_credentials, tmp_path,
+                                            monkeypatch):
+    """Test that creating a deployer does not create any SQLite stores."""
+    config = Config.create_default("test-worker", str(temp_dir / ".slingshot.json"))
+    (temp_dir / "worker.js").write_text("export default {};")
+    monkeypatch.chdir(temp_dir)
+    cache_dir = tmp_path / "slingshot-cache"
+
+    deployer = WorkerDeployer(config)
+    assert not cache_dir.exists() or not list(cache_dir.glob("*.db"))
+
+    deployer.state
+    assert [p.name for p in cache_dir.glob("*.db")] == ["deploys.db"]
+
+
 def test_deployer_invalid_config(temp_dir):
     """Test deployer with invalid configuration."""
     config = Config.create_default("test-worker", str(temp_dir / ".slingshot.json"))
@@ -118,3 +133,212 @@ def test_deploy_dry_run(temp_dir, mock_env_credentials, sample_worker_script):
         assert result["script_size"] == len(sample_worker_script)
     finally:
         os.chdir(original_cwd)
+
+
+def test_verify_connection_cached(temp_dir, mock_env_credentials, sample_worker_script,
+                                  monkeypatch):
+    """Test that a successful verification is reused on the next run."""
+    config = Config.create_default("test-worker", str(temp_dir / ".slingshot.json"))
+    worker_path = temp_dir / "worker.js"
+    worker_path.write_text(sample_worker_script)
+
+    import os
+    original_cwd = os.getcwd()
+    os.chdir(temp_dir)
+
+    try:
+        calls = []
+        deployer = WorkerDeployer(config)
+        monkeypatch.setattr(deployer.client, "verify_token", lambda: calls.append(1) or True)
+        assert deployer.verify_connection() is True
+
+        second = WorkerDeployer(config)
+        monkeypatch.setattr(second.client, "verify_token", lambda: calls.append(1) or True)
+        assert second.verify_connection() is True
+        assert second.verify_connection(use_cache=False) is True
+        assert len(calls) == 2
+    finally:
+        os.chdir(original_cwd)
+
+
+def test_deploy_auth_failure(temp_dir, mock_env_credentials, sample_worker_script, monkeypatch):
+    """Test that a 401/403 from the upload surfaces as an authentication error."""
+    from slingshot.client import CloudflareAPIError
+    from slingshot.deployer import AuthenticationError
+
+    config = Config.create_default("test-worker", str(temp_dir / ".slingshot.json"))
+    worker_path = temp_dir / "worker.js"
+    worker_path.write_text(sample_worker_script)
+
+    import os
+    original_cwd = os.getcwd()
+    os.chdir(temp_dir)
+
+    try:
+        deployer = WorkerDeployer(config)
+        deployer.verification_cache.mark_verified("test_api_token")
+
+        def reject(**kwargs):
+            raise CloudflareAPIError("Authentication error", status_code=403)
+
+        monkeypatch.setattr(deployer.client, "upload_worker_modules", reject)
+        with pytest.raises(AuthenticationError):
+            deployer.deploy()
+        assert deployer.verification_cache.is_verified("test_api_token") is False
+    finally:
+        os.chdir(original_cwd)
+
+
+def test_deploy_many(temp_dir, mock_env_credentials, sample_worker_script, monkeypatch):
+    """Test concurrent deploys share one client and report per-worker timing."""
+    from slingshot.client import CloudflareClient
+
+    configs = []
+    for name in ("alpha", "beta", "gamma"):
+        project = temp_dir / name
+        project.mkdir()
+        (project / "worker.js").write_text(sample_worker_script)
+        configs.append(Config.create_default(name, str(project / ".slingshot.json")))
+    configs.append(Config.create_default("broken", str(temp_dir / ".slingshot.json")))
+
+    uploads = []
+
+    def fake_upload(self, worker_name, modules, metadata):
+        uploads.append((id(self), worker_name, modules[0][1].read()))
+        return {"id": worker_name}
+
+    monkeypatch.setattr(CloudflareClient, "upload_worker_modules", fake_upload)
+
+    report = WorkerDeployer.deploy_many(configs, max_workers=2)
+
+    assert report["count"] == 4
+    assert report["succeeded"] == 3
+    assert report["failed"] == 1
+    assert sorted(name for _, name, _ in uploads) == ["alpha", "beta", "gamma"]
+    assert len({client for client, _, _ in uploads}) == 1
+    assert all(r["duration"] >= 0 for r in report["results"])
+
+
+def test_deploy_skips_unchanged(temp_dir, mock_env_credentials, sample_worker_script, monkeypatch):
+    """Test that an identical redeploy is skipped unless forced."""
+    config = Config.create_default("test-worker", str(temp_dir / ".slingshot.json"))
+    worker_path = temp_dir / "worker.js"
+    worker_path.write_text(sample_worker_script)
+
+    deployer = WorkerDeployer(config)
+    uploads = []
+
+    def fake_upload(worker_name, modules, metadata):
+        uploads.append(worker_name)
+        return {"id": worker_name, "etag": "etag-1"}
+
+    monkeypatch.setattr(deployer.client, "upload_worker_modules", fake_upload)
+    monkeypatch.setattr(
+        deployer.client, "iter_workers", lambda: iter([{"id": "test-worker", "etag": "etag-1"}])
+    )
+
+    assert deployer.deploy()["deployed"] is True
+    skipped = deployer.deploy()
+    assert skipped["status"] == "skipped"
+    assert skipped["reason"] == "unchanged"
+    assert deployer.deploy(force=True)["deployed"] is True
+
+    worker_path.write_text(sample_worker_script + "\n// changed")
+    assert deployer.deploy()["deployed"] is True
+    assert len(uploads) == 3
+
+
+def test_deploy_redeploys_when_remote_changed(temp_dir, mock_env_credentials,
+                                               sample_worker_script, monkeypatch):
+    """Test that a remote etag mismatch defeats the unchanged check."""
+    config = Config.create_default("test-worker", str(temp_dir / ".slingshot.json"))
+    (temp_dir / "worker.js").write_text(sample_worker_script)
+
+    deployer = WorkerDeployer(config)
+    monkeypatch.setattr(
+        deployer.client, "upload_worker_modules",
+        lambda worker_name, modules, metadata: {"etag": "ours"}
+    )
+    monkeypatch.setattr(
+        deployer.client, "iter_workers", lambda: iter([{"id": "test-worker", "etag": "theirs"}])
+    )
+
+    deployer.deploy()
+    assert deployer.deploy()["deployed"] is True
+
+
+def test_deploy_multi_module(temp_dir, mock_env_credentials, monkeypatch):
+    """Test that imported modules are uploaded as separate parts."""
+    config = Config.create_default("test-worker", str(temp_dir / ".slingshot.json"))
+    (temp_dir / "worker.js").write_text(
+        'import { greet } from "./greet.js";\nexport default { fetch: greet };\n'
+    )
+    (temp_dir / "greet.js").write_text("export const greet = () => new Response('hi');\n")
+
+    deployer = WorkerDeployer(config)
+    uploaded = {}
+
+    def fake_upload_modules(worker_name, modules, metadata):
+        uploaded["parts"] = [(name, content.read(), ctype) for name, content, ctype in modules]
+        uploaded["metadata"] = metadata
+        return {"id": worker_name}
+
+    monkeypatch.setattr(deployer.client, "upload_worker_modules", fake_upload_modules)
+
+    result = deployer.deploy()
+    assert result["modules"] == ["worker.js", "greet.js"]
+    assert uploaded["metadata"]["main_module"] == "worker.js"
+    assert [name for name, _, _ in uploaded["parts"]] == ["worker.js", "greet.js"]
+
+
+def test_deploy_many_lists_remote_etags_once(temp_dir, mock_env_credentials,
+                                             sample_worker_script, monkeypatch):
+    """Test that checking unchanged workers for remote changes costs one listing."""
+    from slingshot.client import CloudflareClient
+
+    configs = []
+    for name in ("alpha", "beta", "gamma"):
+        project = temp_dir / name
+        project.mkdir()
+        (project / "worker.js").write_text(sample_worker_script)
+        configs.append(Config.create_default(name, str(project / ".slingshot.json")))
+
+    listings = []
+    monkeypatch.setattr(
+        CloudflareClient, "upload_worker_modules",
+        lambda self, worker_name, modules, metadata: {"etag": f"{worker_name}-1"}
+    )
+
+    def fake_iter_workers(self):
+        listings.append(self)
+        return iter([{"id": name, "etag": f"{name}-1"} for name in ("alpha", "beta", "gamma")])
+
+    monkeypatch.setattr(CloudflareClient, "iter_workers", fake_iter_workers)
+
+    assert WorkerDeployer.deploy_many(configs)["skipped"] == 0
+    report = WorkerDeployer.deploy_many(configs, max_workers=3)
+
+    assert report["skipped"] == 3
+    assert len(listings) == 1
+
+
+def test_deploy_main_in_subdirectory(temp_dir, mock_env_credentials, monkeypatch):
+    """Test that a single-module worker's part name matches its main_module."""
+    config = Config.create_default("test-worker", str(temp_dir / ".slingshot.json"))
+    config.set("main", "src/index.js")
+    (temp_dir / "src").mkdir()
+    (temp_dir / "src" / "index.js").write_text("export default { fetch() {} };\n")
+
+    deployer = WorkerDeployer(config)
+    uploaded = {}
+
+    def fake_upload_modules(worker_name, modules, metadata):
+        uploaded["parts"] = [name for name, _, _ in modules]
+        uploaded["main_module"] = metadata["main_module"]
+        return {"id": worker_name}
+
+    monkeypatch.setattr(deployer.client, "upload_worker_modules", fake_upload_modules)
+
+    deployer.deploy()
+    assert uploaded["parts"] == [uploaded["main_module"]]
+    assert uploaded["main_module"] == "src/index.js"
@@ -0,0 +1,250 @@
+"""Tests for bulk KV transfers."""
+
+import gzip
+import json
+import threading
+import time
+
+import pytest
+import responses
+from slingshot.client import CloudflareClient
+from slingshot.kv import (
+    KVSyncIndex, bounded_map, bulk_delete, bulk_import, export_namespace, iter_key_file,
+    iter_records, pack_batches,
+)
+
+BULK_URL = ("https://api.cloudflare.com/client/v4/accounts/test_account_id"
+            "/storage/kv/namespaces/ns1/bulk")
+
+
+def test_iter_records_jsonl(temp_dir):
+    """Test streaming JSONL, including non-string values."""
+    path = temp_dir / "data.jsonl"
+    path.write_text(
+        '{"key": "a", "value": "1", "expiration_ttl": 60}\n'
+        '\n'
+        '{"key": "b", "value": {"n": 2}, "ignored": true}\n'
+    )
+    assert list(iter_records(path)) == [
+        {"key": "a", "value": "1", "expiration_ttl": 60},
+        {"key": "b", "value": '{"n":2}'},
+    ]
+
+
+def test_iter_records_gzip_csv(temp_dir):
+    """Test compressed CSV with typed optional columns."""
+    path = temp_dir / "data.csv.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write('key,value,expiration,metadata\n'
+                'a,"x,y",1700000000,"{""v"": 1}"\n'
+                'b,z,,\n')
+    assert list(iter_records(path)) == [
+        {"key": "a", "value": "x,y", "expiration": 1700000000, "metadata": {"v": 1}},
+        {"key": "b", "value": "z"},
+    ]
+
+
+def test_iter_records_rejects_missing_value(temp_dir):
+    """Test that malformed records report their location."""
+    path = temp_dir / "data.jsonl"
+    path.write_text('{"key": "a"}\n')
+    with pytest.raises(ValueError, match="data.jsonl:1"):
+        list(iter_records(path))
+
+
+def test_pack_batches_respects_limits():
+    """Test that batches split on both key count and byte size."""
+    records = [{"key": f"k{i}", "value": "v" * 10} for i in range(25)]
+
+    by_count = list(pack_batches(records, max_keys=10))
+    assert [b.count for b in by_count] == [10, 10, 5]
+
+    by_size = list(pack_batches(records, max_bytes=100))
+    assert all(len(b.payload) <= 100 for b in by_size)
+    assert sum(b.count for b in by_size) == 25
+    assert [r["key"] for b in by_size for r in json.loads(b.payload)] == [r["key"] for r in records]
+
+
+def test_pack_batches_rejects_oversized_record():
+    """Test that a record that can never fit is reported."""
+    with pytest.raises(ValueError, match="big"):
+        list(pack_batches([{"key": "big", "value": "x" * 200}], max_bytes=100))
+
+
+def test_bounded_map_limits_in_flight_items():
+    """Test that the producer is only read as fast as work completes."""
+    pulled = []
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def produce():
+        for i in range(20):
+            pulled.append(i)
+            yield i
+
+    def work(i):
+        with lock:
+            active.append(i)
+            peak.append(len(active))
+        time.sleep(0.005)
+        with lock:
+            active.remove(i)
+        return i * 2
+
+    results = bounded_map(work, produce(), max_workers=2, max_pending=3)
+    first = next(results)
+    assert len(pulled) <= 4
+    rest = list(results)
+    assert sorted(r for _, r in [first] + rest) == [i * 2 for i in range(20)]
+    assert max(peak) <= 2
+
+
+@responses.activate
+def test_bulk_import_uploads_batches_concurrently():
+    """Test a full import reports totals and rejected keys."""
+    def callback(request):
+        pairs = json.loads(request.body)
+        rejected = [p["key"] for p in pairs if p["key"] == "bad"]
+        return 200, {}, json.dumps({
+            "success": True,
+            "result": {"successful_key_count": len(pairs) - len(rejected),
+                       "unsuccessful_keys": rejected},
+        })
+
+    responses.add_callback(responses.PUT, BULK_URL, callback=callback)
+    client = CloudflareClient("test_account_id", "test_api_token")
+    records = [{"key": f"k{i}", "value": str(i)} for i in range(30)]
+    records.append({"key": "bad", "value": "x"})
+    updates = []
+
+    summary = bulk_import(client, "ns1", iter(records), concurrency=3, max_keys=7,
+                          progress=lambda p: updates.append(p.keys))
+
+    assert len(responses.calls) == 5
+    assert responses.calls[0].request.headers["Content-Type"] == "application/json"
+    assert summary["keys"] == 30
+    assert summary["failed"] == 1
+    assert summary["failed_keys"] == ["bad"]
+    assert summary["batches"] == 5
+    assert updates[-1] == 30
+
+
+@responses.activate
+def test_export_namespace_round_trips(temp_dir):
+    """Test exporting pages of keys to gzip JSONL readable by iter_records."""
+    keys_url = ("https://api.cloudflare.com/client/v4/accounts/test_account_id"
+                "/storage/kv/namespaces/ns1/keys")
+    values_url = ("https://api.cloudflare.com/client/v4/accounts/test_account_id"
+                  "/storage/kv/namespaces/ns1/values/")
+    responses.add(
+        responses.GET, keys_url,
+        match=[responses.matchers.query_param_matcher({"limit": "1000"})],
+        json={"success": True, "result": [{"name": "a/1", "expiration": 1700000000},
+                                          {"name": "bin"}],
+              "result_info": {"cursor": "c2"}},
+    )
+    responses.add(
+        responses.GET, keys_url,
+        match=[responses.matchers.query_param_matcher({"limit": "1000", "cursor": "c2"})],
+        json={"success": True, "result": [{"name": "gone", "metadata": {"m": 1}}],
+              "result_info": {"cursor": ""}},
+    )
+    responses.add(responses.GET, values_url + "a%2F1", body=b"hello")
+    responses.add(responses.GET, values_url + "bin", body=b"\xff\x00")
+    responses.add(responses.GET, values_url + "gone", status=404,
+                  json={"success": False, "errors": [{"message": "key not found"}]})
+
+    client = CloudflareClient("test_account_id", "test_api_token")
+    path = temp_dir / "snapshot.jsonl.gz"
+    summary = export_namespace(client, "ns1", path, concurrency=2)
+
+    assert summary["keys"] == 2
+    assert summary["missing"] == 1
+    assert not (temp_dir / "snapshot.jsonl.gz.partial").exists()
+    records = sorted(iter_records(path), key=lambda r: r["key"])
+    assert records == [
+        {"key": "a/1", "value": "hello", "expiration": 1700000000},
+        {"key": "bin", "value": "/wA=", "base64": True},
+    ]
+
+
+@responses.activate
+def test_bulk_delete_batches_keys(temp_dir):
+    """Test deleting keys from a file in bulk batches, and dry runs."""
+    url = ("https://api.cloudflare.com/client/v4/accounts/test_account_id"
+           "/storage/kv/namespaces/ns1/bulk/delete")
+    responses.add(responses.POST, url, json={"success": True, "result": {}})
+    path = temp_dir / "keys.txt"
+    path.write_text("".join(f"key-{i}\n" for i in range(25)) + "\n")
+    client = CloudflareClient("test_account_id", "test_api_token")
+
+    counted = bulk_delete(client, "ns1", iter_key_file(path), batch_size=10, dry_run=True)
+    assert counted["keys"] == 25
+    assert len(responses.calls) == 0
+
+    summary = bulk_delete(client, "ns1", iter_key_file(path), concurrency=2, batch_size=10)
+    assert summary["keys"] == 25
+    assert summary["batches"] == 3
+    deleted = sorted(k for call in responses.calls for k in json.loads(call.request.body))
+    assert deleted == sorted(f"key-{i}" for i in range(25))
+
+
+@responses.activate
+def test_sync_sends_only_the_delta(temp_dir):
+    """Test that a second sync writes changed keys and deletes removed ones."""
+    base = "https://api.cloudflare.com/client/v4/accounts/test_account_id/storage/kv/namespaces/ns1"
+    responses.add(responses.PUT, base + "/bulk",
+                  json={"success": True, "result": {"unsuccessful_keys": []}})
+    responses.add(responses.POST, base + "/bulk/delete", json={"success": True, "result": {}})
+    client = CloudflareClient("test_account_id", "test_api_token")
+    index = KVSyncIndex(str(temp_dir / "kvsync.db"))
+
+    day1 = [{"key": "a", "value": "1"}, {"key": "b", "value": "2"}, {"key": "c", "value": "3"}]
+    first = index.sync(client, "ns1", iter(day1))
+    assert (first["puts"], first["deletes"], first["unchanged"]) == (3, 0, 0)
+    assert index.count("test_account_id", "ns1") == 3
+
+    day2 = [{"key": "a", "value": "1"}, {"key": "b", "value": "two"},
+            {"key": "d", "value": "4", "expiration_ttl": 60}]
+    planned = index.sync(client, "ns1", iter(day2), dry_run=True)
+    assert (planned["puts"], planned["deletes"], planned["unchanged"]) == (2, 1, 1)
+    calls_before = len(responses.calls)
+
+    second = index.sync(client, "ns1", iter(day2))
+    assert (second["puts"], second["deletes"], second["unchanged"]) == (2, 1, 1)
+    sent = responses.calls[calls_before:]
+    puts = [r["key"] for c in sent if c.request.method == "PUT" for r in json.loads(c.request.body)]
+    deletes = [k for c in sent if c.request.method == "POST" for k in json.loads(c.request.body)]
+    assert sorted(puts) == ["b", "d"]
+    assert deletes == ["c"]
+
+    # Keys with a TTL are rewritten every time so the TTL is refreshed
+    third = index.sync(client, "ns1", iter(day2))
+    assert (third["puts"], third["deletes"], third["unchanged"]) == (1, 0, 2)
+
+
+@responses.activate
+def test_sync_retries_rejected_keys(temp_dir):
+    """Test that keys the API rejected are not recorded as synced."""
+    url = ("https://api.cloudflare.com/client/v4/accounts/test_account_id"
+           "/storage/kv/namespaces/ns1/bulk")
+    responses.add(responses.PUT, url,
+                  json={"success": True, "result": {"unsuccessful_keys": ["b"]}})
+    client = CloudflareClient("test_account_id", "test_api_token")
+    index = KVSyncIndex(str(temp_dir / "kvsync.db"))
+    records = [{"key": "a", "value": "1"}, {"key": "b", "value": "2"}]
+
+    assert index.sync(client, "ns1", iter(records))["failed"] == 1
+    assert index.sync(client, "ns1", iter(records), dry_run=True)["puts"] == 1
+
+
+def test_sync_rejects_duplicate_keys(temp_dir):
+    """Test that ambiguous datasets fail before anything is recorded."""
+    client = CloudflareClient("test_account_id", "test_api_token")
+    index = KVSyncIndex(str(temp_dir / "kvsync.db"))
+    records = [{"key": "a", "value": "1"}, {"key": "a", "value": "2"}]
+
+    with pytest.raises(ValueError, match="Duplicate key"):
+        index.sync(client, "ns1", iter(records), dry_run=True)
+    assert index.count("test_account_id", "ns1") == 0
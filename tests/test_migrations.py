@@ -0,0 +1,175 @@
+"""Tests for D1 migrations."""
+
+import json
+import sqlite3
+
+import pytest
+import responses
+from slingshot.client import CloudflareClient
+from slingshot.migrations import (
+    MigrationError, apply_migrations, applied_migrations, load_migrations, pack_migrations,
+    plan_migrations, split_sql
+)
+
+QUERY_URL = ("https://api.cloudflare.com/client/v4/accounts/test_account_id"
+             "/d1/database/db1/query")
+
+
+class FakeD1:
+    """Answers D1 query requests from a local SQLite database.
+
+    A batch runs in one transaction and is rolled back if any statement
+    fails, as D1 does.
+    """
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:", isolation_level=None)
+        self.requests = []
+
+    def __call__(self, request):
+        body = json.loads(request.body)
+        statements = body.get("batch") or [body]
+        self.requests.append(statements)
+        results = []
+        self.db.execute("BEGIN")
+        try:
+            for statement in statements:
+                cursor = self.db.execute(statement["sql"], statement.get("params", []))
+                columns = [c[0] for c in cursor.description or ()]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                results.append({"results": rows, "meta": {}})
+        except sqlite3.Error as e:
+            self.db.execute("ROLLBACK")
+            return 400, {}, json.dumps({"success": False, "errors": [{"message": str(e)}]})
+        self.db.execute("COMMIT")
+        return 200, {}, json.dumps({"success": True, "result": results})
+
+
+@pytest.fixture
+def fake_d1():
+    """Serve the D1 query endpoint from SQLite."""
+    fake = FakeD1()
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(responses.POST, QUERY_URL, callback=fake)
+        yield fake
+
+
+@pytest.fixture
+def client():
+    return CloudflareClient("test_account_id", "test_api_token")
+
+
+def write_migrations(directory, files):
+    directory.mkdir(exist_ok=True)
+    for name, sql in files.items():
+        (directory / name).write_text(sql)
+    return directory
+
+
+def test_split_sql_respects_strings_comments_and_triggers():
+    """Test that only top-level semicolons end a statement."""
+    sql = """
+        -- create things; carefully
+        BEGIN TRANSACTION;
+        CREATE TABLE notes (body TEXT DEFAULT 'a;b');
+        /* block; comment */
+        CREATE TRIGGER stamp AFTER INSERT ON notes BEGIN
+            UPDATE notes SET body = CASE WHEN body = '' THEN 'x' ELSE body END;
+            SELECT 1;
+        END;
+        COMMIT;
+        INSERT INTO notes VALUES ('tail')
+    """
+    statements = split_sql(sql)
+
+    assert len(statements) == 3
+    assert statements[0].endswith("CREATE TABLE notes (body TEXT DEFAULT 'a;b')")
+    assert statements[1].startswith("/* block; comment */\n        CREATE TRIGGER stamp")
+    assert statements[1].endswith("END")
+    assert statements[2] == "INSERT INTO notes VALUES ('tail')"
+
+
+def test_pack_migrations_keeps_migrations_whole(temp_dir):
+    """Test that batches hold whole migrations within the statement limit."""
+    directory = write_migrations(temp_dir / "migrations", {
+        f"000{i}_step.sql": f"CREATE TABLE t{i} (id INTEGER);\nCREATE INDEX i{i} ON t{i} (id);"
+        for i in range(1, 6)
+    })
+    migrations = load_migrations(directory)
+
+    batches = pack_migrations(migrations, max_statements=7)
+    assert [[m.name for m in batch] for batch in batches] == [
+        ["0001_step.sql", "0002_step.sql"],
+        ["0003_step.sql", "0004_step.sql"],
+        ["0005_step.sql"],
+    ]
+
+
+def test_migrate_applies_pending_in_one_request(temp_dir, fake_d1, client):
+    """Test applying, recording and then finding nothing pending."""
+    directory = write_migrations(temp_dir / "migrations", {
+        "0001_users.sql": "CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT);",
+        "0002_seed.sql": "INSERT INTO users (name) VALUES ('Ada');\n"
+                         "INSERT INTO users (name) VALUES ('Grace');",
+    })
+    migrations = load_migrations(directory)
+
+    pending = plan_migrations(migrations, applied_migrations(client, "db1"))
+    assert [m.name for m in pending] == ["0001_users.sql", "0002_seed.sql"]
+
+    summary = apply_migrations(client, "db1", pending)
+    assert summary["applied"] == ["0001_users.sql", "0002_seed.sql"]
+    assert summary["requests"] == 1
+    assert len(fake_d1.requests[-1]) == 5
+    assert fake_d1.db.execute("SELECT COUNT(*) FROM users").fetchone() == (2,)
+
+    applied = applied_migrations(client, "db1")
+    assert applied == {m.name: m.checksum for m in migrations}
+    assert plan_migrations(migrations, applied) == []
+
+
+def test_migrate_refuses_edited_migrations(temp_dir, fake_d1, client):
+    """Test that a changed checksum stops the plan."""
+    directory = write_migrations(temp_dir / "migrations", {"0001_a.sql": "CREATE TABLE a (x);"})
+    apply_migrations(client, "db1", plan_migrations(
+        load_migrations(directory), applied_migrations(client, "db1")
+    ))
+
+    (directory / "0001_a.sql").write_text("CREATE TABLE a (x, y);")
+    with pytest.raises(MigrationError, match="0001_a.sql"):
+        plan_migrations(load_migrations(directory), applied_migrations(client, "db1"))
+
+
+def test_failed_batch_is_not_recorded(temp_dir, fake_d1, client):
+    """Test that a failing migration leaves neither its changes nor its record."""
+    directory = write_migrations(temp_dir / "migrations", {
+        "0001_ok.sql": "CREATE TABLE ok (x);",
+        "0002_bad.sql": "INSERT INTO missing VALUES (1);",
+    })
+    applied_migrations(client, "db1")
+
+    with pytest.raises(MigrationError, match="0001_ok.sql, 0002_bad.sql"):
+        apply_migrations(client, "db1", load_migrations(directory))
+    assert applied_migrations(client, "db1") == {}
+    assert fake_d1.db.execute("SELECT name FROM sqlite_master WHERE name = 'ok'").fetchone() is None
+
+
+def test_applied_migrations_reads_wrangler_table(fake_d1, client):
+    """Test adopting a migrations table without a checksum column."""
+    fake_d1.db.executescript(
+        "CREATE TABLE d1_migrations (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE, "
+        "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL);"
+        "INSERT INTO d1_migrations (name) VALUES ('0001_init.sql');"
+    )
+
+    assert applied_migrations(client, "db1", create=False) == {"0001_init.sql": None}
+    assert applied_migrations(client, "db1") == {"0001_init.sql": None}
+    assert fake_d1.db.execute(
+        "SELECT COUNT(*) FROM pragma_table_info('d1_migrations') WHERE name = 'checksum'"
+    ).fetchone() == (1,)
+
+
+def test_plan_without_table_creates_nothing(fake_d1, client):
+    """Test that planning against a fresh database does not write."""
+    assert applied_migrations(client, "db1", create=False) == {}
+    assert fake_d1.db.execute("SELECT COUNT(*) FROM sqlite_master").fetchone() == (0,)
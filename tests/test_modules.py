@@ -0,0 +1,98 @@
+"""Tests for worker module graph resolution."""
+
+import pytest
+from slingshot import modules
+from slingshot.modules import (
+    ModuleGraphCache,
+    ModuleResolutionError,
+    find_imports,
+    resolve_module_graph,
+    strip_comments,
+)
+
+
+def test_strip_comments_keeps_strings_and_regexes():
+    """Test that comment markers inside literals survive."""
+    source = (
+        "// leading comment\n"
+        "const url = 'https://example.com'; /* block */\n"
+        "const re = /\\/\\/not-a-comment/g;\n"
+        "const t = `a ${'//'} b`;\n"
+    )
+    stripped = strip_comments(source)
+    assert "leading comment" not in stripped
+    assert "block" not in stripped
+    assert "'https://example.com'" in stripped
+    assert "/\\/\\/not-a-comment/g" in stripped
+    assert "`a ${'//'} b`" in stripped
+
+
+def test_find_imports():
+    """Test static, side-effect, re-export and dynamic imports."""
+    source = '''
+import { a } from "./a.js";
+import "./polyfill.js";
+export * from './b.js';
+// import { old } from "./old.js";
+const lazy = await import("./lazy.js");
+import { connect } from "cloudflare:sockets";
+'''
+    assert find_imports(source) == [
+        "./a.js", "./polyfill.js", "./b.js", "./lazy.js", "cloudflare:sockets"
+    ]
+
+
+def test_resolve_module_graph(temp_dir):
+    """Test collecting JS, text and wasm modules with correct types."""
+    (temp_dir / "src").mkdir()
+    (temp_dir / "src" / "index.js").write_text(
+        'import { util } from "./lib/util.js";\n'
+        'import page from "./page.html";\n'
+        'import { connect } from "cloudflare:sockets";\n'
+    )
+    (temp_dir / "src" / "lib").mkdir()
+    (temp_dir / "src" / "lib" / "util.js").write_text(
+        'import mod from "../../wasm/add.wasm";\nexport const util = 1;\n'
+    )
+    (temp_dir / "src" / "page.html").write_text("<h1>hi</h1>")
+    (temp_dir / "wasm").mkdir()
+    (temp_dir / "wasm" / "add.wasm").write_bytes(b"\x00asm")
+
+    graph = resolve_module_graph(temp_dir / "src" / "index.js", temp_dir)
+
+    assert [(m.name, m.content_type) for m in graph] == [
+        ("src/index.js", "application/javascript+module"),
+        ("src/lib/util.js", "application/javascript+module"),
+        ("src/page.html", "text/plain"),
+        ("wasm/add.wasm", "application/wasm"),
+    ]
+
+
+def test_resolve_module_graph_missing_import(temp_dir):
+    """Test that extensionless or missing imports are reported."""
+    (temp_dir / "index.js").write_text('import x from "./util";\n')
+    (temp_dir / "util.js").write_text("export default 1;\n")
+
+    with pytest.raises(ModuleResolutionError) as exc_info:
+        resolve_module_graph(temp_dir / "index.js", temp_dir)
+    assert "including its extension" in str(exc_info.value)
+
+
+def test_module_graph_cache_skips_rescan(temp_dir, monkeypatch):
+    """Test that unchanged files are not read again."""
+    (temp_dir / "index.js").write_text('import "./a.js";\n')
+    (temp_dir / "a.js").write_text("export {};\n")
+    cache = ModuleGraphCache(str(temp_dir / "modules.db"))
+
+    resolve_module_graph(temp_dir / "index.js", temp_dir, cache=cache)
+
+    scans = []
+    original = modules.find_imports
+    monkeypatch.setattr(modules, "find_imports", lambda src: scans.append(src) or original(src))
+
+    resolve_module_graph(temp_dir / "index.js", temp_dir, cache=cache)
+    assert scans == []
+
+    (temp_dir / "a.js").write_text("export const changed = true;\n")
+    resolve_module_graph(temp_dir / "index.js", temp_dir, cache=cache)
+    assert len(scans) == 1
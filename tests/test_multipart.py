@@ -0,0 +1,88 @@
+"""Tests for streaming multipart bodies."""
+
+import io
+import os
+
+import pytest
+import responses
+from slingshot.client import CloudflareClient
+from slingshot.multipart import MultipartBody
+
+
+def test_multipart_length_matches_body():
+    """Test that the precomputed length equals the encoded size."""
+    body = MultipartBody(boundary="b0undary")
+    body.add_part("metadata", '{"main_module": "worker.js"}', "application/json")
+    body.add_part("script", b"export default {};", "application/javascript+module",
+                  filename="worker.js")
+
+    encoded = body.to_bytes()
+    assert len(body) == len(encoded)
+    assert encoded.startswith(b"--b0undary\r\n")
+    assert encoded.endswith(b"--b0undary--\r\n")
+    assert b'filename="worker.js"' in encoded
+
+
+def test_multipart_is_reiterable():
+    """Test that iterating twice yields the same bytes, as retries require."""
+    body = MultipartBody()
+    body.add_part("script", memoryview(b"x" * 200_000))
+    assert body.to_bytes() == body.to_bytes()
+
+
+def test_multipart_maps_real_files(temp_dir):
+    """Test that file parts are memory-mapped rather than read."""
+    path = temp_dir / "bundle.wasm"
+    path.write_bytes(b"\x00asm" + b"\x01" * 1000)
+
+    with open(path, "rb") as f:
+        body = MultipartBody()
+        body.add_part("module", f, "application/wasm", filename="bundle.wasm")
+        assert len(body._mmaps) == 1
+        assert path.read_bytes() in body.to_bytes()
+        body.close()
+
+
+def test_multipart_reads_pipes():
+    """Test that a pipe, which reports no size, is read instead of mapped."""
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"export default {};")
+    os.close(write_fd)
+
+    with open(read_fd, "rb") as f:
+        body = MultipartBody()
+        body.add_part("script", f)
+        assert body._mmaps == []
+        assert b"\r\n\r\nexport default {};\r\n" in body.to_bytes()
+
+
+def test_multipart_accepts_bytesio():
+    """Test in-memory binary streams."""
+    body = MultipartBody()
+    body.add_part("script", io.BytesIO(b"abc"))
+    assert b"\r\n\r\nabc\r\n" in body.to_bytes()
+    body.close()
+
+
+def test_multipart_rejects_unknown_content():
+    """Test that unsupported content types fail loudly."""
+    with pytest.raises(TypeError):
+        MultipartBody().add_part("script", 42)
+
+
+@responses.activate
+def test_upload_worker_streams_file(temp_dir):
+    """Test uploading a worker straight from an open file."""
+    url = "https://api.cloudflare.com/client/v4/accounts/test_account_id/workers/scripts/big"
+    responses.add(responses.PUT, url, json={"success": True, "result": {"id": "big"}}, status=200)
+
+    path = temp_dir / "worker.js"
+    path.write_text("export default {};\n" * 1000)
+    client = CloudflareClient("test_account_id", "test_api_token")
+
+    with open(path, "rb") as f:
+        assert client.upload_worker("big", f, metadata={"main_module": "worker.js"})["id"] == "big"
+
+    request = responses.calls[0].request
+    assert request.headers["Content-Type"].startswith("multipart/form-data; boundary=")
+    assert int(request.headers["Content-Length"]) > path.stat().st_size
@@ -0,0 +1,30 @@
+"""Tests for bounded concurrent execution."""
+
+import time
+
+from slingshot.parallel import bounded_map
+
+
+def test_bounded_map_ordered_yields_in_input_order():
+    """Test that ordered mode waits for earlier items."""
+    def work(i):
+        time.sleep(0.02 if i == 0 else 0)
+        return i * 10
+
+    results = list(bounded_map(work, range(6), max_workers=3, ordered=True))
+    assert results == [(i, i * 10) for i in range(6)]
+
+
+def test_bounded_map_propagates_errors():
+    """Test that a failing item raises from the iterator."""
+    def work(i):
+        if i == 3:
+            raise RuntimeError("boom")
+        return i
+
+    try:
+        list(bounded_map(work, range(10), max_workers=2))
+    except RuntimeError as e:
+        assert str(e) == "boom"
+    else:
+        raise AssertionError("expected RuntimeError")
@@ -0,0 +1,101 @@
+"""Tests for client-side rate limiting."""
+
+import threading
+
+import pytest
+import responses
+from slingshot.client import CloudflareClient
+from slingshot.ratelimit import RateLimiter, SQLiteTokenBucket, TokenBucket, build_rate_limiter
+
+
+def test_token_bucket_allows_burst():
+    """Test that a full bucket serves a burst without waiting."""
+    bucket = TokenBucket(rate=1, burst=5)
+    assert sum(bucket.acquire() for _ in range(5)) == 0.0
+
+
+def test_token_bucket_throttles_when_empty():
+    """Test that an empty bucket waits for the refill."""
+    bucket = TokenBucket(rate=50, burst=1)
+    bucket.acquire()
+    assert bucket.acquire() > 0
+
+
+def test_token_bucket_rejects_oversized_request():
+    """Test acquiring more tokens than the capacity."""
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1, burst=2).acquire(3)
+
+
+def test_rate_limiter_requires_acquire():
+    """Test that a limiter without acquire() cannot be created."""
+    class Incomplete(RateLimiter):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_sqlite_bucket_shared_between_instances(temp_dir):
+    """Test that two limiters on one file draw from one budget."""
+    path = temp_dir / "ratelimit.db"
+    first = SQLiteTokenBucket(str(path), rate=50, burst=2)
+    second = SQLiteTokenBucket(str(path), rate=50, burst=2)
+
+    assert first.acquire() == 0.0
+    assert second.acquire() == 0.0
+    assert first.acquire() > 0
+
+
+def test_sqlite_bucket_thread_safe(temp_dir):
+    """Test concurrent acquisition from several threads."""
+    bucket = SQLiteTokenBucket(str(temp_dir / "ratelimit.db"), rate=1000, burst=10)
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(5):
+                bucket.acquire()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+
+
+def test_build_rate_limiter(temp_dir):
+    """Test building limiters from configuration values."""
+    assert build_rate_limiter(None) is None
+    assert isinstance(build_rate_limiter(4), TokenBucket)
+    assert isinstance(
+        build_rate_limiter(4, state_path=str(temp_dir / "rl.db")),
+        SQLiteTokenBucket
+    )
+
+
+@responses.activate
+def test_client_consults_rate_limiter():
+    """Test that every request attempt acquires a token."""
+    class CountingLimiter(TokenBucket):
+        calls = 0
+
+        def acquire(self, tokens=1.0):
+            CountingLimiter.calls += 1
+            return 0.0
+
+    responses.add(
+        responses.GET,
+        "https://api.cloudflare.com/client/v4/user/tokens/verify",
+        json={"success": True, "result": {"status": "active"}},
+        status=200
+    )
+
+    client = CloudflareClient("test_account_id", "test_api_token", rate_limiter=CountingLimiter(1))
+    client.verify_token()
+    client.verify_token()
+    assert CountingLimiter.calls == 2
@@ -0,0 +1,148 @@
+"""Tests for the API retry policy."""
+
+import pytest
+import responses
+from slingshot.client import CloudflareClient, CloudflareAPIError
+from slingshot.retry import RetryPolicy
+
+
+BASE = "https://api.cloudflare.com/client/v4/accounts/test_account_id"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry delays instead of sleeping."""
+    recorded = []
+    monkeypatch.setattr("slingshot.client.time.sleep", recorded.append)
+    return recorded
+
+
+@pytest.fixture
+def client():
+    """Create a test client with a fast retry policy."""
+    return CloudflareClient(
+        account_id="test_account_id",
+        api_token="test_api_token",
+        retry_policy=RetryPolicy(max_retries=2, backoff_factor=0.1)
+    )
+
+
+def test_backoff_is_bounded():
+    """Test that jittered backoff never exceeds the cap."""
+    policy = RetryPolicy(backoff_factor=1.0, max_backoff=5.0)
+    for attempt in range(10):
+        assert 0 <= policy.backoff(attempt) <= 5.0
+
+
+def test_parse_retry_after():
+    """Test parsing Retry-After in seconds and as an HTTP date."""
+    policy = RetryPolicy()
+    assert policy.parse_retry_after("7") == 7.0
+    assert policy.parse_retry_after(None) is None
+    assert policy.parse_retry_after("garbage") is None
+    assert policy.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_non_idempotent_only_retried_on_rate_limit():
+    """Test that POST is replayed on 429 but not on 5xx."""
+    policy = RetryPolicy()
+    assert policy.should_retry_status("POST", 429, 0) is True
+    assert policy.should_retry_status("POST", 502, 0) is False
+    assert policy.should_retry_status("GET", 502, 0) is True
+    assert policy.should_retry_status("GET", 502, policy.max_retries) is False
+    assert policy.should_retry_status("POST", 502, 0, idempotent=True) is True
+
+
+@responses.activate
+def test_request_retries_until_success(client, sleeps):
+    """Test that a transient 502 is retried transparently."""
+    responses.add(responses.GET, f"{BASE}/workers/scripts", status=502, body="Bad Gateway")
+    responses.add(
+        responses.GET,
+        f"{BASE}/workers/scripts",
+        json={"success": True, "result": [{"id": "worker-1"}]},
+        status=200
+    )
+
+    workers = client.list_workers()
+    assert workers[0]["id"] == "worker-1"
+    assert len(sleeps) == 1
+
+
+@responses.activate
+def test_request_honors_retry_after(client, sleeps):
+    """Test that Retry-After overrides the computed backoff."""
+    responses.add(
+        responses.POST,
+        f"{BASE}/storage/kv/namespaces",
+        json={"success": False, "errors": [{"message": "Rate limited"}]},
+        status=429,
+        headers={"Retry-After": "3"}
+    )
+    responses.add(
+        responses.POST,
+        f"{BASE}/storage/kv/namespaces",
+        json={"success": True, "result": {"id": "ns-1"}},
+        status=200
+    )
+
+    assert client.create_kv_namespace("cache")["id"] == "ns-1"
+    assert sleeps == [3.0]
+
+
+@responses.activate
+def test_request_does_not_replay_failed_post(client, sleeps):
+    """Test that a POST failing with 5xx is surfaced immediately."""
+    responses.add(
+        responses.POST,
+        f"{BASE}/storage/kv/namespaces",
+        json={"success": False, "errors": [{"message": "Internal error"}]},
+        status=500
+    )
+
+    with pytest.raises(CloudflareAPIError) as exc_info:
+        client.create_kv_namespace("cache")
+
+    assert exc_info.value.status_code == 500
+    assert sleeps == []
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_bulk_delete_is_replayed_on_server_error(client, sleeps):
+    """Test that the idempotent bulk-delete POST is retried on 5xx."""
+    url = f"{BASE}/storage/kv/namespaces/ns1/bulk/delete"
+    responses.add(
+        responses.POST,
+        url,
+        json={"success": False, "errors": [{"message": "Unavailable"}]},
+        status=503
+    )
+    responses.add(
+        responses.POST,
+        url,
+        json={"success": True, "result": {"successful_key_count": 2}}
+    )
+
+    result = client.kv_bulk_delete("ns1", ["a", "b"])
+
+    assert result == {"successful_key_count": 2}
+    assert len(responses.calls) == 2
+    assert len(sleeps) == 1
+
+
+@responses.activate
+def test_request_gives_up_after_max_retries(client, sleeps):
+    """Test that the last failure is raised once retries are exhausted."""
+    responses.add(
+        responses.GET,
+        f"{BASE}/workers/scripts",
+        json={"success": False, "errors": [{"message": "Unavailable"}]},
+        status=503
+    )
+
+    with pytest.raises(CloudflareAPIError):
+        client.list_workers()
+
+    assert len(responses.calls) == 3
+    assert len(sleeps) == 2
@@ -0,0 +1,136 @@
+"""Tests for file watching and the dev redeploy loop."""
+
+import sys
+import time
+
+import pytest
+from slingshot.config import Config
+from slingshot.deployer import WorkerDeployer
+from slingshot.watch import (
+    FileWatcher,
+    InotifyWatcher,
+    PollingWatcher,
+    wait_for_changes,
+    watch_and_deploy,
+)
+
+
+class ScriptedWatcher(FileWatcher):
+    """Watcher that replays a fixed sequence of edits."""
+
+    def __init__(self, edits):
+        self.edits = list(edits)
+        super().__init__([])
+
+    def poll(self, timeout=None):
+        if not self.edits:
+            return set()
+        edit = self.edits.pop(0)
+        if edit is None:
+            return set()
+        path, content = edit
+        path.write_text(content)
+        return {path.resolve()}
+
+
+def test_file_watcher_requires_poll():
+    """Test that a watcher without poll() cannot be created."""
+    class Incomplete(FileWatcher):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete([])
+
+
+def test_polling_watcher_detects_changes(temp_dir):
+    """Test that mtime/size changes are reported once."""
+    path = temp_dir / "worker.js"
+    path.write_text("a")
+    watcher = PollingWatcher([path], interval=0.01)
+
+    assert watcher.poll(timeout=0.05) == set()
+    path.write_text("abc")
+    assert watcher.poll(timeout=1) == {path.resolve()}
+    assert watcher.poll(timeout=0.05) == set()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_watcher_detects_atomic_saves(temp_dir):
+    """Test that rename-over-original saves are seen."""
+    path = temp_dir / "worker.js"
+    path.write_text("a")
+    watcher = InotifyWatcher([path])
+    try:
+        (temp_dir / "other.txt").write_text("ignored")
+        assert watcher.poll(timeout=0.05) == set()
+
+        tmp = temp_dir / ".worker.js.swp"
+        tmp.write_text("b")
+        tmp.replace(path)
+        assert watcher.poll(timeout=1) == {path.resolve()}
+    finally:
+        watcher.close()
+
+
+def test_wait_for_changes_debounces_bursts(temp_dir):
+    """Test that a burst of saves is collected into one batch."""
+    a, b = temp_dir / "a.js", temp_dir / "b.js"
+    watcher = ScriptedWatcher([(a, "1"), (b, "1"), (a, "2"), None, (b, "2")])
+
+    changed, first_change = wait_for_changes(watcher, debounce=0.01)
+    assert changed == {a.resolve(), b.resolve()}
+    assert first_change <= time.monotonic()
+    assert watcher.edits == [(b, "2")]
+
+
+def test_watch_and_deploy_uploads_only_real_changes(temp_dir, mock_env_credentials,
+                                                     sample_worker_script, monkeypatch):
+    """Test that saves without content changes do not re-upload."""
+    config = Config.create_default("test-worker", str(temp_dir / ".slingshot.json"))
+    worker_path = temp_dir / "worker.js"
+    worker_path.write_text(sample_worker_script)
+
+    deployer = WorkerDeployer(config)
+    uploads = []
+    monkeypatch.setattr(
+        deployer.client, "upload_worker_modules",
+        lambda worker_name, modules, metadata: uploads.append(modules[0][1].read())
+        or {"id": worker_name, "etag": f"etag-{len(uploads)}"}
+    )
+    monkeypatch.setattr(deployer.client, "iter_workers", lambda: iter([]))
+
+    watcher = ScriptedWatcher([
+        (worker_path, sample_worker_script + "\n// v2"), None,
+        (worker_path, sample_worker_script + "\n// v2"), None,
+    ])
+    results = list(watch_and_deploy(deployer, watcher=watcher, debounce=0, max_cycles=3))
+
+    assert [r.get("status") for r in results] == [None, None, "skipped"]
+    assert results[1]["changed"] == [str(worker_path.resolve())]
+    assert all(r["latency"] >= 0 for r in results)
+    assert len(uploads) == 2
+    assert str(config.config_path.resolve()) in {str(p) for p in watcher.paths}
+
+
+def test_watch_and_deploy_reports_failures(temp_dir, mock_env_credentials,
+                                           sample_worker_script, monkeypatch):
+    """Test that a broken edit is reported and watching continues."""
+    config = Config.create_default("test-worker", str(temp_dir / ".slingshot.json"))
+    worker_path = temp_dir / "worker.js"
+    worker_path.write_text(sample_worker_script)
+
+    deployer = WorkerDeployer(config)
+    monkeypatch.setattr(
+        deployer.client, "upload_worker_modules",
+        lambda worker_name, modules, metadata: {"id": worker_name}
+    )
+
+    watcher = ScriptedWatcher([
+        (worker_path, 'import "./missing.js";\n' + sample_worker_script), None,
+        (worker_path, sample_worker_script + "\n// fixed"), None,
+    ])
+    results = list(watch_and_deploy(deployer, watcher=watcher, debounce=0, max_cycles=3))
+
+    assert results[1]["status"] == "failed"
+    assert "missing.js" in results[1]["error"]
+    assert results[2]["deployed"] is True